@@ -0,0 +1,486 @@
+"""Benchmarks the stages of the search endpoint against synthetic corpora served by a local Solr stand-in.
+
+Run it from the repository root, e.g.:
+
+    python -m benchmarks.search_pipeline --sizes 1000 100000 --output baseline.json
+    python -m benchmarks.search_pipeline --sizes 1000 100000 --compare baseline.json
+
+The stub Solr answers every page from a corpus that is generated document by document, so corpora of any size need
+no memory. It neither filters nor scores, hence the benchmark measures the overhead of honeybee and the HTTP round
+trip, not the query time of a real Solr.
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from random import Random
+from typing import Callable, Dict, Iterator, List, Optional
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "honeybee.tests.django_setup.settings")
+django.setup()
+
+from django.http import QueryDict  # noqa: E402
+
+from honeybee import conf  # noqa: E402
+from honeybee.commons import RawFeatureCollection  # noqa: E402
+from honeybee.databases.solr import (  # noqa: E402
+    SOLR_PARAMETER_NAME_DATE,
+    SolrSpatialDatabase,
+    convert_results_to_search_result,
+    is_change_search,
+)
+from honeybee.renderers import (  # noqa: E402
+    FlatGeobufRenderer,
+    GeobufRenderer,
+    SpatialDataJSONRenderer,
+)
+from honeybee.search import (  # noqa: E402
+    create_query_from_url_parameters,
+    create_search_filter_from_url_parameters,
+)
+from honeybee.tests.solr_stub import StubSolrServer  # noqa: E402
+from honeybee.views import convert_search_result_to_response_content  # noqa: E402
+
+DEFAULT_CORPUS_SIZES = [10**exponent for exponent in range(3, 8)]
+DEFAULT_ITERATIONS = 100
+DEFAULT_WARMUP_ITERATIONS = 5
+DEFAULT_HITS_PER_PAGE = 100
+DEFAULT_REGRESSION_THRESHOLD = 0.1
+
+STAGE_NAMES = ["parse", "filter_query", "solr", "convert", "render"]
+
+RENDERERS = {
+    "json": SpatialDataJSONRenderer,
+    conf.URL_PARAMETER_VALUE_FORMAT_GEOBUF: GeobufRenderer,
+    conf.URL_PARAMETER_VALUE_FORMAT_FLATGEOBUF: FlatGeobufRenderer,
+}
+
+TAXA = [
+    "https://www.biofid.de/ontologies/Vogel",
+    "https://www.biofid.de/ontologies/Fagus",
+    "https://www.biofid.de/ontologies/Quercus",
+    "https://www.biofid.de/ontologies/Tracheophyta/gbif/1234",
+    "https://www.biofid.de/ontologies/Tracheophyta/gbif/5678",
+]
+
+
+@dataclass
+class SyntheticCorpus:
+    """A corpus of `size` Solr documents in the shape of the test fixtures, located in Germany.
+    Every document is generated from its index on request, so the same document is returned for the same index.
+    """
+
+    size: int
+    seed: int = 0
+    location_field_name: str = conf.MAP_VIEWER_SOLR_GEOSPATIAL_FIELD_NAME
+    geojson_field_name: str = conf.MAP_VIEWER_SOLR_GEOJSON_DATA_FIELD_NAME
+    term_field_name: str = conf.MAP_VIEWER_SOLR_TERM_SEARCH_FIELD_NAME
+
+    def create_document(self, index: int) -> dict:
+        random = Random(self.seed * self.size + index)
+        location_id = f"https://www.biofid.de/document/{index // 100}/{index}"
+        longitude = round(random.uniform(5.0, 15.0), conf.COORDINATE_DECIMAL_PRECISION)
+        latitude = round(random.uniform(47.0, 55.0), conf.COORDINATE_DECIMAL_PRECISION)
+        date = f"{random.randint(1750, 2000)}-01-01"
+        taxa = random.sample(TAXA, k=random.randint(1, 3))
+
+        feature = {
+            "type": "Feature",
+            "id": location_id,
+            "geometry": {"type": "Point", "coordinates": [longitude, latitude]},
+            "properties": {
+                conf.GEOJSON_PROPERTY_NAME_DATE: date,
+                self.term_field_name: taxa,
+                "source-url": f"https://www.ub.uni-frankfurt/{index // 100}",
+                "source-label": f"Some article title {index // 100}",
+                "source-sentence": f'<sentence id="{index}">Some text</sentence>',
+            },
+        }
+
+        return {
+            "id": location_id,
+            self.location_field_name: f"{latitude},{longitude}",
+            self.geojson_field_name: json.dumps(feature),
+            SOLR_PARAMETER_NAME_DATE: f"{date}T00:00:00Z",
+            self.term_field_name: taxa,
+            "_version_": 1738881701826789376 + index,
+        }
+
+    def respond(self, handler: str, parameters: dict) -> dict:
+        """Answers a Solr select request with the page starting at the cursor, which is the index of the first
+        document. Only the fields requested with `fl` are returned.
+        """
+        rows = int(parameters.get("rows", ["10"])[0])
+        cursor = parameters.get("cursorMark", ["*"])[0]
+        start = 0 if cursor == "*" else int(cursor)
+        end = min(start + rows, self.size)
+
+        return_fields = parameters.get("fl", [""])[0].split(",")
+        documents = []
+        for index in range(start, end):
+            document = self.create_document(index)
+            if any(return_fields):
+                document = {
+                    name: value
+                    for name, value in document.items()
+                    if name in return_fields
+                }
+            documents.append(document)
+
+        return {
+            "responseHeader": {"status": 0, "QTime": 0},
+            "response": {"numFound": self.size, "start": 0, "docs": documents},
+            "nextCursorMark": str(end) if end < self.size else cursor,
+        }
+
+
+@dataclass
+class StageTimer:
+    """Collects the durations (in seconds) of the measured stages of a single request."""
+
+    durations: Dict[str, float] = field(default_factory=dict)
+
+    @contextmanager
+    def measure(self, stage_name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[stage_name] = time.perf_counter() - start
+
+
+@dataclass
+class BenchmarkResult:
+    """Holds the measurements of all requests to a corpus of `corpus_size` documents.
+    Latencies are given in milliseconds, the peak memory in KiB.
+    """
+
+    corpus_size: int
+    iterations: int
+    hits_per_page: int
+    response_format: str
+    latencies: Dict[str, Dict[str, float]]
+    requests_per_second: float
+    features_per_second: float
+    peak_memory: float
+
+
+def run_search_pipeline(
+    spatial_database: SolrSpatialDatabase,
+    url_parameters: QueryDict,
+    renderer_class: Callable,
+    timer: StageTimer,
+) -> int:
+    """Runs the stages of the search endpoint one after another and returns the number of returned Features."""
+    with timer.measure("parse"):
+        search_filter = create_search_filter_from_url_parameters(url_parameters)
+        query = create_query_from_url_parameters(url_parameters)
+
+    # Wraps `search_filter_to_solr_filter_query` and builds the Solr query string
+    with timer.measure("filter_query"):
+        solr_parameters = spatial_database.create_solr_parameters(query, search_filter)
+
+    with timer.measure("solr"):
+        results = spatial_database.call_db(query=query.search_string, **solr_parameters)
+
+    # Calls `convert_json_to_geojson`, if the GeoJSON passthrough is disabled
+    with timer.measure("convert"):
+        search_result = convert_results_to_search_result(
+            results,
+            solr_parameters,
+            is_change_search=is_change_search(search_filter),
+            search_filter=search_filter,
+        )
+
+    with timer.measure("render"):
+        renderer_class().render(
+            convert_search_result_to_response_content(search_result)
+        )
+
+    spatial_data = search_result.spatial_data
+    if isinstance(spatial_data, RawFeatureCollection):
+        return len(spatial_data.features)
+
+    return len(spatial_data["features"])
+
+
+def run_benchmark(
+    corpus_size: int,
+    iterations: int = DEFAULT_ITERATIONS,
+    warmup_iterations: int = DEFAULT_WARMUP_ITERATIONS,
+    hits_per_page: int = DEFAULT_HITS_PER_PAGE,
+    response_format: str = "json",
+    seed: int = 0,
+) -> BenchmarkResult:
+    """Sends `iterations` searches for random pages of a synthetic corpus through the search pipeline.
+    The peak memory is measured in an additional request, since tracing the allocations slows down all others.
+    """
+    corpus = SyntheticCorpus(size=corpus_size, seed=seed)
+    random = Random(seed)
+    renderer_class = RENDERERS[response_format]
+
+    def create_url_parameters() -> QueryDict:
+        url_parameters = QueryDict(mutable=True)
+        url_parameters[conf.URL_PARAMETER_NAME_HITS_PER_PAGE] = str(hits_per_page)
+        url_parameters[conf.URL_PARAMETER_NAME_RESUME_TOKEN] = str(
+            random.randrange(max(corpus_size - hits_per_page, 1))
+        )
+        url_parameters[conf.URL_PARAMETER_NAME_TERM] = random.choice(TAXA)
+        return url_parameters
+
+    with serve_corpus(corpus) as solr_url:
+        spatial_database = SolrSpatialDatabase({"url": solr_url})
+
+        for _ in range(warmup_iterations):
+            run_search_pipeline(
+                spatial_database, create_url_parameters(), renderer_class, StageTimer()
+            )
+
+        stage_durations = {stage_name: [] for stage_name in STAGE_NAMES}
+        feature_count = 0
+        for _ in range(iterations):
+            timer = StageTimer()
+            feature_count += run_search_pipeline(
+                spatial_database, create_url_parameters(), renderer_class, timer
+            )
+            for stage_name, duration in timer.durations.items():
+                stage_durations[stage_name].append(duration)
+
+        tracemalloc.start()
+        try:
+            run_search_pipeline(
+                spatial_database, create_url_parameters(), renderer_class, StageTimer()
+            )
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        spatial_database.close()
+
+    request_durations = [sum(durations) for durations in zip(*stage_durations.values())]
+    stage_durations["total"] = request_durations
+    total_duration = sum(request_durations)
+
+    return BenchmarkResult(
+        corpus_size=corpus_size,
+        iterations=iterations,
+        hits_per_page=hits_per_page,
+        response_format=response_format,
+        latencies={
+            stage_name: {
+                "p50": calculate_percentile(durations, 50) * 1000,
+                "p99": calculate_percentile(durations, 99) * 1000,
+            }
+            for stage_name, durations in stage_durations.items()
+        },
+        requests_per_second=iterations / total_duration if total_duration else 0.0,
+        features_per_second=feature_count / total_duration if total_duration else 0.0,
+        peak_memory=peak_memory / 1024,
+    )
+
+
+@contextmanager
+def serve_corpus(corpus: SyntheticCorpus) -> Iterator[str]:
+    """Serves the corpus with a stub Solr in a separate process and yields the URL of the Solr core.
+    The process keeps the documents generated by the stub out of the measured time and memory.
+    """
+    url_queue = multiprocessing.Queue()
+    stop_event = multiprocessing.Event()
+    process = multiprocessing.Process(
+        target=run_stub_solr_server, args=(corpus, url_queue, stop_event), daemon=True
+    )
+    process.start()
+
+    try:
+        yield url_queue.get(timeout=30)
+    finally:
+        stop_event.set()
+        process.join(timeout=5)
+
+
+def run_stub_solr_server(
+    corpus: SyntheticCorpus,
+    url_queue: multiprocessing.Queue,
+    stop_event: multiprocessing.Event,
+) -> None:
+    server = StubSolrServer(corpus.respond)
+    # The requests are not needed and would pile up in memory
+    server.requests = RequestSink()
+
+    with server:
+        url_queue.put(server.url)
+        stop_event.wait()
+
+
+class RequestSink(list):
+    """A list dropping everything appended to it."""
+
+    def append(self, item) -> None:
+        pass
+
+
+def calculate_percentile(values: List[float], percentile: float) -> float:
+    """Returns the nearest-rank percentile of the values, or 0 for no values."""
+    if not values:
+        return 0.0
+
+    sorted_values = sorted(values)
+    rank = max(math.ceil(percentile * len(sorted_values) / 100), 1)
+    return sorted_values[rank - 1]
+
+
+def find_regressions(
+    results: List[BenchmarkResult],
+    baseline_results: List[BenchmarkResult],
+    threshold: float = DEFAULT_REGRESSION_THRESHOLD,
+) -> List[str]:
+    """Compares the latencies, the throughput and the peak memory with the baseline of the same corpus size.
+    Returns a description of every measurement that is worse than the baseline by more than `threshold` (relative).
+    """
+    baseline_by_size = {result.corpus_size: result for result in baseline_results}
+    regressions = []
+
+    def check(corpus_size: int, name: str, value: float, baseline_value: float):
+        if baseline_value > 0 and value > baseline_value * (1 + threshold):
+            regressions.append(
+                f"{corpus_size} documents, {name}: {baseline_value:.3f} -> {value:.3f} "
+                f"(+{(value / baseline_value - 1) * 100:.1f}%)"
+            )
+
+    for result in results:
+        baseline = baseline_by_size.get(result.corpus_size)
+        if baseline is None:
+            continue
+
+        for stage_name, latencies in result.latencies.items():
+            for percentile_name, latency in latencies.items():
+                baseline_latency = baseline.latencies.get(stage_name, {}).get(
+                    percentile_name, 0.0
+                )
+                check(
+                    result.corpus_size,
+                    f"{stage_name} {percentile_name} (ms)",
+                    latency,
+                    baseline_latency,
+                )
+
+        # Lower throughput is worse, hence the inverse is compared
+        if result.requests_per_second > 0 and baseline.requests_per_second > 0:
+            check(
+                result.corpus_size,
+                "seconds per request",
+                1 / result.requests_per_second,
+                1 / baseline.requests_per_second,
+            )
+        check(
+            result.corpus_size,
+            "peak memory (KiB)",
+            result.peak_memory,
+            baseline.peak_memory,
+        )
+
+    return regressions
+
+
+def format_report(results: List[BenchmarkResult]) -> str:
+    lines = []
+    for result in results:
+        lines.append(
+            f"{result.corpus_size} documents, {result.iterations} requests of {result.hits_per_page} Features "
+            f"as {result.response_format}: {result.requests_per_second:.1f} requests/s, "
+            f"{result.features_per_second:.0f} Features/s, peak memory {result.peak_memory:.0f} KiB"
+        )
+        for stage_name, latencies in result.latencies.items():
+            lines.append(
+                f"  {stage_name:<12} p50 {latencies['p50']:>9.3f} ms   p99 {latencies['p99']:>9.3f} ms"
+            )
+
+    return "\n".join(lines)
+
+
+def load_results(path: str) -> List[BenchmarkResult]:
+    with open(path, encoding="utf-8") as results_file:
+        return [BenchmarkResult(**result) for result in json.load(results_file)]
+
+
+def save_results(results: List[BenchmarkResult], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as results_file:
+        json.dump([asdict(result) for result in results], results_file, indent=2)
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_CORPUS_SIZES,
+        help="The numbers of documents of the synthetic corpora.",
+    )
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP_ITERATIONS)
+    parser.add_argument("--hits-per-page", type=int, default=DEFAULT_HITS_PER_PAGE)
+    parser.add_argument("--format", choices=sorted(RENDERERS), default="json")
+    parser.add_argument(
+        "--no-passthrough",
+        action="store_true",
+        help="Decode the stored Features instead of passing them through.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Save the results as JSON to this file.")
+    parser.add_argument(
+        "--compare",
+        help="Compare the results with the JSON results of a previous run and fail on regressions.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_REGRESSION_THRESHOLD,
+        help="The relative slowdown counted as regression, e.g. 0.1 for 10%%.",
+    )
+    options = parser.parse_args(arguments)
+
+    if options.no_passthrough:
+        conf.MAP_VIEWER_GEOJSON_PASSTHROUGH = False
+
+    results = []
+    for corpus_size in options.sizes:
+        result = run_benchmark(
+            corpus_size,
+            iterations=options.iterations,
+            warmup_iterations=options.warmup,
+            hits_per_page=options.hits_per_page,
+            response_format=options.format,
+            seed=options.seed,
+        )
+        results.append(result)
+        print(format_report([result]), flush=True)
+
+    if options.output:
+        save_results(results, options.output)
+
+    if options.compare:
+        regressions = find_regressions(
+            results, load_results(options.compare), options.threshold
+        )
+        if regressions:
+            print("Regressions compared to the baseline:")
+            print("\n".join(f"  {regression}" for regression in regressions))
+            return 1
+
+        print("No regressions compared to the baseline.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
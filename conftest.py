@@ -3,6 +3,8 @@ import json
 import pysolr
 import pytest
 
+from honeybee.tests.commons import FRANKFURT, create_feature
+
 pytest_plugins = ["honeybee.tests.parameters"]
 
 
@@ -88,3 +90,38 @@ def solr_response_geojson_data():
             ],
         },
     }
+
+
+@pytest.fixture
+def local_features():
+    """GeoJSON Features for the local spatial databases, unordered and with one Feature missing its geometry."""
+    return [
+        create_feature(
+            "c",
+            {"type": "Point", "coordinates": [11.582, 48.135]},
+            taxa=["https://www.biofid.de/ontologies/Vogel"],
+        ),
+        create_feature(
+            "a",
+            {
+                "type": "Point",
+                "coordinates": [FRANKFURT.longitude, FRANKFURT.latitude],
+            },
+            taxa=[
+                "https://www.biofid.de/ontologies/Vogel",
+                "https://www.biofid.de/ontologies/Fagus",
+            ],
+            date="1836-01-01",
+        ),
+        create_feature(
+            "b",
+            {"type": "Point", "coordinates": [13.405, 52.52]},
+            taxa=["https://www.biofid.de/ontologies/Fagus"],
+            date="1900-05-01T00:00:00Z",
+        ),
+        create_feature(
+            "d",
+            {"type": "LineString", "coordinates": [[8.6, 50.1], [8.8, 50.14]]},
+        ),
+        create_feature("without-geometry", None),
+    ]
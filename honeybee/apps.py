@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class BiofidHoneybee(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'honeybee'
+
+    def ready(self):
+        from honeybee import conf
+        from honeybee.databases.registry import get_spatial_database
+
+        # Set up the connection pool on start, so the first request does not have to pay for it
+        # The in-memory backends load all data on start, which would otherwise delay the first request even more
+        if (
+            conf.MAP_VIEWER_SOLR_SPATIAL_DATABASE_HOSTNAME is not None
+            or conf.MAP_VIEWER_SPATIAL_DATABASE_PATH is not None
+        ):
+            get_spatial_database()
@@ -0,0 +1,296 @@
+import dataclasses
+import datetime
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from asgiref.sync import sync_to_async
+
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from honeybee import conf
+from honeybee.commons import Query, SearchFilter, SearchResult, Tile
+from honeybee.metrics import cache_requests
+
+SEARCH_CACHE_KEY_PREFIX = "honeybee-search"
+LOCAL_SEARCH_CACHE_NAME = "honeybee-search-results"
+SEARCH_CACHE_METRICS_NAME = "search"
+
+
+class SearchResultCache:
+    """Caches SearchResults in a Django cache.
+    The cache key is created from the canonical form of the Query and SearchFilter, so that equivalent searches
+    share the same cache entry. Time-to-live and size-based eviction are handled by the Django cache backend.
+    The hits and misses are also counted in the `honeybee_cache_requests_total` metric.
+    """
+
+    def __init__(self, cache: BaseCache, timeout: Optional[int]):
+        self._cache = cache
+        self._lock = threading.Lock()
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """The ratio of cache hits to all cache accesses. Is 0, if the cache was never accessed."""
+        accesses = self.hits + self.misses
+        return self.hits / accesses if accesses else 0.0
+
+    def get_or_search(
+        self,
+        query: Query,
+        search_filter: SearchFilter,
+        search: Callable[[], SearchResult],
+    ) -> SearchResult:
+        """Returns the cached SearchResult for the given `query` and `search_filter`.
+        If there is none, `search` is called and its result is cached.
+        """
+        key = create_search_cache_key(query, search_filter)
+        search_result = self._cache.get(key)
+
+        if search_result is not None:
+            self._count(is_hit=True)
+            return search_result
+
+        self._count(is_hit=False)
+        search_result = search()
+        self._cache.set(key, search_result, self.timeout)
+
+        return search_result
+
+    async def get_or_search_async(
+        self,
+        query: Query,
+        search_filter: SearchFilter,
+        search: Callable[[], Awaitable[SearchResult]],
+    ) -> SearchResult:
+        """The asynchronous version of `get_or_search`.
+        The cache is accessed in a separate thread, since cache backends may block (e.g. on network access).
+        """
+        key = create_search_cache_key(query, search_filter)
+        search_result = await sync_to_async(self._cache.get, thread_sensitive=False)(
+            key
+        )
+
+        if search_result is not None:
+            self._count(is_hit=True)
+            return search_result
+
+        self._count(is_hit=False)
+        search_result = await search()
+        await sync_to_async(self._cache.set, thread_sensitive=False)(
+            key, search_result, self.timeout
+        )
+
+        return search_result
+
+    def clear(self) -> None:
+        """Removes all entries from the cache and resets the counters."""
+        self._cache.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def _count(self, is_hit: bool) -> None:
+        with self._lock:
+            if is_hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        count_cache_request(SEARCH_CACHE_METRICS_NAME, is_hit)
+
+
+class LRUCache:
+    """A thread-safe mapping holding at most `max_size` entries. The least recently used entries are evicted first.
+    If a `timeout` is given, entries expire that many seconds after they were set, so changes of the database become
+    visible eventually. If a `name` is given, the hits and misses are also counted in the
+    `honeybee_cache_requests_total` metric.
+    """
+
+    def __init__(
+        self, max_size: int, timeout: Optional[float] = None, name: Optional[str] = None
+    ):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.name = name
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and is_expired(entry[0]):
+                del self._entries[key]
+                entry = None
+
+            is_hit = entry is not None
+            if is_hit:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                value = entry[1]
+            else:
+                self.misses += 1
+                value = default
+
+        if self.name is not None:
+            count_cache_request(self.name, is_hit)
+
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expiry = None if self.timeout is None else time.monotonic() + self.timeout
+        with self._lock:
+            self._entries[key] = (expiry, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def is_expired(expiry: Optional[float]) -> bool:
+    """Returns True if the given `time.monotonic` expiry of a cache entry has passed. None never expires."""
+    return expiry is not None and expiry <= time.monotonic()
+
+
+feature_cache = LRUCache(
+    max_size=conf.MAP_VIEWER_FEATURE_CACHE_SIZE,
+    timeout=conf.MAP_VIEWER_FEATURE_CACHE_TIMEOUT,
+    name="feature",
+)
+tile_cache = LRUCache(
+    max_size=conf.MAP_VIEWER_TILE_CACHE_SIZE,
+    timeout=conf.MAP_VIEWER_TILE_CACHE_MAX_AGE,
+    name="tile",
+)
+
+_search_result_cache: Optional[SearchResultCache] = None
+_search_result_cache_lock = threading.Lock()
+
+
+def get_search_result_cache() -> Optional[SearchResultCache]:
+    """Returns the process-wide SearchResultCache, or None if caching is disabled in the settings.
+    If `MAP_VIEWER_SEARCH_CACHE_ALIAS` names a cache in the Django `CACHES` setting, this cache is used (e.g. a file or
+    Redis cache). Otherwise, a local-memory cache holding at most `MAP_VIEWER_SEARCH_CACHE_MAX_ENTRIES` results is used.
+    """
+    global _search_result_cache
+
+    if not conf.MAP_VIEWER_SEARCH_CACHE_ENABLED:
+        return None
+
+    with _search_result_cache_lock:
+        if _search_result_cache is None:
+            _search_result_cache = SearchResultCache(
+                cache=create_django_cache(),
+                timeout=conf.MAP_VIEWER_SEARCH_CACHE_TIMEOUT,
+            )
+
+    return _search_result_cache
+
+
+def count_cache_request(cache_name: str, is_hit: bool) -> None:
+    cache_requests.inc(cache=cache_name, result="hit" if is_hit else "miss")
+
+
+def create_django_cache() -> BaseCache:
+    if conf.MAP_VIEWER_SEARCH_CACHE_ALIAS is not None:
+        return caches[conf.MAP_VIEWER_SEARCH_CACHE_ALIAS]
+
+    return LocMemCache(
+        LOCAL_SEARCH_CACHE_NAME,
+        {
+            "TIMEOUT": conf.MAP_VIEWER_SEARCH_CACHE_TIMEOUT,
+            "OPTIONS": {"MAX_ENTRIES": conf.MAP_VIEWER_SEARCH_CACHE_MAX_ENTRIES},
+        },
+    )
+
+
+def create_search_cache_key(query: Query, search_filter: SearchFilter) -> str:
+    """Creates a cache key from the canonical form of the given `query` and `search_filter`.
+    Terms are deduplicated and sorted, coordinates are rounded to `conf.COORDINATE_DECIMAL_PRECISION`, and unset values
+    are replaced by the defaults the database would use for them.
+    """
+    canonical_search = {
+        "terms": sorted(set(query.original_raw_string_data or [])),
+        "filter": canonicalize_search_filter(search_filter),
+    }
+    serialized_search = json.dumps(canonical_search, sort_keys=True)
+    digest = hashlib.sha256(serialized_search.encode("utf-8")).hexdigest()
+
+    return f"{SEARCH_CACHE_KEY_PREFIX}:{digest}"
+
+
+def create_tile_cache_key(tile: Tile, query: Query, search_filter: SearchFilter) -> str:
+    """Creates a cache key from the tile coordinates and the canonical form of the given `query` and `search_filter`."""
+    return (
+        f"{tile.zoom}/{tile.x}/{tile.y}:{create_search_cache_key(query, search_filter)}"
+    )
+
+
+def canonicalize_search_filter(search_filter: SearchFilter) -> dict:
+    search_filter = dataclasses.replace(
+        search_filter,
+        cursor=search_filter.cursor or conf.SOLR_DEFAULT_VALUE_CURSOR,
+        hits_per_page=search_filter.hits_per_page
+        or conf.SOLR_DEFAULT_VALUE_HITS_PER_PAGE,
+        radius=search_filter.radius or conf.SOLR_DEFAULT_VALUE_RADIUS,
+        return_fields=(
+            sorted(set(search_filter.return_fields))
+            if search_filter.return_fields is not None
+            else None
+        ),
+        sample_seed=(
+            (
+                conf.SOLR_DEFAULT_VALUE_SAMPLE_SEED
+                if search_filter.sample_seed is None
+                else search_filter.sample_seed
+            )
+            if search_filter.sample_size is not None
+            else None
+        ),
+        spatial_center=search_filter.spatial_center or conf.default_spatial_center,
+    )
+
+    date_span = search_filter.date_span
+    if (
+        date_span is not None
+        and date_span.first_year is None
+        and date_span.last_year is None
+    ):
+        search_filter.date_span = None
+
+    return canonicalize_value(dataclasses.asdict(search_filter))
+
+
+def canonicalize_value(value: Any) -> Any:
+    """Converts the given value into a JSON serializable form that is equal for all equivalent values."""
+    if isinstance(value, dict):
+        return {key: canonicalize_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return sorted(
+            (canonicalize_value(item) for item in value),
+            key=lambda item: json.dumps(item, sort_keys=True),
+        )
+    if isinstance(value, float):
+        return round(value, conf.COORDINATE_DECIMAL_PRECISION)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+
+    return value
@@ -1,6 +1,9 @@
+import json
 from dataclasses import dataclass, field
-from datetime import date
-from typing import Callable, Any, Optional, List
+from datetime import date, datetime
+from typing import Callable, Any, Optional, List, Union
+
+from geojson import Feature, FeatureCollection
 
 from django.http import QueryDict
 from honeybee import conf
@@ -22,6 +25,25 @@ class Point:
     latitude: float
 
 
+@dataclass
+class BoundingBox:
+    """Holds the corners of a rectangular area, e.g. a map viewport."""
+
+    minimum_latitude: float
+    minimum_longitude: float
+    maximum_latitude: float
+    maximum_longitude: float
+
+
+@dataclass
+class Tile:
+    """Identifies a web map tile by its zoom level and its column (x) and row (y) in the tile grid."""
+
+    zoom: int
+    x: int
+    y: int
+
+
 @dataclass
 class Query:
     """A data holder for all data related to the user query."""
@@ -30,17 +52,60 @@ class Query:
     search_string: str = None
 
 
+@dataclass
+class RawFeatureCollection:
+    """Holds GeoJSON Features as they were serialized in the database.
+    The Features are written to the response without being decoded and encoded again.
+    """
+
+    features: List[Union[str, bytes]] = field(default_factory=list)
+
+    def to_feature_collection(self) -> FeatureCollection:
+        """Decodes all Features and returns them as GeoJSON FeatureCollection."""
+        return FeatureCollection(
+            [Feature(**json.loads(feature)) for feature in self.features]
+        )
+
+
 @dataclass
 class SearchFilter:
-    """Holds all data that is needed to filter a search."""
+    """Holds all data that is needed to filter a search.
+    `return_fields` are the names of the Feature properties to return (all if None) and `coordinate_precision` is the
+    number of decimal places of the returned coordinates (unchanged if None).
+    If `sample_size` is set, a random sample of this many Features is returned as a single page instead of the first
+    page. The same `sample_seed` always selects the same sample.
+    If `spread` is set, at most this many Features are returned per cell of a coarse grid over the search area, so
+    that dense areas do not crowd out sparse ones.
+    """
 
+    aggregate: bool = False
+    bounding_box: Optional[BoundingBox] = None
+    coordinate_precision: Optional[int] = None
     cursor: Optional[str] = None
     date_span: Optional[DateSpan] = None
     filter_parameters: List[str] = field(default_factory=list)
     hits_per_page: Optional[int] = None
     radius: Optional[float] = None
-    return_fields: List[str] = field(default_factory=list)
+    return_fields: Optional[List[str]] = None
+    sample_seed: Optional[int] = None
+    sample_size: Optional[int] = None
+    since: Optional[datetime] = None
     spatial_center: Optional[Point] = None
+    spread: Optional[int] = None
+    zoom: Optional[int] = None
+
+
+@dataclass
+class SearchResult:
+    """Holds a page of spatial data together with the data needed to request the next page.
+    For searches for changes (see `SearchFilter.since`), `deleted_ids` holds the IDs of the deleted Features on the page.
+    """
+
+    spatial_data: Union[FeatureCollection, RawFeatureCollection]
+    next_cursor: Optional[str] = None
+    total_hits: Optional[int] = None
+    query_time: Optional[int] = None
+    deleted_ids: Optional[List[str]] = None
 
 
 class UserInputException(Exception):
@@ -49,6 +114,18 @@ class UserInputException(Exception):
     pass
 
 
+def boolean(value: str) -> bool:
+    """Converts a boolean URL parameter value (e.g. "true", "1", "no") into a bool."""
+    normalized_value = str(value).strip().lower()
+
+    if normalized_value in ("true", "1", "yes", "on"):
+        return True
+    if normalized_value in ("false", "0", "no", "off"):
+        return False
+
+    raise ValueError(f"{value} is not a boolean value!")
+
+
 def get_from_data(
     data: QueryDict,
     name: str,
@@ -7,31 +7,132 @@ from honeybee.commons import Point
 get_setting = partial(getattr, settings)
 
 # URL Parameters
+URL_PARAMETER_NAME_AGGREGATE = 'aggregate'
+URL_PARAMETER_NAME_FIELDS = 'fields'
 URL_PARAMETER_NAME_FORMAT = 'format'
 URL_PARAMETER_NAME_HITS_PER_PAGE = 'hitsPerPage'
+URL_PARAMETER_NAME_ID = 'id'
 URL_PARAMETER_NAME_LATITUDE = 'lat'
 URL_PARAMETER_NAME_LONGITUDE = 'lon'
+URL_PARAMETER_NAME_MAXIMUM_LATITUDE = 'maxLat'
+URL_PARAMETER_NAME_MAXIMUM_LONGITUDE = 'maxLon'
+URL_PARAMETER_NAME_MINIMUM_LATITUDE = 'minLat'
+URL_PARAMETER_NAME_MINIMUM_LONGITUDE = 'minLon'
+URL_PARAMETER_NAME_PRECISION = 'precision'
 URL_PARAMETER_NAME_RADIUS = 'radius'
 URL_PARAMETER_NAME_RESUME_TOKEN = 'resumeToken'
+URL_PARAMETER_NAME_SAMPLE = 'sample'
+URL_PARAMETER_NAME_SEED = 'seed'
+URL_PARAMETER_NAME_SINCE = 'since'
+URL_PARAMETER_NAME_SPREAD = 'spread'
 URL_PARAMETER_NAME_YEAR_END = 'yearEnd'
 URL_PARAMETER_NAME_YEAR_START = 'yearStart'
 URL_PARAMETER_NAME_TERM = 'term'
+URL_PARAMETER_NAME_ZOOM = 'zoom'
+
+# URL Parameter Values
+URL_PARAMETER_VALUE_FORMAT_FLATGEOBUF = 'fgb'
+URL_PARAMETER_VALUE_FORMAT_GEOBUF = 'geobuf'
+URL_PARAMETER_VALUE_FORMAT_GEOJSON = 'geojson'
+URL_PARAMETER_VALUE_FORMAT_NDJSON = 'ndjson'
+
+# GeoJSON Feature Properties
+GEOJSON_PROPERTY_NAME_DATE = 'date'
 
 COORDINATE_DECIMAL_PRECISION = 6
+MAXIMUM_ZOOM_LEVEL = 24
 
 # Spatial Database Configuration
+MAP_VIEWER_SPATIAL_DATABASE_BACKEND = get_setting('MAP_VIEWER_SPATIAL_DATABASE_BACKEND', 'honeybee.databases.solr.SolrSpatialDatabase')
+MAP_VIEWER_SPATIAL_DATABASE_PATH = get_setting('MAP_VIEWER_SPATIAL_DATABASE_PATH', None)
 MAP_VIEWER_SOLR_SPATIAL_DATABASE_HOSTNAME = get_setting('MAP_VIEWER_SOLR_SPATIAL_DATABASE_HOSTNAME', None)
 MAP_VIEWER_SOLR_GEOSPATIAL_FIELD_NAME = get_setting('MAP_VIEWER_SOLR_GEOSPATIAL_FIELD_NAME', None)
 MAP_VIEWER_SOLR_GEOJSON_DATA_FIELD_NAME = get_setting('MAP_VIEWER_SOLR_GEOJSON_DATA_FIELD_NAME', 'geojson')
 MAP_VIEWER_SOLR_TERM_SEARCH_FIELD_NAME = get_setting('MAP_VIEWER_SOLR_TERM_SEARCH_FIELD_NAME', 'taxa')
+MAP_VIEWER_SOLR_HEATMAP_FIELD_NAME = get_setting('MAP_VIEWER_SOLR_HEATMAP_FIELD_NAME', MAP_VIEWER_SOLR_GEOSPATIAL_FIELD_NAME)
+MAP_VIEWER_SOLR_LAST_MODIFIED_FIELD_NAME = get_setting('MAP_VIEWER_SOLR_LAST_MODIFIED_FIELD_NAME', None)
+MAP_VIEWER_SOLR_DELETED_FIELD_NAME = get_setting('MAP_VIEWER_SOLR_DELETED_FIELD_NAME', None)
+MAP_VIEWER_SOLR_FEATURES_FROM_DOC_VALUES = get_setting('MAP_VIEWER_SOLR_FEATURES_FROM_DOC_VALUES', False)
+MAP_VIEWER_SOLR_RANDOM_SORT_FIELD_PREFIX = get_setting('MAP_VIEWER_SOLR_RANDOM_SORT_FIELD_PREFIX', 'random_')
+MAP_VIEWER_SOLR_GEOHASH_CELL_FIELD_PREFIX = get_setting('MAP_VIEWER_SOLR_GEOHASH_CELL_FIELD_PREFIX', None)
+MAP_VIEWER_SOLR_GEOHASH_CELL_LEVELS = get_setting('MAP_VIEWER_SOLR_GEOHASH_CELL_LEVELS', 8)
+MAP_VIEWER_GEOJSON_PASSTHROUGH = get_setting('MAP_VIEWER_GEOJSON_PASSTHROUGH', True)
+MAP_VIEWER_GEOJSON_PASSTHROUGH_VALIDATION = get_setting('MAP_VIEWER_GEOJSON_PASSTHROUGH_VALIDATION', True)
+
+# Aggregation Configuration
+MAP_VIEWER_CLUSTER_CELLS_PER_TILE = get_setting('MAP_VIEWER_CLUSTER_CELLS_PER_TILE', 4)
+MAP_VIEWER_SPREAD_CELLS_PER_VIEWPORT = get_setting('MAP_VIEWER_SPREAD_CELLS_PER_VIEWPORT', 16)
+
+# Vector Tile Configuration
+MAP_VIEWER_TILE_LAYER_NAME = get_setting('MAP_VIEWER_TILE_LAYER_NAME', 'features')
+MAP_VIEWER_MAXIMUM_FEATURES_PER_TILE = get_setting('MAP_VIEWER_MAXIMUM_FEATURES_PER_TILE', 10000)
+MAP_VIEWER_TILE_CACHE_SIZE = get_setting('MAP_VIEWER_TILE_CACHE_SIZE', 1000)
+MAP_VIEWER_TILE_CACHE_MAX_AGE = get_setting('MAP_VIEWER_TILE_CACHE_MAX_AGE', 300)
+
+# Binary Format Configuration
+MAP_VIEWER_FLATGEOBUF_INDEX_NODE_SIZE = get_setting('MAP_VIEWER_FLATGEOBUF_INDEX_NODE_SIZE', 16)
+
+# Instrumentation
+MAP_VIEWER_SERVER_TIMING_ENABLED = get_setting('MAP_VIEWER_SERVER_TIMING_ENABLED', False)
+MAP_VIEWER_METRICS_ENABLED = get_setting('MAP_VIEWER_METRICS_ENABLED', False)
+MAP_VIEWER_METRICS_DIRECTORY = get_setting('MAP_VIEWER_METRICS_DIRECTORY', None)
+
+# Result Size Limits
+MAP_VIEWER_MAXIMUM_HITS_PER_PAGE = get_setting('MAP_VIEWER_MAXIMUM_HITS_PER_PAGE', 1000)
+MAP_VIEWER_MAXIMUM_FEATURES_PER_REQUEST = get_setting('MAP_VIEWER_MAXIMUM_FEATURES_PER_REQUEST', 100000)
+
+# Search Result Cache
+MAP_VIEWER_SEARCH_CACHE_ENABLED = get_setting('MAP_VIEWER_SEARCH_CACHE_ENABLED', False)
+MAP_VIEWER_SEARCH_CACHE_ALIAS = get_setting('MAP_VIEWER_SEARCH_CACHE_ALIAS', None)
+MAP_VIEWER_SEARCH_CACHE_TIMEOUT = get_setting('MAP_VIEWER_SEARCH_CACHE_TIMEOUT', 300)
+MAP_VIEWER_SEARCH_CACHE_MAX_ENTRIES = get_setting('MAP_VIEWER_SEARCH_CACHE_MAX_ENTRIES', 1000)
+
+# Feature Cache
+MAP_VIEWER_FEATURE_CACHE_SIZE = get_setting('MAP_VIEWER_FEATURE_CACHE_SIZE', 10000)
+MAP_VIEWER_FEATURE_CACHE_TIMEOUT = get_setting('MAP_VIEWER_FEATURE_CACHE_TIMEOUT', 300)
+
+# Solr Indexing Configuration
+MAP_VIEWER_SOLR_INDEXING_BATCH_SIZE = get_setting('MAP_VIEWER_SOLR_INDEXING_BATCH_SIZE', 500)
+MAP_VIEWER_SOLR_INDEXING_COMMIT_SIZE = get_setting('MAP_VIEWER_SOLR_INDEXING_COMMIT_SIZE', 10000)
+MAP_VIEWER_SOLR_INDEXING_WORKERS = get_setting('MAP_VIEWER_SOLR_INDEXING_WORKERS', 4)
+
+# Spatial Database Connection Configuration
+MAP_VIEWER_SOLR_CONNECTION_POOL_SIZE = get_setting('MAP_VIEWER_SOLR_CONNECTION_POOL_SIZE', 10)
+MAP_VIEWER_SOLR_CONNECTION_KEEP_ALIVE = get_setting('MAP_VIEWER_SOLR_CONNECTION_KEEP_ALIVE', True)
+MAP_VIEWER_SOLR_CONNECT_TIMEOUT = get_setting('MAP_VIEWER_SOLR_CONNECT_TIMEOUT', 5)
+MAP_VIEWER_SOLR_READ_TIMEOUT = get_setting('MAP_VIEWER_SOLR_READ_TIMEOUT', 60)
+MAP_VIEWER_SOLR_COALESCE_REQUESTS = get_setting('MAP_VIEWER_SOLR_COALESCE_REQUESTS', True)
 
 # Error messages
 ERROR_MESSAGE_CONTENT_PARAMETER_NAME = 'error-message'
 ERROR_MESSAGE_ONLY_SET_EITHER_LON_OR_LAT = 'Either both value have to be set or neither.'
+ERROR_MESSAGE_INCOMPLETE_BOUNDING_BOX = 'Either all of minLat, minLon, maxLat and maxLon have to be set or none.'
+ERROR_MESSAGE_INVALID_BOUNDING_BOX = 'The minimum latitude of the bounding box has to be smaller than its maximum latitude and all coordinates have to be within the valid coordinate range!'
+ERROR_MESSAGE_UNSUPPORTED_FORMAT = 'The format "{format}" is not supported! Use one of: {supported_formats}'
+ERROR_MESSAGE_PARAMETER_HAS_TO_BE_POSITIVE = 'The parameter "{name}" has to be greater than zero!'
+ERROR_MESSAGE_PARAMETER_HAS_TO_BE_NON_NEGATIVE = 'The parameter "{name}" must not be negative!'
+ERROR_MESSAGE_PARAMETER_EXCEEDS_MAXIMUM = 'The parameter "{name}" must not be greater than {maximum}!'
+ERROR_MESSAGE_TILE_OUT_OF_RANGE = 'The tile {zoom}/{x}/{y} does not exist! The zoom level has to be between 0 and {maximum_zoom} and x and y below 2 to the power of the zoom level.'
+ERROR_MESSAGE_PRECISION_OUT_OF_RANGE = 'The parameter "precision" has to be between 0 and {maximum_precision}!'
+ERROR_MESSAGE_ZOOM_OUT_OF_RANGE = 'The parameter "zoom" has to be between 0 and {maximum_zoom}!'
+ERROR_MESSAGE_AGGREGATION_NOT_SUPPORTED = 'The spatial database does not support aggregated searches!'
+ERROR_MESSAGE_SPREAD_NOT_SUPPORTED = 'The spatial database does not support spread searches!'
+ERROR_MESSAGE_SAMPLING_NOT_SUPPORTED = 'The spatial database does not support sampled searches!'
+ERROR_MESSAGE_CHANGE_SEARCH_NOT_SUPPORTED = 'The spatial database does not support searching for changed features!'
+ERROR_MESSAGE_INVALID_TIMESTAMP = 'The parameter "{name}" has to be an ISO 8601 timestamp, e.g. 2024-01-31T12:00:00Z!'
+ERROR_MESSAGE_FEATURE_NOT_FOUND = 'There is no feature with the ID "{feature_id}"!'
+ERROR_MESSAGE_INVALID_RESUME_TOKEN = 'The resume token "{resume_token}" is not valid!'
+ERROR_MESSAGE_TOO_MANY_IDS = 'At most {maximum} IDs can be requested at once!'
 ERROR_MESSAGE_INPUT_PARAMETER_HAS_WRONG_FORMAT = 'The parameter "{name}" is expected to be of type {parameter_type}!'
 
 # Spatial Database Configuration Parameters
+DATABASE_BACKEND_CONFIGURATION_NAME = 'backend'
 DATABASE_HOSTNAME_CONFIGURATION_NAME = 'url'
+DATABASE_PATH_CONFIGURATION_NAME = 'path'
+DATABASE_POOL_SIZE_CONFIGURATION_NAME = 'pool_size'
+DATABASE_KEEP_ALIVE_CONFIGURATION_NAME = 'keep_alive'
+DATABASE_CONNECT_TIMEOUT_CONFIGURATION_NAME = 'connect_timeout'
+DATABASE_READ_TIMEOUT_CONFIGURATION_NAME = 'read_timeout'
 
 # Solr Query Default Values
 SOLR_DEFAULT_VALUE_QUERY_STRING = '*:*'
@@ -40,6 +141,8 @@ SOLR_DEFAULT_VALUE_DATE_SPAN = '[* TO NOW]'
 SOLR_DEFAULT_VALUE_FILTER_QUERY = f"{{!bbox sfield={MAP_VIEWER_SOLR_GEOSPATIAL_FIELD_NAME}}}"
 SOLR_DEFAULT_VALUE_HITS_PER_PAGE = 100
 SOLR_DEFAULT_VALUE_RADIUS = 50
+SOLR_DEFAULT_VALUE_SORT = 'id asc'
+SOLR_DEFAULT_VALUE_SAMPLE_SEED = 0
 SOLR_DEFAULT_VALUE_RETURN_FIELDS = MAP_VIEWER_SOLR_GEOJSON_DATA_FIELD_NAME
 default_spatial_center = Point(latitude=51.16336, longitude=10.44768)
 SOLR_DEFAULT_VALUE_SPATIAL_CENTER = f'{default_spatial_center.latitude},{default_spatial_center.longitude}'
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from honeybee.metrics import coalesced_requests
+
+
+class _Flight:
+    """Holds the outcome of a call that other threads are waiting for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.exception: Optional[BaseException] = None
+
+
+class RequestCoalescer:
+    """Lets concurrent callers with the same key share a single call (single-flight).
+
+    The first caller for a key executes the call, all callers arriving while it is still running wait for it and
+    receive the same result (or exception). Works for threads (`call`) and for coroutines on any event loop
+    (`call_async`). The returned results are shared, hence they must not be modified by the callers.
+    The callers are also counted in the `honeybee_coalesced_requests_total` metric.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._async_flights: Dict[
+            Tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Task
+        ] = {}
+        self.calls = 0
+        self.coalesced_calls = 0
+
+    def call(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        """Returns the result of `function`, which is called only once for concurrent calls with the same `key`."""
+        with self._lock:
+            flight = self._flights.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.calls += 1
+            else:
+                self.coalesced_calls += 1
+
+        count_coalesced_call(is_leader)
+        if not is_leader:
+            flight.done.wait()
+            if flight.exception is not None:
+                raise flight.exception
+            return flight.result
+
+        try:
+            flight.result = function()
+        except BaseException as ex:
+            flight.exception = ex
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+        return flight.result
+
+    async def call_async(
+        self, key: Hashable, coroutine_function: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Returns the result of `coroutine_function`, which is awaited only once for concurrent calls with the same
+        `key` on the same event loop.
+        The shared call runs as a task of its own, so cancelling any of the callers (e.g. because its client
+        disconnected) does not cancel the call for the others.
+        """
+        flight_key = (asyncio.get_running_loop(), key)
+
+        with self._lock:
+            task = self._async_flights.get(flight_key)
+            is_leader = task is None
+            if is_leader:
+                task = asyncio.ensure_future(coroutine_function())
+                self._async_flights[flight_key] = task
+                task.add_done_callback(
+                    lambda finished_task: self._finish_async_flight(
+                        flight_key, finished_task
+                    )
+                )
+                self.calls += 1
+            else:
+                self.coalesced_calls += 1
+
+        count_coalesced_call(is_leader)
+        return await asyncio.shield(task)
+
+    def _finish_async_flight(
+        self, flight_key: Tuple[asyncio.AbstractEventLoop, Hashable], task: asyncio.Task
+    ) -> None:
+        with self._lock:
+            if self._async_flights.get(flight_key) is task:
+                del self._async_flights[flight_key]
+
+        # Mark the exception as retrieved, in case all callers were cancelled before the call failed
+        if not task.cancelled():
+            task.exception()
+
+
+def count_coalesced_call(is_leader: bool) -> None:
+    coalesced_requests.inc(role="leader" if is_leader else "follower")
+
+
+def create_request_key(**parameters) -> str:
+    """Creates a canonical key for a request with the given parameters."""
+    return repr(sorted(parameters.items()))
@@ -0,0 +1,256 @@
+import json
+from datetime import date
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, TextIO, Union
+
+from geojson import Feature, FeatureCollection
+
+from honeybee import conf
+from honeybee.commons import BoundingBox, RawFeatureCollection, SearchFilter
+from honeybee.geometry import (
+    calculate_bounding_box_width,
+    calculate_geohash_level_for_width,
+    create_bounding_box_around_point,
+    round_geometry,
+)
+
+NEWLINE_DELIMITED_FILE_SUFFIXES = (".ndjson", ".jsonl")
+READ_CHUNK_SIZE = 1024 * 1024
+JSON_WHITESPACE = " \t\n\r"
+
+
+def load_features_from_file(path: str) -> Iterator[dict]:
+    """Yields the GeoJSON Features of a FeatureCollection file or of a newline-delimited file with one Feature
+    per line.
+    """
+    path = Path(path)
+
+    with path.open(encoding="utf-8") as geojson_file:
+        if path.suffix in NEWLINE_DELIMITED_FILE_SUFFIXES:
+            for line in geojson_file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from iterate_feature_collection(geojson_file)
+
+
+def iterate_feature_collection(geojson_file: TextIO) -> Iterator[dict]:
+    """Yields the Features of the FeatureCollection in the given file one by one.
+    Only a single Feature (and a chunk of the file) is held in memory at any time, so files of any size can be read.
+    """
+    reader = StreamingJSONReader(geojson_file)
+    reader.expect("{")
+
+    if reader.skip("}"):
+        return
+
+    while True:
+        member_name = reader.read_value()
+        reader.expect(":")
+
+        if member_name == "features":
+            reader.expect("[")
+            if not reader.skip("]"):
+                while True:
+                    yield reader.read_value()
+                    if reader.skip("]"):
+                        break
+                    reader.expect(",")
+        else:
+            reader.read_value()
+
+        if reader.skip("}"):
+            return
+        reader.expect(",")
+
+
+class StreamingJSONReader:
+    """Reads consecutive JSON values and structural characters from a file, chunk by chunk."""
+
+    def __init__(self, json_file: TextIO, chunk_size: int = READ_CHUNK_SIZE):
+        self._file = json_file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._is_exhausted = False
+
+    def skip(self, character: str) -> bool:
+        """Consumes the next non-whitespace `character`, if it is the given one."""
+        if self._peek() != character:
+            return False
+
+        self._position += 1
+        return True
+
+    def expect(self, character: str) -> None:
+        """Consumes the next non-whitespace character and raises a ValueError, if it is not the given one."""
+        if not self.skip(character):
+            raise ValueError(
+                f"Expected '{character}' but found '{self._peek()}' in the JSON file!"
+            )
+
+    def read_value(self) -> Any:
+        """Decodes the next JSON value."""
+        self._peek()
+
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if not self._read_chunk():
+                    raise
+                continue
+
+            # A number may continue in the next chunk
+            if end == len(self._buffer) and self._read_chunk():
+                continue
+
+            self._position = end
+            return value
+
+    def _peek(self) -> str:
+        """Returns the next non-whitespace character without consuming it. Returns "" at the end of the file."""
+        while True:
+            while (
+                self._position < len(self._buffer)
+                and self._buffer[self._position] in JSON_WHITESPACE
+            ):
+                self._position += 1
+
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._read_chunk():
+                return ""
+
+    def _read_chunk(self) -> bool:
+        """Appends the next chunk of the file to the buffer and drops the consumed part of the buffer.
+        Returns False, if the end of the file was reached.
+        """
+        if self._is_exhausted:
+            return False
+
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._is_exhausted = True
+            return False
+
+        self._buffer = self._buffer[self._position :] + chunk
+        self._position = 0
+        return True
+
+
+def extract_taxa(feature: dict) -> List[str]:
+    """Returns the distinct search terms (i.e. taxa) in the properties of the given GeoJSON Feature."""
+    taxa = (feature.get("properties") or {}).get(
+        conf.MAP_VIEWER_SOLR_TERM_SEARCH_FIELD_NAME
+    ) or []
+
+    if isinstance(taxa, str):
+        taxa = [taxa]
+
+    return list(dict.fromkeys(taxa))
+
+
+def extract_date(feature: dict) -> Optional[date]:
+    """Returns the date in the properties of the given GeoJSON Feature.
+    Only the date part of an ISO 8601 string (e.g. "1836-01-01" or "1836-01-01T00:00:00Z") is read. Returns None,
+    if the Feature has no valid date.
+    """
+    value = (feature.get("properties") or {}).get(conf.GEOJSON_PROPERTY_NAME_DATE)
+
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def is_projection_requested(search_filter: Optional[SearchFilter]) -> bool:
+    """Checks whether the Features have to be reduced to some properties or rounded coordinates."""
+    return search_filter is not None and (
+        search_filter.return_fields is not None
+        or search_filter.coordinate_precision is not None
+    )
+
+
+def project_feature(feature: dict, search_filter: SearchFilter) -> dict:
+    """Returns a copy of the GeoJSON Feature holding only the properties in `return_fields` and coordinates rounded
+    to `coordinate_precision` decimal places, as requested by the `search_filter`.
+    """
+    projected_feature = dict(feature)
+
+    if search_filter.return_fields is not None:
+        return_fields = set(search_filter.return_fields)
+        projected_feature["properties"] = {
+            name: value
+            for name, value in (feature.get("properties") or {}).items()
+            if name in return_fields
+        }
+
+    if search_filter.coordinate_precision is not None:
+        projected_feature["geometry"] = round_geometry(
+            feature.get("geometry"), search_filter.coordinate_precision
+        )
+
+    return projected_feature
+
+
+def project_serialized_feature(
+    feature: Union[str, bytes], search_filter: Optional[SearchFilter]
+) -> Union[str, bytes]:
+    """Applies the projection of the `search_filter` to a serialized Feature. Without a projection, the Feature is
+    returned as it is, without being decoded.
+    """
+    if not is_projection_requested(search_filter):
+        return feature
+
+    return json.dumps(project_feature(json.loads(feature), search_filter))
+
+
+def create_spatial_data(
+    features: Iterable[Union[str, bytes]], search_filter: Optional[SearchFilter]
+) -> Union[FeatureCollection, RawFeatureCollection]:
+    """Collects the serialized Features of a result page.
+    If a projection is requested, the Features are decoded once to apply it. Otherwise, they are returned undecoded
+    in a RawFeatureCollection, if the GeoJSON passthrough is enabled.
+    """
+    if is_projection_requested(search_filter):
+        return FeatureCollection(
+            [
+                Feature(**project_feature(json.loads(feature), search_filter))
+                for feature in features
+            ]
+        )
+
+    spatial_data = RawFeatureCollection(list(features))
+    if not conf.MAP_VIEWER_GEOJSON_PASSTHROUGH:
+        spatial_data = spatial_data.to_feature_collection()
+
+    return spatial_data
+
+
+def create_search_area_bounding_box(search_filter: SearchFilter) -> BoundingBox:
+    """Returns the bounding box of the search area: the bounding box of the filter or, if not given, the bounding box
+    of the search circle.
+    """
+    if search_filter.bounding_box is not None:
+        return search_filter.bounding_box
+
+    return create_bounding_box_around_point(
+        center=search_filter.spatial_center or conf.default_spatial_center,
+        radius=search_filter.radius or conf.SOLR_DEFAULT_VALUE_RADIUS,
+    )
+
+
+def calculate_spread_geohash_level(search_filter: SearchFilter) -> int:
+    """Returns the geohash level of the grid cells a spread search returns at most `search_filter.spread` Features
+    of. About `conf.MAP_VIEWER_SPREAD_CELLS_PER_VIEWPORT` cells span the width of the search area, but the level is
+    at most `conf.MAP_VIEWER_SOLR_GEOHASH_CELL_LEVELS`.
+    """
+    bounding_box = create_search_area_bounding_box(search_filter)
+    level = calculate_geohash_level_for_width(
+        calculate_bounding_box_width(bounding_box)
+        / conf.MAP_VIEWER_SPREAD_CELLS_PER_VIEWPORT
+    )
+
+    return min(level, conf.MAP_VIEWER_SOLR_GEOHASH_CELL_LEVELS)
@@ -0,0 +1,392 @@
+import bisect
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import (
+    BinaryIO,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from honeybee import conf
+from honeybee.databases.features import extract_date, extract_taxa
+from honeybee.databases.memory import (
+    InMemorySpatialDatabase,
+    calculate_grid_size,
+    create_date_index,
+    create_grid_index,
+    create_taxa_index,
+)
+from honeybee.geometry import extract_representative_point
+
+logger = logging.getLogger(__name__)
+
+FEATURE_STORE_MAGIC = b"HBFSTORE"
+FEATURE_STORE_VERSION = 1
+# The magic is followed by the length of the JSON header
+FEATURE_STORE_PREAMBLE = struct.Struct("<8sQ")
+FEATURE_STORE_SECTION_ALIGNMENT = 8
+GRID_CELL_SIZE_IN_DEGREES = InMemorySpatialDatabase.GRID_CELL_SIZE_IN_DEGREES
+
+FEATURE_STORE_SECTION_DATA_TYPES = {
+    "latitudes": "<f8",
+    "longitudes": "<f8",
+    "grid_cell_ids": "<i8",
+    "grid_positions": "<i8",
+    "date_positions": "<i8",
+    "sorted_dates": "<M8[D]",
+    "id_offsets": "<i8",
+    "ids": "u1",
+    "taxon_offsets": "<i8",
+    "taxa": "u1",
+    "posting_offsets": "<i8",
+    "postings": "<i8",
+    "feature_offsets": "<i8",
+    "features": "u1",
+}
+
+
+class MemoryMappedSpatialDatabase(InMemorySpatialDatabase):
+    """Searches a feature store file built by `build_feature_store`, without loading it into memory.
+
+    The store holds the same coordinate arrays and indexes as the in-memory database, followed by a blob of the
+    encoded GeoJSON Features. All of them are read directly from the memory-mapped file, so the database is ready
+    right after opening the file and all processes reading the same file share the operating system's page cache.
+    Features are returned as bytes sliced from the blob, without being decoded.
+    """
+
+    def __init__(self, database_configuration: dict):
+        if np is None:
+            raise ImportError(
+                "The memory-mapped spatial database requires NumPy. Install it with: pip install .['memory']"
+            )
+
+        path_parameter_name = conf.DATABASE_PATH_CONFIGURATION_NAME
+
+        if (
+            database_configuration is None
+            or database_configuration.get(path_parameter_name) is None
+        ):
+            raise ValueError("The path to the feature store has to be set!")
+
+        self.path = database_configuration[path_parameter_name]
+        with open(self.path, "rb") as store_file:
+            self._mapped_file = mmap.mmap(
+                store_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+
+        self._map_sections(read_feature_store_header(self._mapped_file))
+
+    def _map_sections(self, header: dict) -> None:
+        if header["grid_cell_size"] != self.GRID_CELL_SIZE_IN_DEGREES:
+            raise ValueError(
+                "The feature store was built with another grid cell size. Rebuild it!"
+            )
+
+        sections = {
+            name: np.frombuffer(
+                self._mapped_file,
+                dtype=FEATURE_STORE_SECTION_DATA_TYPES[name],
+                count=count,
+                offset=offset,
+            )
+            for name, (offset, count) in header["sections"].items()
+        }
+
+        self._latitudes = sections["latitudes"]
+        self._longitudes = sections["longitudes"]
+        self._grid_row_count = header["grid_row_count"]
+        self._grid_column_count = header["grid_column_count"]
+        self._grid_cell_ids = sections["grid_cell_ids"]
+        self._grid_positions = sections["grid_positions"]
+        self._date_positions = sections["date_positions"]
+        self._sorted_dates = sections["sorted_dates"]
+        self._features = MappedStrings(
+            sections["feature_offsets"], sections["features"]
+        )
+        self._positions_by_id = SortedStringIndex(
+            MappedStrings(sections["id_offsets"], sections["ids"], decode=True)
+        )
+        self._positions_by_taxon = PostingLists(
+            SortedStringIndex(
+                MappedStrings(sections["taxon_offsets"], sections["taxa"], decode=True)
+            ),
+            sections["posting_offsets"],
+            sections["postings"],
+        )
+
+
+class MappedStrings(Sequence):
+    """A sequence of strings stored back to back in a byte array.
+    The string at index i spans the bytes from `offsets[i]` to `offsets[i + 1]`.
+    """
+
+    def __init__(self, offsets: "np.ndarray", data: "np.ndarray", decode: bool = False):
+        self._offsets = offsets
+        self._data = data
+        self._decode = decode
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+
+        value = self._data[self._offsets[index] : self._offsets[index + 1]].tobytes()
+        return value.decode("utf-8") if self._decode else value
+
+
+class SortedStringIndex(Mapping):
+    """Maps the strings of an ascending sequence of strings to their index."""
+
+    def __init__(self, sorted_strings: Sequence):
+        self._sorted_strings = sorted_strings
+
+    def __getitem__(self, key: str) -> int:
+        index = bisect.bisect_left(self._sorted_strings, key)
+        if index == len(self._sorted_strings) or self._sorted_strings[index] != key:
+            raise KeyError(key)
+
+        return index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._sorted_strings)
+
+    def __len__(self) -> int:
+        return len(self._sorted_strings)
+
+
+class PostingLists(Mapping):
+    """Maps search terms to the ascending positions of the Features holding them."""
+
+    def __init__(
+        self,
+        term_index: SortedStringIndex,
+        posting_offsets: "np.ndarray",
+        postings: "np.ndarray",
+    ):
+        self._term_index = term_index
+        self._posting_offsets = posting_offsets
+        self._postings = postings
+
+    def __getitem__(self, term: str) -> "np.ndarray":
+        index = self._term_index[term]
+        return self._postings[
+            self._posting_offsets[index] : self._posting_offsets[index + 1]
+        ]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._term_index)
+
+    def __len__(self) -> int:
+        return len(self._term_index)
+
+
+def build_feature_store(path: str, features: Iterable[dict]) -> int:
+    """Writes the given GeoJSON Features and their indexes into a feature store file at `path`.
+    The Features are read one after another and encoded into a temporary file next to `path`, so only their IDs,
+    coordinates, dates and taxa are held in memory while the indexes are built. The store file is replaced
+    atomically, so processes still mapping a previous version of the file are not disturbed.
+    Features without an ID or a geometry are logged and left out. Returns the number of stored Features.
+    """
+    if np is None:
+        raise ImportError(
+            "Building a feature store requires NumPy. Install it with: pip install .['memory']"
+        )
+
+    with tempfile.TemporaryFile(dir=Path(path).parent) as encoded_features_file:
+        entries = encode_features(features, encoded_features_file)
+        entries.sort(key=lambda entry: entry.id)
+
+        latitudes = np.array([entry.latitude for entry in entries], dtype=np.float64)
+        longitudes = np.array([entry.longitude for entry in entries], dtype=np.float64)
+        grid_cell_ids, grid_positions = create_grid_index(
+            latitudes, longitudes, GRID_CELL_SIZE_IN_DEGREES
+        )
+        date_positions, sorted_dates = create_date_index(
+            [entry.date for entry in entries]
+        )
+        positions_by_taxon = create_taxa_index(entry.taxa for entry in entries)
+
+        taxa = sorted(positions_by_taxon)
+        id_offsets, ids = pack_strings([entry.id for entry in entries])
+        taxon_offsets, encoded_taxa = pack_strings(taxa)
+        postings = [positions_by_taxon[taxon] for taxon in taxa]
+
+        sections = {
+            "latitudes": latitudes,
+            "longitudes": longitudes,
+            "grid_cell_ids": grid_cell_ids,
+            "grid_positions": grid_positions,
+            "date_positions": date_positions,
+            "sorted_dates": sorted_dates,
+            "id_offsets": id_offsets,
+            "ids": ids,
+            "taxon_offsets": taxon_offsets,
+            "taxa": encoded_taxa,
+            "posting_offsets": np.cumsum([0] + [len(posting) for posting in postings]),
+            "postings": np.concatenate([np.empty(0, dtype=np.int64)] + postings),
+            "feature_offsets": np.cumsum([0] + [entry.length for entry in entries]),
+        }
+        sections = {
+            name: np.ascontiguousarray(
+                section, dtype=FEATURE_STORE_SECTION_DATA_TYPES[name]
+            )
+            for name, section in sections.items()
+        }
+        section_sizes = {name: len(section) for name, section in sections.items()}
+        # The encoded Features are copied from the temporary file instead of being held in an array
+        section_sizes["features"] = int(sections["feature_offsets"][-1])
+
+        grid_row_count, grid_column_count = calculate_grid_size(
+            GRID_CELL_SIZE_IN_DEGREES
+        )
+        header = {
+            "version": FEATURE_STORE_VERSION,
+            "feature_count": len(entries),
+            "grid_cell_size": GRID_CELL_SIZE_IN_DEGREES,
+            "grid_row_count": grid_row_count,
+            "grid_column_count": grid_column_count,
+            "sections": {},
+        }
+        # The section offsets depend on the header length, which depends on the offsets. Hence, the header is
+        # padded to a fixed length.
+        header_length = 4096
+        offset = align(FEATURE_STORE_PREAMBLE.size + header_length)
+        for name, size in section_sizes.items():
+            header["sections"][name] = [offset, size]
+            item_size = np.dtype(FEATURE_STORE_SECTION_DATA_TYPES[name]).itemsize
+            offset = align(offset + size * item_size)
+
+        encoded_header = json.dumps(header).encode("utf-8").ljust(header_length)
+        if len(encoded_header) > header_length:
+            raise ValueError("The feature store header is too long!")
+
+        temporary_path = Path(f"{path}.tmp")
+        with temporary_path.open("wb") as store_file:
+            store_file.write(
+                FEATURE_STORE_PREAMBLE.pack(FEATURE_STORE_MAGIC, header_length)
+            )
+            store_file.write(encoded_header)
+
+            for name, section in sections.items():
+                store_file.write(
+                    b"\0" * (header["sections"][name][0] - store_file.tell())
+                )
+                store_file.write(section.tobytes())
+
+            store_file.write(
+                b"\0" * (header["sections"]["features"][0] - store_file.tell())
+            )
+            for entry in entries:
+                encoded_features_file.seek(entry.offset)
+                store_file.write(encoded_features_file.read(entry.length))
+
+            # Empty sections at the end of the file must still be within the mapped file
+            store_file.write(b"\0" * (offset - store_file.tell()))
+
+    os.replace(temporary_path, path)
+
+    return header["feature_count"]
+
+
+@dataclass
+class FeatureStoreEntry:
+    """The data of a Feature needed to build the indexes of a feature store, and the location of the encoded
+    Feature in a temporary file.
+    """
+
+    id: str
+    latitude: float
+    longitude: float
+    date: Optional[date]
+    taxa: List[str]
+    offset: int
+    length: int
+
+
+def encode_features(
+    features: Iterable[dict], encoded_features_file: BinaryIO
+) -> List[FeatureStoreEntry]:
+    """Writes the given GeoJSON Features encoded back to back into `encoded_features_file`.
+    Features without an ID or a geometry are logged and left out.
+    """
+    entries = []
+    offset = 0
+    for feature in features:
+        point = extract_representative_point(feature.get("geometry"))
+        if feature.get("id") is None or point is None:
+            logger.warning("Skipping a GeoJSON Feature without an ID or a geometry.")
+            continue
+
+        encoded_feature = json.dumps(feature).encode("utf-8")
+        encoded_features_file.write(encoded_feature)
+        entries.append(
+            FeatureStoreEntry(
+                id=str(feature["id"]),
+                latitude=point.latitude,
+                longitude=point.longitude,
+                date=extract_date(feature),
+                taxa=extract_taxa(feature),
+                offset=offset,
+                length=len(encoded_feature),
+            )
+        )
+        offset += len(encoded_feature)
+
+    return entries
+
+
+def read_feature_store_header(mapped_file: mmap.mmap) -> dict:
+    """Reads and checks the header of a memory-mapped feature store."""
+    magic, header_length = FEATURE_STORE_PREAMBLE.unpack_from(mapped_file, 0)
+    if magic != FEATURE_STORE_MAGIC:
+        raise ValueError("The file is not a feature store!")
+
+    header = json.loads(
+        mapped_file[
+            FEATURE_STORE_PREAMBLE.size : FEATURE_STORE_PREAMBLE.size + header_length
+        ]
+    )
+    if header["version"] != FEATURE_STORE_VERSION:
+        raise ValueError(
+            f"The feature store has version {header['version']}, but version {FEATURE_STORE_VERSION} is required. "
+            "Rebuild it!"
+        )
+
+    return header
+
+
+def pack_strings(strings: List[str]) -> tuple:
+    """Encodes the given strings back to back. Returns the offsets of the strings and the encoded bytes."""
+    encoded_strings = [string.encode("utf-8") for string in strings]
+    offsets = np.cumsum([0] + [len(string) for string in encoded_strings])
+
+    return offsets, np.frombuffer(b"".join(encoded_strings), dtype=np.uint8)
+
+
+def align(offset: int) -> int:
+    return (
+        -(-offset // FEATURE_STORE_SECTION_ALIGNMENT) * FEATURE_STORE_SECTION_ALIGNMENT
+    )
@@ -0,0 +1,482 @@
+import json
+import logging
+import math
+import time
+from datetime import date
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from geojson import FeatureCollection
+from honeybee import conf
+from honeybee.commons import (
+    BoundingBox,
+    DateSpan,
+    Point,
+    Query,
+    RawFeatureCollection,
+    SearchFilter,
+    SearchResult,
+    UserInputException,
+)
+from honeybee.databases.features import (
+    calculate_spread_geohash_level,
+    create_spatial_data,
+    extract_date,
+    extract_taxa,
+    load_features_from_file,
+    project_serialized_feature,
+)
+from honeybee.databases.spatial import SpatialDatabase
+from honeybee.geometry import (
+    EARTH_RADIUS_KILOMETERS,
+    calculate_geohash_bits,
+    create_bounding_box_around_point,
+    extract_representative_point,
+    split_bounding_box_at_antimeridian,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class InMemorySpatialDatabase(SpatialDatabase):
+    """Holds all spatial data in the memory of the process and answers searches without any network request.
+
+    The GeoJSON Features are loaded once from the file given as `path` in the database configuration. Their
+    coordinates are held in NumPy arrays, which are indexed by a regular grid. The taxa and dates of the Features are
+    held in inverted indexes. The Features are ordered by ID, like in a Solr search sorted by `id asc`.
+
+    Unlike the Solr `bbox` filter, a search circle is matched exactly (by haversine distance). Search terms have
+    to match a taxon of a Feature exactly.
+    """
+
+    GRID_CELL_SIZE_IN_DEGREES = 1.0
+
+    def __init__(self, database_configuration: dict):
+        if np is None:
+            raise ImportError(
+                "The in-memory spatial database requires NumPy. Install it with: pip install .['memory']"
+            )
+
+        path_parameter_name = conf.DATABASE_PATH_CONFIGURATION_NAME
+
+        if (
+            database_configuration is None
+            or database_configuration.get(path_parameter_name) is None
+        ):
+            raise ValueError("The path to the spatial data has to be set!")
+
+        self.load_features(
+            load_features_from_file(database_configuration[path_parameter_name])
+        )
+
+    @classmethod
+    def from_features(cls, features: Iterable[dict]) -> "InMemorySpatialDatabase":
+        """Creates a database holding the given GeoJSON Features, without reading a file."""
+        spatial_database = cls.__new__(cls)
+        spatial_database.load_features(features)
+        return spatial_database
+
+    def load_features(self, features: Iterable[dict]) -> None:
+        """Replaces all data of the database with the given GeoJSON Features and rebuilds the indexes.
+        Features without an ID or a geometry are logged and left out.
+        """
+        entries = []
+        for feature in features:
+            point = extract_representative_point(feature.get("geometry"))
+            if feature.get("id") is None or point is None:
+                logger.warning(
+                    "Skipping a GeoJSON Feature without an ID or a geometry."
+                )
+                continue
+
+            entries.append((str(feature["id"]), point, feature))
+
+        entries.sort(key=lambda entry: entry[0])
+
+        self._ids = [location_id for location_id, _, _ in entries]
+        self._positions_by_id = {
+            location_id: position for position, location_id in enumerate(self._ids)
+        }
+        self._features = [json.dumps(feature) for _, _, feature in entries]
+        self._latitudes = np.array(
+            [point.latitude for _, point, _ in entries], dtype=np.float64
+        )
+        self._longitudes = np.array(
+            [point.longitude for _, point, _ in entries], dtype=np.float64
+        )
+        self._build_grid_index()
+        self._build_taxa_index([feature for _, _, feature in entries])
+        self._build_date_index([feature for _, _, feature in entries])
+
+    def get_data_for_location_id(self, location_id: str) -> FeatureCollection:
+        """Returns a GeoJSON FeatureCollection holding a single Feature with the given `location_id`.
+        If no location can be found with the given `location_id`, the Feature list in the FeatureCollection
+        is empty.
+        """
+        return self.get_data_for_location_ids([location_id])
+
+    def get_data_for_location_ids(self, location_ids: List[str]) -> FeatureCollection:
+        """Returns a GeoJSON FeatureCollection holding the Features with the given `location_ids`.
+        IDs without a location are left out.
+        """
+        positions = [
+            self._positions_by_id[location_id]
+            for location_id in location_ids
+            if location_id in self._positions_by_id
+        ]
+        return RawFeatureCollection(
+            [self._features[position] for position in positions]
+        ).to_feature_collection()
+
+    def search_locations_related_to_query(
+        self, query: Query, search_filter: SearchFilter = None
+    ) -> SearchResult:
+        """Returns a SearchResult holding all Features fitting the given parameters, one page at a time.
+        If the GeoJSON passthrough is enabled and no projection is requested, the Features are returned undecoded in a
+        RawFeatureCollection.
+
+        The cursor of the SearchResult is None, if there are no further result pages. Samples are a single page.
+        """
+        start_time = time.perf_counter()
+        search_filter = SearchFilter() if search_filter is None else search_filter
+
+        positions = self.find_positions(query, search_filter)
+        total_hits = len(positions)
+        if search_filter.spread is not None:
+            positions = self.spread_positions(positions, search_filter)
+
+        next_cursor = None
+        if search_filter.sample_size is not None:
+            page_positions = sample_positions(positions, search_filter)
+        else:
+            first_position = parse_cursor(search_filter.cursor)
+            hits_per_page = (
+                search_filter.hits_per_page or conf.SOLR_DEFAULT_VALUE_HITS_PER_PAGE
+            )
+            page_start = np.searchsorted(positions, first_position)
+            page_positions = positions[page_start : page_start + hits_per_page]
+
+            if page_start + hits_per_page < len(positions):
+                next_cursor = str(int(page_positions[-1]) + 1)
+
+        spatial_data = create_spatial_data(
+            (self._features[position] for position in page_positions), search_filter
+        )
+
+        return SearchResult(
+            spatial_data=spatial_data,
+            next_cursor=next_cursor,
+            total_hits=total_hits,
+            query_time=round((time.perf_counter() - start_time) * 1000),
+        )
+
+    def stream_locations_related_to_query(
+        self, query: Query, search_filter: SearchFilter = None
+    ) -> Iterator[str]:
+        """Yields the serialized GeoJSON Features of all locations fitting the given parameters.
+        For sampled searches, only the sample is yielded.
+        """
+        search_filter = SearchFilter() if search_filter is None else search_filter
+        positions = self.find_positions(query, search_filter)
+        if search_filter.spread is not None:
+            positions = self.spread_positions(positions, search_filter)
+
+        if search_filter.sample_size is not None:
+            positions = sample_positions(positions, search_filter)
+        else:
+            first_position = parse_cursor(search_filter.cursor)
+            positions = positions[np.searchsorted(positions, first_position) :]
+
+        for position in positions:
+            yield project_serialized_feature(self._features[position], search_filter)
+
+    def find_positions(self, query: Query, search_filter: SearchFilter) -> "np.ndarray":
+        """Returns the ascending positions of all Features fitting the given query and filter data.
+        The Features of a file do not keep track of their changes, hence searches for changes are rejected.
+        """
+        if search_filter.since is not None:
+            raise UserInputException(conf.ERROR_MESSAGE_CHANGE_SEARCH_NOT_SUPPORTED)
+
+        bounding_box = search_filter.bounding_box
+        spatial_center = None
+
+        if bounding_box is None:
+            spatial_center = search_filter.spatial_center or conf.default_spatial_center
+            radius = search_filter.radius or conf.SOLR_DEFAULT_VALUE_RADIUS
+            bounding_box = create_bounding_box_around_point(spatial_center, radius)
+
+        first_part, *other_parts = split_bounding_box_at_antimeridian(bounding_box)
+        positions = self._find_positions_in_bounding_box(first_part)
+        for part in other_parts:
+            positions = np.union1d(
+                positions, self._find_positions_in_bounding_box(part)
+            )
+
+        if spatial_center is not None:
+            distances = calculate_haversine_distances(
+                self._latitudes[positions], self._longitudes[positions], spatial_center
+            )
+            positions = positions[distances <= radius]
+
+        if query.original_raw_string_data:
+            positions = np.intersect1d(
+                positions,
+                self._find_positions_with_taxa(query.original_raw_string_data),
+                assume_unique=True,
+            )
+
+        if search_filter.date_span is not None:
+            positions = np.intersect1d(
+                positions,
+                self._find_positions_in_date_span(search_filter.date_span),
+                assume_unique=True,
+            )
+
+        return positions
+
+    def spread_positions(
+        self, positions: "np.ndarray", search_filter: SearchFilter
+    ) -> "np.ndarray":
+        """Keeps the first `search_filter.spread` of the ascending positions in every geohash cell, like a Solr search
+        grouped by the indexed geohash prefixes.
+        """
+        longitude_bits, latitude_bits = calculate_geohash_bits(
+            calculate_spread_geohash_level(search_filter)
+        )
+        rows = calculate_cell_indexes(
+            self._latitudes[positions], -90, 180, latitude_bits
+        )
+        columns = calculate_cell_indexes(
+            self._longitudes[positions], -180, 360, longitude_bits
+        )
+        cell_ids = rows * 2**longitude_bits + columns
+
+        order = np.argsort(cell_ids, kind="stable")
+        sorted_cell_ids = cell_ids[order]
+        group_starts = np.flatnonzero(
+            np.concatenate([[True], sorted_cell_ids[1:] != sorted_cell_ids[:-1]])
+        )
+        group_sizes = np.diff(np.append(group_starts, len(order)))
+        ranks_in_cell = np.arange(len(order)) - np.repeat(group_starts, group_sizes)
+
+        return positions[np.sort(order[ranks_in_cell < search_filter.spread])]
+
+    def _build_grid_index(self) -> None:
+        """Sorts the Feature positions by the grid cell holding the Feature.
+        The positions of all Features in a row of adjacent cells are hence a contiguous slice of `_grid_positions`.
+        """
+        self._grid_row_count, self._grid_column_count = calculate_grid_size(
+            self.GRID_CELL_SIZE_IN_DEGREES
+        )
+        self._grid_cell_ids, self._grid_positions = create_grid_index(
+            self._latitudes, self._longitudes, self.GRID_CELL_SIZE_IN_DEGREES
+        )
+
+    def _calculate_grid_cells(
+        self, latitudes: "np.ndarray", longitudes: "np.ndarray"
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        return calculate_grid_cells(
+            latitudes, longitudes, self.GRID_CELL_SIZE_IN_DEGREES
+        )
+
+    def _find_positions_in_bounding_box(
+        self, bounding_box: BoundingBox
+    ) -> "np.ndarray":
+        (first_row, last_row), (first_column, last_column) = self._calculate_grid_cells(
+            np.array([bounding_box.minimum_latitude, bounding_box.maximum_latitude]),
+            np.array([bounding_box.minimum_longitude, bounding_box.maximum_longitude]),
+        )
+
+        row_offsets = np.arange(first_row, last_row + 1) * self._grid_column_count
+        slice_starts = np.searchsorted(
+            self._grid_cell_ids, row_offsets + first_column, side="left"
+        )
+        slice_ends = np.searchsorted(
+            self._grid_cell_ids, row_offsets + last_column, side="right"
+        )
+
+        candidates = np.concatenate(
+            [np.empty(0, dtype=np.int64)]
+            + [
+                self._grid_positions[start:end]
+                for start, end in zip(slice_starts, slice_ends)
+            ]
+        )
+
+        latitudes = self._latitudes[candidates]
+        longitudes = self._longitudes[candidates]
+        is_in_bounding_box = (
+            (latitudes >= bounding_box.minimum_latitude)
+            & (latitudes <= bounding_box.maximum_latitude)
+            & (longitudes >= bounding_box.minimum_longitude)
+            & (longitudes <= bounding_box.maximum_longitude)
+        )
+
+        return np.sort(candidates[is_in_bounding_box])
+
+    def _build_taxa_index(self, features: List[dict]) -> None:
+        self._positions_by_taxon = create_taxa_index(
+            extract_taxa(feature) for feature in features
+        )
+
+    def _find_positions_with_taxa(self, taxa: List[str]) -> "np.ndarray":
+        """Returns the positions of all Features holding any of the given `taxa`."""
+        return np.unique(
+            np.concatenate(
+                [np.empty(0, dtype=np.int64)]
+                + [
+                    self._positions_by_taxon[taxon]
+                    for taxon in taxa
+                    if taxon in self._positions_by_taxon
+                ]
+            )
+        )
+
+    def _build_date_index(self, features: List[dict]) -> None:
+        self._date_positions, self._sorted_dates = create_date_index(
+            [extract_date(feature) for feature in features]
+        )
+
+    def _find_positions_in_date_span(self, date_span: DateSpan) -> "np.ndarray":
+        """Returns the ascending positions of all Features dated within the given `date_span`.
+        Features without a date are left out. A missing end of the span defaults to today.
+        """
+        first_date = date_span.first_year or date.min
+        last_date = date_span.last_year or date.today()
+
+        start = np.searchsorted(
+            self._sorted_dates, np.datetime64(first_date, "D"), side="left"
+        )
+        end = np.searchsorted(
+            self._sorted_dates, np.datetime64(last_date, "D"), side="right"
+        )
+
+        return np.sort(self._date_positions[start:end])
+
+
+def calculate_grid_size(cell_size: float) -> Tuple[int, int]:
+    """Returns the number of rows and columns of a grid of cells with the given size (in degrees) covering the
+    earth.
+    """
+    return math.ceil(180 / cell_size), math.ceil(360 / cell_size)
+
+
+def calculate_grid_cells(
+    latitudes: "np.ndarray", longitudes: "np.ndarray", cell_size: float
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Returns the rows and columns of the grid cells holding the given coordinates."""
+    row_count, column_count = calculate_grid_size(cell_size)
+    rows = np.floor((latitudes + 90) / cell_size)
+    columns = np.floor((longitudes + 180) / cell_size)
+    return (
+        np.clip(rows, 0, row_count - 1).astype(np.int64),
+        np.clip(columns, 0, column_count - 1).astype(np.int64),
+    )
+
+
+def create_grid_index(
+    latitudes: "np.ndarray", longitudes: "np.ndarray", cell_size: float
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Returns the ascending grid cell IDs of the given coordinates and the positions of the coordinates sorted by
+    their cell ID.
+    """
+    _, column_count = calculate_grid_size(cell_size)
+    rows, columns = calculate_grid_cells(latitudes, longitudes, cell_size)
+    cell_ids = rows * column_count + columns
+    grid_positions = np.argsort(cell_ids, kind="stable")
+
+    return cell_ids[grid_positions], grid_positions
+
+
+def create_taxa_index(taxa_per_feature: Iterable[Iterable[str]]) -> dict:
+    """Maps every taxon to the ascending positions of the Features holding it."""
+    positions_by_taxon = {}
+    for position, taxa in enumerate(taxa_per_feature):
+        for taxon in taxa:
+            positions_by_taxon.setdefault(taxon, []).append(position)
+
+    return {
+        taxon: np.array(positions, dtype=np.int64)
+        for taxon, positions in positions_by_taxon.items()
+    }
+
+
+def create_date_index(dates: List[Optional[date]]) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Returns the positions of all dated Features sorted by date and their sorted dates."""
+    dates = np.array(dates, dtype="datetime64[D]")
+    dated_positions = np.flatnonzero(~np.isnat(dates))
+    date_positions = dated_positions[np.argsort(dates[dated_positions], kind="stable")]
+
+    return date_positions, dates[date_positions]
+
+
+def calculate_cell_indexes(
+    coordinates: "np.ndarray", minimum: float, extent: float, bits: int
+) -> "np.ndarray":
+    """Returns the indexes of the cells holding the `coordinates`, if the range is split into 2 to the power of
+    `bits` cells of equal size.
+    """
+    cell_count = 2**bits
+    cells = np.floor((coordinates - minimum) / extent * cell_count)
+    return np.clip(cells, 0, cell_count - 1).astype(np.int64)
+
+
+def sample_positions(
+    positions: "np.ndarray", search_filter: SearchFilter
+) -> "np.ndarray":
+    """Returns `search_filter.sample_size` randomly chosen positions in ascending order.
+    The same `search_filter.sample_seed` always chooses the same positions of the same Features.
+    """
+    seed = search_filter.sample_seed
+    if seed is None:
+        seed = conf.SOLR_DEFAULT_VALUE_SAMPLE_SEED
+
+    sample_size = min(search_filter.sample_size, len(positions))
+    chosen_indexes = np.random.default_rng(seed).choice(
+        len(positions), size=sample_size, replace=False
+    )
+
+    return positions[np.sort(chosen_indexes)]
+
+
+def parse_cursor(cursor: Optional[str]) -> int:
+    """Returns the first Feature position of the result page the `cursor` points to."""
+    if cursor is None or cursor == conf.SOLR_DEFAULT_VALUE_CURSOR:
+        return 0
+
+    try:
+        position = int(cursor)
+    except ValueError:
+        position = -1
+
+    if position < 0:
+        raise UserInputException(
+            conf.ERROR_MESSAGE_INVALID_RESUME_TOKEN.format(resume_token=cursor)
+        )
+
+    return position
+
+
+def calculate_haversine_distances(
+    latitudes: "np.ndarray", longitudes: "np.ndarray", center: Point
+) -> "np.ndarray":
+    """Returns the great-circle distances (in kilometers) of all given coordinates to the `center`."""
+    latitudes = np.radians(np.asarray(latitudes, dtype=np.float64))
+    center_latitude = math.radians(center.latitude)
+    latitude_deltas = latitudes - center_latitude
+    longitude_deltas = np.radians(
+        np.asarray(longitudes, dtype=np.float64) - center.longitude
+    )
+
+    haversines = (
+        np.sin(latitude_deltas / 2) ** 2
+        + np.cos(latitudes)
+        * math.cos(center_latitude)
+        * np.sin(longitude_deltas / 2) ** 2
+    )
+
+    return 2 * EARTH_RADIUS_KILOMETERS * np.arcsin(np.sqrt(np.clip(haversines, 0, 1)))
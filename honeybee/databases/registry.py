@@ -0,0 +1,93 @@
+import atexit
+import os
+import threading
+from typing import Dict, Tuple
+
+from django.utils.module_loading import import_string
+
+from honeybee import conf
+from honeybee.databases.spatial import SpatialDatabase
+
+
+class SpatialDatabaseRegistry:
+    """Holds a single SpatialDatabase instance per database configuration and process.
+
+    All threads of a process share the same instance (and hence the same connection pool).
+    When the registry is used in a forked process (e.g. a gunicorn worker), all instances inherited from the
+    parent process are discarded, because open connections must not be shared between processes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._databases: Dict[Tuple, SpatialDatabase] = {}
+        self._process_id = os.getpid()
+
+    def get(self, database_configuration: dict) -> SpatialDatabase:
+        """Returns the SpatialDatabase for the given `database_configuration`.
+        The database is created on the first request for the configuration.
+        """
+        key = create_database_configuration_key(database_configuration)
+
+        with self._lock:
+            self._discard_databases_of_parent_process()
+
+            spatial_database = self._databases.get(key)
+            if spatial_database is None:
+                spatial_database = create_spatial_database(database_configuration)
+                self._databases[key] = spatial_database
+
+        return spatial_database
+
+    def clear(self) -> None:
+        """Closes and removes all databases of this registry."""
+        with self._lock:
+            databases = list(self._databases.values())
+            self._databases.clear()
+
+        for spatial_database in databases:
+            spatial_database.close()
+
+    def _discard_databases_of_parent_process(self) -> None:
+        current_process_id = os.getpid()
+        if current_process_id != self._process_id:
+            self._databases.clear()
+            self._process_id = current_process_id
+
+
+spatial_database_registry = SpatialDatabaseRegistry()
+# Closes the connections and client threads of the databases when the process shuts down.
+atexit.register(spatial_database_registry.clear)
+
+
+def get_spatial_database() -> SpatialDatabase:
+    """Returns the process-wide SpatialDatabase for the configuration in the Django settings."""
+    return spatial_database_registry.get(create_default_database_configuration())
+
+
+def create_default_database_configuration() -> dict:
+    """Creates the database configuration from the Django settings."""
+    return {
+        conf.DATABASE_BACKEND_CONFIGURATION_NAME: conf.MAP_VIEWER_SPATIAL_DATABASE_BACKEND,
+        conf.DATABASE_PATH_CONFIGURATION_NAME: conf.MAP_VIEWER_SPATIAL_DATABASE_PATH,
+        conf.DATABASE_HOSTNAME_CONFIGURATION_NAME: conf.MAP_VIEWER_SOLR_SPATIAL_DATABASE_HOSTNAME,
+        conf.DATABASE_POOL_SIZE_CONFIGURATION_NAME: conf.MAP_VIEWER_SOLR_CONNECTION_POOL_SIZE,
+        conf.DATABASE_KEEP_ALIVE_CONFIGURATION_NAME: conf.MAP_VIEWER_SOLR_CONNECTION_KEEP_ALIVE,
+        conf.DATABASE_CONNECT_TIMEOUT_CONFIGURATION_NAME: conf.MAP_VIEWER_SOLR_CONNECT_TIMEOUT,
+        conf.DATABASE_READ_TIMEOUT_CONFIGURATION_NAME: conf.MAP_VIEWER_SOLR_READ_TIMEOUT,
+    }
+
+
+def create_spatial_database(database_configuration: dict) -> SpatialDatabase:
+    """Creates an instance of the SpatialDatabase class given by its dotted path as `backend` in the
+    `database_configuration`. If no backend is given, the one set in the Django settings is used.
+    """
+    backend_path = database_configuration.get(
+        conf.DATABASE_BACKEND_CONFIGURATION_NAME,
+        conf.MAP_VIEWER_SPATIAL_DATABASE_BACKEND,
+    )
+    return import_string(backend_path)(database_configuration)
+
+
+def create_database_configuration_key(database_configuration: dict) -> Tuple:
+    """Creates a hashable key from the given `database_configuration`."""
+    return tuple(sorted(database_configuration.items()))
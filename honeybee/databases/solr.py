@@ -1,19 +1,60 @@
+import asyncio
+import dataclasses
 import datetime
 import json
-from typing import Any, List, Optional
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Union
 
 from biofid.data.query import escape_solr_input
-from geojson import Feature, FeatureCollection
-from pysolr import Solr
+from geojson import Feature, FeatureCollection, Point as GeoJsonPoint
+from pysolr import Results, Solr, SolrError
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
 
 from honeybee import conf
 from honeybee.commons import (
+    BoundingBox,
     Query,
+    RawFeatureCollection,
     SearchFilter,
+    SearchResult,
     DateSpan,
     UserInputException,
 )
+from honeybee.databases.coalescing import RequestCoalescer, create_request_key
+from honeybee.databases.features import (
+    calculate_spread_geohash_level,
+    create_search_area_bounding_box,
+    create_spatial_data,
+    is_projection_requested,
+    project_feature,
+    project_serialized_feature,
+)
 from honeybee.databases.spatial import SpatialDatabase
+from honeybee.geometry import (
+    calculate_bounding_box_width,
+    calculate_geohash_level_for_zoom,
+    split_bounding_box_at_antimeridian,
+)
+from honeybee.metrics import solr_duration, solr_errors, solr_requests
+from honeybee.timing import (
+    STAGE_CONVERT,
+    STAGE_QUERY,
+    STAGE_SOLR,
+    STAGE_SOLR_QUERY_TIME,
+    measure,
+    record_timing,
+)
+
+logger = logging.getLogger(__name__)
 
 SOLR_PARAMETER_NAME_FILTER_QUERY = "fq"
 SOLR_PARAMETER_NAME_POINT_COORDINATES = "pt"
@@ -22,6 +63,27 @@ SOLR_PARAMETER_NAME_MAXIMUM_DISTANCE_FROM_POINT = "d"
 SOLR_PARAMETER_NAME_RETURN_FIELDS = "fl"
 SOLR_PARAMETER_NAME_DATE = "date"
 SOLR_PARAMETER_NAME_HITS_PER_PAGE = "rows"
+SOLR_PARAMETER_NAME_SORT = "sort"
+SOLR_PARAMETER_NAME_FACET = "facet"
+SOLR_PARAMETER_NAME_GROUP = "group"
+SOLR_PARAMETER_NAME_GROUP_FIELD = "group.field"
+SOLR_PARAMETER_NAME_GROUP_LIMIT = "group.limit"
+SOLR_PARAMETER_NAME_GROUP_MAIN = "group.main"
+SOLR_PARAMETER_NAME_GROUP_SORT = "group.sort"
+SOLR_PARAMETER_NAME_HEATMAP_FIELD = "facet.heatmap"
+SOLR_PARAMETER_NAME_HEATMAP_GEOMETRY = "facet.heatmap.geom"
+SOLR_PARAMETER_NAME_HEATMAP_GRID_LEVEL = "facet.heatmap.gridLevel"
+SOLR_PARAMETER_NAME_HEATMAP_FORMAT = "facet.heatmap.format"
+
+SOLR_REAL_TIME_GET_HANDLER = "get"
+SOLR_REAL_TIME_GET_SINGLE_DOCUMENT_NAME = "doc"
+
+SOLR_ERROR_KIND_ERROR = "error"
+SOLR_ERROR_KIND_TIMEOUT = "timeout"
+
+SOLR_HEATMAP_FORMAT = "ints2D"
+SOLR_HEATMAP_COUNTS_NAME = "counts_ints2D"
+SOLR_HEATMAPS_RESPONSE_NAME = "facet_heatmaps"
 
 SOLR_NOW_KEYWORD_STRING = "NOW"
 SOLR_STAR_WILDCARD_STRING = "*"
@@ -48,8 +110,34 @@ class SolrSpatialDatabase(SpatialDatabase):
             raise ValueError("The hostname for the spatial database has to be set!")
 
         solr_url = database_configuration[hostname_parameter_name]
+        timeout = (
+            database_configuration.get(
+                conf.DATABASE_CONNECT_TIMEOUT_CONFIGURATION_NAME,
+                conf.MAP_VIEWER_SOLR_CONNECT_TIMEOUT,
+            ),
+            database_configuration.get(
+                conf.DATABASE_READ_TIMEOUT_CONFIGURATION_NAME,
+                conf.MAP_VIEWER_SOLR_READ_TIMEOUT,
+            ),
+        )
+        self._pool_size = database_configuration.get(
+            conf.DATABASE_POOL_SIZE_CONFIGURATION_NAME,
+            conf.MAP_VIEWER_SOLR_CONNECTION_POOL_SIZE,
+        )
+        self._keep_alive = database_configuration.get(
+            conf.DATABASE_KEEP_ALIVE_CONFIGURATION_NAME,
+            conf.MAP_VIEWER_SOLR_CONNECTION_KEEP_ALIVE,
+        )
+        session = create_http_session(
+            pool_size=self._pool_size, keep_alive=self._keep_alive
+        )
 
-        self._solr_db = Solr(solr_url)
+        self._solr_db = Solr(solr_url, timeout=timeout, session=session)
+        self._async_client: Optional["httpx.AsyncClient"] = None
+        self._async_client_event_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_client_thread: Optional[threading.Thread] = None
+        self._async_client_lock = threading.Lock()
+        self.request_coalescer = RequestCoalescer()
         self.search_term_conjunction_string: str = self.DEFAULT_SEARCH_TERM_CONJUNCTION
 
     def get_data_for_location_id(self, location_id: str) -> FeatureCollection:
@@ -57,33 +145,401 @@ class SolrSpatialDatabase(SpatialDatabase):
         If no location can be found with the given `location_id`, the Feature list in the FeatureCollection
         is empty.
         """
-        query_string = f"{self.PARAMETER_LOCATION_ID_STRING}:{location_id}"
-        geojson_feature = self.call_db(query=query_string)
+        return self.get_data_for_location_ids([location_id])
 
-        return convert_json_to_geojson(geojson_feature)
+    def get_data_for_location_ids(self, location_ids: List[str]) -> FeatureCollection:
+        """Returns a GeoJSON FeatureCollection holding the Features with the given `location_ids`.
+        All Features are retrieved with a single request to the Solr real-time get handler, which neither parses a
+        query nor scores the documents. IDs without a location are left out.
+        """
+        documents = self.call_db_for_ids(location_ids)
+        return convert_json_to_geojson(documents)
 
     def search_locations_related_to_query(
         self, query: Query, search_filter: SearchFilter = None
-    ) -> FeatureCollection:
-        """Returns a GeoJSON FeatureCollection of all features in the database fitting the given parameters.
-        If no Features can be found, the Feature list is empty.
+    ) -> SearchResult:
+        """Returns a SearchResult holding a GeoJSON FeatureCollection of all features in the database fitting the
+        given parameters. If no Features can be found, the Feature list is empty.
+        If the GeoJSON passthrough is enabled, the stored Features are returned undecoded in a RawFeatureCollection.
+
+        The cursor of the SearchResult is None, if there are no further result pages.
+        If `since` is set in the `search_filter`, the IDs of Features deleted since then are returned as well.
+        """
+        with measure(STAGE_QUERY):
+            solr_parameters = self.create_solr_parameters(query, search_filter)
+
+        with measure(STAGE_SOLR):
+            results = self.call_db(query=query.search_string, **solr_parameters)
+        record_timing(STAGE_SOLR_QUERY_TIME, results.qtime)
+
+        with measure(STAGE_CONVERT):
+            return convert_results_to_search_result(
+                results,
+                solr_parameters,
+                is_change_search=is_change_search(search_filter),
+                search_filter=search_filter,
+            )
+
+    async def search_locations_related_to_query_async(
+        self, query: Query, search_filter: SearchFilter = None
+    ) -> SearchResult:
+        """Same as `search_locations_related_to_query`, but requests Solr with a non-blocking HTTP client.
+        If httpx is not installed, the blocking request is sent in a separate thread.
+        """
+        if httpx is None:
+            return await super().search_locations_related_to_query_async(
+                query, search_filter
+            )
+
+        with measure(STAGE_QUERY):
+            solr_parameters = self.create_solr_parameters(query, search_filter)
+
+        with measure(STAGE_SOLR):
+            results = await self.call_db_async(
+                query=query.search_string, **solr_parameters
+            )
+        record_timing(STAGE_SOLR_QUERY_TIME, results.qtime)
+
+        with measure(STAGE_CONVERT):
+            return convert_results_to_search_result(
+                results,
+                solr_parameters,
+                is_change_search=is_change_search(search_filter),
+                search_filter=search_filter,
+            )
+
+    def aggregate_locations_related_to_query(
+        self, query: Query, search_filter: SearchFilter = None
+    ) -> SearchResult:
+        """Returns one cluster Feature per cell of a Solr heatmap facet over the viewport.
+        Each Feature is placed in the center of its cell and holds the number of locations in the cell as `count`
+        property. Empty cells are left out. No documents (and hence no stored fields) are retrieved from Solr.
         """
         solr_filter = SearchFilter() if search_filter is None else search_filter
+        # Every location is counted, even if a search would thin them out
+        solr_filter = dataclasses.replace(solr_filter, spread=None)
+        with measure(STAGE_QUERY):
+            solr_parameters = self.create_solr_parameters(query, solr_filter)
+
+            solr_parameters.pop(SOLR_PARAMETER_NAME_CURSOR, None)
+            solr_parameters.pop(SOLR_PARAMETER_NAME_SORT, None)
+            solr_parameters[SOLR_PARAMETER_NAME_HITS_PER_PAGE] = 0
+            solr_parameters.update(create_heatmap_parameters(solr_filter))
+            # Deleted Features are only returned as tombstones, they are never counted
+            not_deleted_filter_query = generate_not_deleted_solr_filter_query()
+            if is_change_search(solr_filter) and not_deleted_filter_query is not None:
+                solr_parameters[SOLR_PARAMETER_NAME_FILTER_QUERY] += (
+                    not_deleted_filter_query,
+                )
+
+        with measure(STAGE_SOLR):
+            results = self.call_db(query=query.search_string, **solr_parameters)
+        record_timing(STAGE_SOLR_QUERY_TIME, results.qtime)
+
+        with measure(STAGE_CONVERT):
+            heatmap = results.facets.get(SOLR_HEATMAPS_RESPONSE_NAME, {}).get(
+                conf.MAP_VIEWER_SOLR_HEATMAP_FIELD_NAME
+            )
+            features = convert_heatmap_to_features(heatmap) if heatmap else []
+
+        return SearchResult(
+            spatial_data=FeatureCollection(features),
+            total_hits=results.hits,
+            query_time=results.qtime,
+        )
+
+    def stream_locations_related_to_query(
+        self, query: Query, search_filter: SearchFilter = None
+    ) -> Iterator[str]:
+        """Yields the serialized GeoJSON Features of all locations fitting the given parameters.
+        The result pages are requested one after another by following the Solr cursor, so only a single page
+        is held in memory at any time. Deleted Features are left out. Sampled and spread searches are a single page.
+        If `conf.MAP_VIEWER_SOLR_FEATURES_FROM_DOC_VALUES` is True, the Features are built from the indexed fields.
+        """
+        solr_parameters = self.create_solr_parameters(query, search_filter)
+
+        geojson_field_name = conf.MAP_VIEWER_SOLR_GEOJSON_DATA_FIELD_NAME
+        is_validated = conf.MAP_VIEWER_GEOJSON_PASSTHROUGH_VALIDATION
+        cursor = solr_parameters.get(SOLR_PARAMETER_NAME_CURSOR)
+
+        while True:
+            results = self.call_db(query=query.search_string, **solr_parameters)
+
+            for document in results:
+                if is_deleted_document(document):
+                    continue
+
+                if conf.MAP_VIEWER_SOLR_FEATURES_FROM_DOC_VALUES:
+                    feature = convert_document_to_feature(document)
+                    if feature is None:
+                        continue
+                    if is_projection_requested(search_filter):
+                        feature = project_feature(feature, search_filter)
+                    yield json.dumps(feature)
+                    continue
+
+                feature = document[geojson_field_name]
+                if not is_validated or is_geojson_feature(feature):
+                    yield project_serialized_feature(feature, search_filter)
+
+            next_cursor = results.nextCursorMark
+            if not results.docs or next_cursor is None or next_cursor == cursor:
+                break
+
+            cursor = next_cursor
+            solr_parameters[SOLR_PARAMETER_NAME_CURSOR] = cursor
+
+    def call_db_for_ids(self, location_ids: List[str]) -> List[dict]:
+        """Requests the documents with the given IDs from the Solr real-time get handler.
+        The serialized Features are always requested, so the detail views hold all properties. Documents of deleted
+        Features are left out.
+        """
+        if not location_ids:
+            return []
+
+        parameters = {
+            self.PARAMETER_LOCATION_ID_STRING: list(location_ids),
+            SOLR_PARAMETER_NAME_RETURN_FIELDS: create_solr_return_fields(
+                is_serialized_feature_requested=True
+            ),
+        }
+        # The real-time get handler ignores the query string, but pysolr requires one
+        with track_solr_request(SOLR_REAL_TIME_GET_HANDLER):
+            results = self._solr_db.search(
+                q=conf.SOLR_DEFAULT_VALUE_QUERY_STRING,
+                search_handler=SOLR_REAL_TIME_GET_HANDLER,
+                **parameters,
+            )
+        documents = extract_documents_from_real_time_get_response(results.raw_response)
+
+        return [document for document in documents if not is_deleted_document(document)]
+
+    def create_solr_parameters(
+        self, query: Query, search_filter: Optional[SearchFilter]
+    ) -> dict:
+        """Returns the Solr parameters for the given `search_filter` and sets the Solr query string of `query`."""
+        solr_filter = SearchFilter() if search_filter is None else search_filter
         solr_parameters = search_filter_to_solr_filter_query(solr_filter)
 
         query.search_string = generate_solr_query_string(
             query, self.search_term_conjunction_string
         )
 
-        geojson_feature_list = self.call_db(
-            query=query.search_string, **solr_parameters
+        return solr_parameters
+
+    def call_db(self, query, **kwargs) -> Results:
+        """Sends the search request to Solr.
+        If coalescing is enabled, concurrent calls with the same parameters share a single request.
+        """
+        if not conf.MAP_VIEWER_SOLR_COALESCE_REQUESTS:
+            return self._search(q=query, **kwargs)
+
+        return self.request_coalescer.call(
+            key=create_request_key(q=query, **kwargs),
+            function=lambda: self._search(q=query, **kwargs),
+        )
+
+    async def call_db_async(self, query, **kwargs) -> Results:
+        """Sends the search request to Solr without blocking the event loop.
+        If coalescing is enabled, concurrent calls with the same parameters share a single request.
+        """
+        if not conf.MAP_VIEWER_SOLR_COALESCE_REQUESTS:
+            return await self._search_async(q=query, **kwargs)
+
+        return await self.request_coalescer.call_async(
+            key=create_request_key(q=query, **kwargs),
+            coroutine_function=lambda: self._search_async(q=query, **kwargs),
+        )
+
+    def _search(self, **parameters) -> Results:
+        with track_solr_request(self._solr_db.search_handler):
+            return self._solr_db.search(**parameters)
+
+    async def _search_async(self, **parameters) -> Results:
+        request_parameters = {
+            name: list(value) if isinstance(value, tuple) else value
+            for name, value in parameters.items()
+        }
+        request_parameters.setdefault("wt", "json")
+
+        with track_solr_request(self._solr_db.search_handler):
+            client, event_loop = self._get_async_client()
+            response = await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(
+                    client.get(
+                        f"{self._solr_db.search_handler}/", params=request_parameters
+                    ),
+                    event_loop,
+                )
+            )
+            if response.is_error:
+                raise SolrError(
+                    f"Solr responded with an error (HTTP {response.status_code}): {response.text}"
+                )
+
+        return Results(response.json())
+
+    def _get_async_client(
+        self,
+    ) -> Tuple["httpx.AsyncClient", asyncio.AbstractEventLoop]:
+        """Returns the pooled HTTP client together with the event loop its requests have to be sent from.
+        Connections can not be shared between event loops, but Django runs every asynchronous view served via WSGI
+        in a new event loop. Hence, the client and its loop are started in a thread of their own on first use, so
+        that all event loops share the same connections until the database is closed.
+        """
+        with self._async_client_lock:
+            if self._async_client is None:
+                connect_timeout, read_timeout = self._solr_db.timeout
+                event_loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=run_event_loop,
+                    args=(event_loop,),
+                    name="solr-async-client",
+                    daemon=True,
+                )
+                thread.start()
+
+                self._async_client = httpx.AsyncClient(
+                    base_url=self._solr_db.url,
+                    timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                    limits=httpx.Limits(
+                        max_connections=self._pool_size,
+                        max_keepalive_connections=(
+                            self._pool_size if self._keep_alive else 0
+                        ),
+                    ),
+                )
+                self._async_client_event_loop = event_loop
+                self._async_client_thread = thread
+
+            return self._async_client, self._async_client_event_loop
+
+    def close(self) -> None:
+        """Closes all pooled connections to Solr and stops the event loop of the asynchronous client."""
+        self._solr_db.get_session().close()
+
+        with self._async_client_lock:
+            client, event_loop, thread = (
+                self._async_client,
+                self._async_client_event_loop,
+                self._async_client_thread,
+            )
+            self._async_client = None
+            self._async_client_event_loop = None
+            self._async_client_thread = None
+
+        if client is not None:
+            asyncio.run_coroutine_threadsafe(client.aclose(), event_loop).result()
+            event_loop.call_soon_threadsafe(event_loop.stop)
+            thread.join()
+
+
+def run_event_loop(event_loop: asyncio.AbstractEventLoop) -> None:
+    """Runs the given event loop in the current thread until it is stopped, then closes it."""
+    asyncio.set_event_loop(event_loop)
+    try:
+        event_loop.run_forever()
+    finally:
+        event_loop.close()
+
+
+@contextmanager
+def track_solr_request(handler: str) -> Iterator[None]:
+    """Counts the Solr request sent within the block, its duration and its failure, if it raises an exception."""
+    start = time.perf_counter()
+    solr_requests.inc(handler=handler)
+    try:
+        yield
+    except Exception as error:
+        kind = (
+            SOLR_ERROR_KIND_TIMEOUT
+            if is_timeout_error(error)
+            else SOLR_ERROR_KIND_ERROR
         )
+        solr_errors.inc(handler=handler, kind=kind)
+        raise
+    finally:
+        solr_duration.observe(time.perf_counter() - start, handler=handler)
+
 
-        return convert_json_to_geojson(geojson_feature_list)
+def is_timeout_error(error: Exception) -> bool:
+    """Returns True for timeouts of the (async) HTTP client. pysolr wraps them into a SolrError with a fixed message."""
+    if httpx is not None and isinstance(error, httpx.TimeoutException):
+        return True
 
-    def call_db(self, query, **kwargs) -> list:
-        response = self._solr_db.search(q=query, **kwargs)
-        return response.docs
+    return isinstance(error, SolrError) and "timed out" in str(error)
+
+
+def create_http_session(pool_size: int, keep_alive: bool) -> Session:
+    """Creates a HTTP session that keeps up to `pool_size` connections per host open for reuse.
+    If `keep_alive` is False, every connection is closed after its request is answered.
+    """
+    session = Session()
+    session.stream = False
+
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+
+    return session
+
+
+def convert_results_to_search_result(
+    results: Results,
+    solr_parameters: dict,
+    is_change_search: bool = False,
+    search_filter: Optional[SearchFilter] = None,
+) -> SearchResult:
+    """Converts the Solr results into a SearchResult.
+    If the GeoJSON passthrough is enabled, the stored Features are returned undecoded in a RawFeatureCollection.
+    If the `search_filter` requests a projection, the Features are decoded once to reduce their properties and round
+    their coordinates. If `conf.MAP_VIEWER_SOLR_FEATURES_FROM_DOC_VALUES` is True, the Features are built from the
+    indexed fields instead of the stored Features.
+    The cursor of the SearchResult is None, if there are no further result pages.
+    If `is_change_search` is True, the IDs of the documents marked as deleted are returned as `deleted_ids` instead of
+    their Features.
+    """
+    documents = results.docs
+    deleted_ids = None
+    if is_change_search:
+        deleted_ids = [
+            document["id"] for document in documents if is_deleted_document(document)
+        ]
+        documents = [
+            document for document in documents if not is_deleted_document(document)
+        ]
+
+    if conf.MAP_VIEWER_SOLR_FEATURES_FROM_DOC_VALUES:
+        spatial_data = convert_documents_to_geojson(documents, search_filter)
+    elif is_projection_requested(search_filter):
+        spatial_data = create_spatial_data(
+            (
+                document[conf.MAP_VIEWER_SOLR_GEOJSON_DATA_FIELD_NAME]
+                for document in documents
+            ),
+            search_filter,
+        )
+    elif conf.MAP_VIEWER_GEOJSON_PASSTHROUGH:
+        spatial_data = convert_json_to_raw_geojson(
+            documents, validate=conf.MAP_VIEWER_GEOJSON_PASSTHROUGH_VALIDATION
+        )
+    else:
+        spatial_data = convert_json_to_geojson(documents)
+
+    next_cursor = results.nextCursorMark
+    if next_cursor == solr_parameters.get(SOLR_PARAMETER_NAME_CURSOR):
+        next_cursor = None
+
+    return SearchResult(
+        spatial_data=spatial_data,
+        next_cursor=next_cursor,
+        total_hits=results.hits,
+        query_time=results.qtime,
+        deleted_ids=deleted_ids,
+    )
 
 
 def search_filter_to_solr_filter_query(search_filter: SearchFilter) -> dict:
@@ -97,8 +553,18 @@ def search_filter_to_solr_filter_query(search_filter: SearchFilter) -> dict:
     Default Solr parameters will be set, if the value was not given.
     """
     solr_search_parameters = {}
+    is_bounding_box_search = search_filter.bounding_box is not None
 
-    if search_filter.spatial_center is not None:
+    if is_bounding_box_search:
+        add_parameter_to_filter_query(
+            parameter_value=generate_bounding_box_solr_filter_query(
+                search_filter.bounding_box
+            ),
+            solr_parameter_name=SOLR_PARAMETER_NAME_FILTER_QUERY,
+            solr_filter_query=solr_search_parameters,
+            is_value_safe=True,
+        )
+    elif search_filter.spatial_center is not None:
         add_parameter_to_filter_query(
             parameter_value=conf.SOLR_DEFAULT_VALUE_FILTER_QUERY,
             solr_parameter_name=SOLR_PARAMETER_NAME_FILTER_QUERY,
@@ -139,9 +605,16 @@ def search_filter_to_solr_filter_query(search_filter: SearchFilter) -> dict:
         solr_filter_query=solr_search_parameters,
     )
     add_parameter_to_filter_query(
-        parameter_value=search_filter.return_fields,
+        parameter_value=search_filter.hits_per_page,
+        solr_parameter_name=SOLR_PARAMETER_NAME_HITS_PER_PAGE,
+        solr_filter_query=solr_search_parameters,
+    )
+    # Only the fields needed to build the Features are read, the other stored fields are never loaded from disk
+    add_parameter_to_filter_query(
+        parameter_value=create_solr_return_fields(),
         solr_parameter_name=SOLR_PARAMETER_NAME_RETURN_FIELDS,
         solr_filter_query=solr_search_parameters,
+        is_value_safe=True,
     )
     add_parameter_to_filter_query(
         parameter_value=generate_date_span_solr_filter_query(search_filter.date_span),
@@ -154,12 +627,193 @@ def search_filter_to_solr_filter_query(search_filter: SearchFilter) -> dict:
         solr_search_parameters
     )
     set_search_parameter_defaults(solr_search_parameters)
+    if not is_bounding_box_search:
+        set_spatial_search_parameter_defaults(solr_search_parameters)
 
     merge_filter_query_parameters(solr_search_parameters)
+    solr_search_parameters[SOLR_PARAMETER_NAME_FILTER_QUERY] += tuple(
+        generate_change_solr_filter_queries(search_filter.since)
+    )
+
+    if search_filter.sample_size is not None:
+        # A sample is a single page, hence there is no cursor to follow
+        solr_search_parameters.pop(SOLR_PARAMETER_NAME_CURSOR, None)
+        solr_search_parameters.update(create_sampling_parameters(search_filter))
+
+    if search_filter.spread is not None:
+        # Grouped results can not be paged with a cursor either
+        solr_search_parameters.pop(SOLR_PARAMETER_NAME_CURSOR, None)
+        solr_search_parameters.update(
+            create_spread_parameters(
+                search_filter, solr_search_parameters[SOLR_PARAMETER_NAME_SORT]
+            )
+        )
 
     return solr_search_parameters
 
 
+def create_solr_return_fields(is_serialized_feature_requested: bool = False) -> str:
+    """Returns the Solr fields holding the data of a Feature: the ID, the serialized Feature and the deleted flag.
+    Feature properties are stored within the serialized Feature, hence they are projected after decoding it.
+    If `conf.MAP_VIEWER_SOLR_FEATURES_FROM_DOC_VALUES` is True and `is_serialized_feature_requested` is False, the
+    indexed location, date and taxa fields are returned instead of the serialized Feature. If all of them have
+    docValues, Solr reads them without decompressing any stored fields.
+    """
+    if (
+        conf.MAP_VIEWER_SOLR_FEATURES_FROM_DOC_VALUES
+        and not is_serialized_feature_requested
+    ):
+        feature_field_names = [
+            conf.MAP_VIEWER_SOLR_GEOSPATIAL_FIELD_NAME,
+            SOLR_PARAMETER_NAME_DATE,
+            conf.MAP_VIEWER_SOLR_TERM_SEARCH_FIELD_NAME,
+        ]
+    else:
+        feature_field_names = [conf.MAP_VIEWER_SOLR_GEOJSON_DATA_FIELD_NAME]
+
+    return ",".join(
+        filter(
+            None,
+            [
+                SolrSpatialDatabase.PARAMETER_LOCATION_ID_STRING,
+                *feature_field_names,
+                conf.MAP_VIEWER_SOLR_DELETED_FIELD_NAME,
+            ],
+        )
+    )
+
+
+def create_sampling_parameters(search_filter: SearchFilter) -> dict:
+    """Creates the Solr parameters returning a random sample of `search_filter.sample_size` documents.
+    The documents are sorted by a random sort field, whose name holds the seed. The field has to be defined as
+    dynamic field of the type `solr.RandomSortField` in the Solr schema.
+    The same seed sorts all documents in the same order, as long as the index does not change. Hence, the sample of a
+    search is reproducible and the sample of a smaller area holds the sampled documents of a larger area within it.
+    """
+    seed = search_filter.sample_seed
+    if seed is None:
+        seed = conf.SOLR_DEFAULT_VALUE_SAMPLE_SEED
+
+    random_sort_field_name = f"{conf.MAP_VIEWER_SOLR_RANDOM_SORT_FIELD_PREFIX}{seed}"
+    return {
+        SOLR_PARAMETER_NAME_HITS_PER_PAGE: search_filter.sample_size,
+        SOLR_PARAMETER_NAME_SORT: f"{random_sort_field_name} asc,{conf.SOLR_DEFAULT_VALUE_SORT}",
+    }
+
+
+def create_spread_parameters(search_filter: SearchFilter, sort: str) -> dict:
+    """Creates the Solr parameters returning at most `search_filter.spread` documents per geohash cell.
+    The documents are grouped by the indexed geohash prefix of the level fitting the search area (see
+    `calculate_spread_geohash_level`). Within every group, the documents are sorted by `sort`, so a sampled search
+    returns random documents of every cell. The groups are flattened into a single document list, so the response has
+    the format of an ungrouped search and `rows` limits the number of documents, not of groups.
+    """
+    if conf.MAP_VIEWER_SOLR_GEOHASH_CELL_FIELD_PREFIX is None:
+        raise UserInputException(conf.ERROR_MESSAGE_SPREAD_NOT_SUPPORTED)
+
+    level = calculate_spread_geohash_level(search_filter)
+    return {
+        SOLR_PARAMETER_NAME_GROUP: "true",
+        SOLR_PARAMETER_NAME_GROUP_FIELD: f"{conf.MAP_VIEWER_SOLR_GEOHASH_CELL_FIELD_PREFIX}{level}",
+        SOLR_PARAMETER_NAME_GROUP_LIMIT: search_filter.spread,
+        SOLR_PARAMETER_NAME_GROUP_MAIN: "true",
+        SOLR_PARAMETER_NAME_GROUP_SORT: sort,
+    }
+
+
+def create_heatmap_parameters(search_filter: SearchFilter) -> dict:
+    """Creates the Solr heatmap facet parameters for the viewport of the given `search_filter`.
+    The viewport is the bounding box of the filter or, if not given, the bounding box of the search circle.
+    If a zoom level is given, the grid level of the heatmap is chosen to fit the size of the map tiles at this zoom
+    level. Otherwise, Solr chooses the grid level.
+    """
+    bounding_box = create_search_area_bounding_box(search_filter)
+
+    minimum_longitude, minimum_latitude, maximum_longitude, maximum_latitude = [
+        round(coordinate, conf.COORDINATE_DECIMAL_PRECISION)
+        for coordinate in (
+            bounding_box.minimum_longitude,
+            bounding_box.minimum_latitude,
+            bounding_box.maximum_longitude,
+            bounding_box.maximum_latitude,
+        )
+    ]
+
+    heatmap_parameters = {
+        SOLR_PARAMETER_NAME_FACET: "true",
+        SOLR_PARAMETER_NAME_HEATMAP_FIELD: conf.MAP_VIEWER_SOLR_HEATMAP_FIELD_NAME,
+        SOLR_PARAMETER_NAME_HEATMAP_GEOMETRY: (
+            f'["{minimum_longitude} {minimum_latitude}" '
+            f'TO "{maximum_longitude} {maximum_latitude}"]'
+        ),
+        SOLR_PARAMETER_NAME_HEATMAP_FORMAT: SOLR_HEATMAP_FORMAT,
+    }
+
+    if search_filter.zoom is not None:
+        heatmap_parameters[SOLR_PARAMETER_NAME_HEATMAP_GRID_LEVEL] = (
+            calculate_geohash_level_for_zoom(
+                search_filter.zoom, conf.MAP_VIEWER_CLUSTER_CELLS_PER_TILE
+            )
+        )
+
+    return heatmap_parameters
+
+
+def convert_heatmap_to_features(heatmap: Union[list, dict]) -> List[Feature]:
+    """Converts a Solr heatmap facet into one Point Feature per non-empty cell.
+    The heatmap may be given as flat named list (Solr's default JSON format) or as dict.
+    """
+    if isinstance(heatmap, list):
+        heatmap = dict(zip(heatmap[::2], heatmap[1::2]))
+
+    columns = heatmap["columns"]
+    rows = heatmap["rows"]
+    minimum_longitude = heatmap["minX"]
+    maximum_latitude = heatmap["maxY"]
+    # The grid of a viewport crossing the antimeridian starts east of its end
+    cell_width = (
+        calculate_bounding_box_width(
+            BoundingBox(
+                minimum_latitude=heatmap["minY"],
+                minimum_longitude=minimum_longitude,
+                maximum_latitude=maximum_latitude,
+                maximum_longitude=heatmap["maxX"],
+            )
+        )
+        / columns
+    )
+    cell_height = (maximum_latitude - heatmap["minY"]) / rows
+
+    features = []
+    # Null rows do not hold any counts and the first row is the northernmost one
+    for row_index, row_counts in enumerate(heatmap.get(SOLR_HEATMAP_COUNTS_NAME) or []):
+        if not row_counts:
+            continue
+
+        latitude = maximum_latitude - (row_index + 0.5) * cell_height
+        for column_index, count in enumerate(row_counts):
+            if count <= 0:
+                continue
+
+            longitude = minimum_longitude + (column_index + 0.5) * cell_width
+            if longitude > 180:
+                longitude -= 360
+            features.append(
+                Feature(
+                    id=f"cell-{heatmap['gridLevel']}-{row_index}-{column_index}",
+                    geometry=GeoJsonPoint(
+                        (
+                            round(longitude, conf.COORDINATE_DECIMAL_PRECISION),
+                            round(latitude, conf.COORDINATE_DECIMAL_PRECISION),
+                        )
+                    ),
+                    properties={"count": count, "cluster": True},
+                )
+            )
+
+    return features
+
+
 def set_search_parameter_defaults(solr_search_parameters: dict) -> None:
     """Adds default query values to the Solr search parameters, if they are not set already."""
     set_default(
@@ -167,11 +821,20 @@ def set_search_parameter_defaults(solr_search_parameters: dict) -> None:
         default=conf.SOLR_DEFAULT_VALUE_CURSOR,
         search_parameters=solr_search_parameters,
     )
+    set_default(
+        name=SOLR_PARAMETER_NAME_SORT,
+        default=conf.SOLR_DEFAULT_VALUE_SORT,
+        search_parameters=solr_search_parameters,
+    )
     set_default(
         name=SOLR_PARAMETER_NAME_HITS_PER_PAGE,
         default=conf.SOLR_DEFAULT_VALUE_HITS_PER_PAGE,
         search_parameters=solr_search_parameters,
     )
+
+
+def set_spatial_search_parameter_defaults(solr_search_parameters: dict) -> None:
+    """Adds the default search circle to the Solr search parameters, if it is not set already."""
     set_default(
         name=SOLR_PARAMETER_NAME_MAXIMUM_DISTANCE_FROM_POINT,
         default=conf.SOLR_DEFAULT_VALUE_RADIUS,
@@ -189,6 +852,33 @@ def set_search_parameter_defaults(solr_search_parameters: dict) -> None:
     )
 
 
+def generate_bounding_box_solr_filter_query(bounding_box: BoundingBox) -> str:
+    """Generates a Solr range filter query on the geospatial field matching all points in the `bounding_box`.
+    A box crossing the antimeridian is matched by two ranges, one on each side.
+    """
+    return " OR ".join(
+        generate_bounding_box_range_query(part)
+        for part in split_bounding_box_at_antimeridian(bounding_box)
+    )
+
+
+def generate_bounding_box_range_query(bounding_box: BoundingBox) -> str:
+    minimum_latitude, minimum_longitude, maximum_latitude, maximum_longitude = [
+        round(float(coordinate), conf.COORDINATE_DECIMAL_PRECISION)
+        for coordinate in (
+            bounding_box.minimum_latitude,
+            bounding_box.minimum_longitude,
+            bounding_box.maximum_latitude,
+            bounding_box.maximum_longitude,
+        )
+    ]
+
+    return (
+        f"{conf.MAP_VIEWER_SOLR_GEOSPATIAL_FIELD_NAME}:"
+        f"[{minimum_latitude},{minimum_longitude} TO {maximum_latitude},{maximum_longitude}]"
+    )
+
+
 def generate_date_span_solr_filter_query(
     date_span: Optional[DateSpan],
 ) -> Optional[str]:
@@ -220,6 +910,52 @@ def generate_date_span_solr_filter_query(
     return f"[{first_year} TO {last_year}]"
 
 
+def generate_change_solr_filter_queries(
+    since: Optional[datetime.datetime],
+) -> List[str]:
+    """Generates the Solr filter queries selecting the documents that are current or, if `since` is given, that were
+    changed since then. Documents marked as deleted are only selected for changes, so that they serve as tombstones.
+
+    A UserInputException is raised for a given `since`, if no last-modified field is configured.
+    """
+    if since is None:
+        not_deleted_filter_query = generate_not_deleted_solr_filter_query()
+        return [not_deleted_filter_query] if not_deleted_filter_query else []
+
+    last_modified_field_name = conf.MAP_VIEWER_SOLR_LAST_MODIFIED_FIELD_NAME
+    if last_modified_field_name is None:
+        raise UserInputException(conf.ERROR_MESSAGE_CHANGE_SEARCH_NOT_SUPPORTED)
+
+    return [f"{last_modified_field_name}:[{format_solr_timestamp(since)} TO *]"]
+
+
+def generate_not_deleted_solr_filter_query() -> Optional[str]:
+    """Generates the Solr filter query excluding deleted documents. Is None, if no deleted field is configured."""
+    deleted_field_name = conf.MAP_VIEWER_SOLR_DELETED_FIELD_NAME
+    if deleted_field_name is None:
+        return None
+
+    return f"-{deleted_field_name}:true"
+
+
+def format_solr_timestamp(timestamp: datetime.datetime) -> str:
+    """Formats the given timestamp as Solr date in UTC. Timestamps without a time zone are taken as UTC."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+    return f"{timestamp.isoformat(timespec='milliseconds')}Z"
+
+
+def is_change_search(search_filter: Optional[SearchFilter]) -> bool:
+    return search_filter is not None and search_filter.since is not None
+
+
+def is_deleted_document(document: dict) -> bool:
+    """Checks whether the given Solr document is marked as deleted."""
+    deleted_field_name = conf.MAP_VIEWER_SOLR_DELETED_FIELD_NAME
+    return deleted_field_name is not None and bool(document.get(deleted_field_name))
+
+
 def merge_filter_query_parameters(solr_search_parameters: dict) -> None:
     fq_values = [
         f"{fq_parameter_name}:{solr_search_parameters.pop(fq_parameter_name)}"
@@ -237,7 +973,18 @@ def merge_filter_query_parameters(solr_search_parameters: dict) -> None:
     solr_search_parameters[SOLR_PARAMETER_NAME_FILTER_QUERY] = tuple(fq_values)
 
 
-def convert_json_to_geojson(feature_list: List[dict]) -> FeatureCollection:
+def extract_documents_from_real_time_get_response(response: dict) -> List[dict]:
+    """Returns the documents of a decoded response of the Solr real-time get handler.
+    For a single requested ID, Solr returns the document (or null) directly instead of a document list.
+    """
+    if SOLR_REAL_TIME_GET_SINGLE_DOCUMENT_NAME in response:
+        document = response[SOLR_REAL_TIME_GET_SINGLE_DOCUMENT_NAME]
+        return [document] if document is not None else []
+
+    return response.get("response", {}).get("docs", [])
+
+
+def convert_json_to_geojson(feature_list: Iterable[dict]) -> FeatureCollection:
     features = [
         Feature(**json.loads(feature[conf.MAP_VIEWER_SOLR_GEOJSON_DATA_FIELD_NAME]))
         for feature in feature_list
@@ -245,6 +992,90 @@ def convert_json_to_geojson(feature_list: List[dict]) -> FeatureCollection:
     return FeatureCollection(features)
 
 
+def convert_documents_to_geojson(
+    documents: Iterable[dict], search_filter: Optional[SearchFilter] = None
+) -> FeatureCollection:
+    """Builds the Features of the given documents from their indexed fields and applies the projection of the
+    `search_filter`. Documents without a location are left out.
+    """
+    features = []
+    for document in documents:
+        feature = convert_document_to_feature(document)
+        if feature is None:
+            continue
+
+        if is_projection_requested(search_filter):
+            feature = project_feature(feature, search_filter)
+        features.append(Feature(**feature))
+
+    return FeatureCollection(features)
+
+
+def convert_document_to_feature(document: dict) -> Optional[dict]:
+    """Builds a GeoJSON Point Feature from the indexed ID, location, date and taxa of the document, as they are
+    written by the indexer. The Feature holds only the `date` and taxa properties; all other properties are only
+    available from the serialized Feature. Returns None, if the document has no valid location.
+    """
+    location = document.get(conf.MAP_VIEWER_SOLR_GEOSPATIAL_FIELD_NAME)
+    if isinstance(location, list):
+        location = location[0] if location else None
+
+    try:
+        latitude, longitude = (float(value) for value in str(location).split(","))
+    except ValueError:
+        logger.warning("Skipping a document without a valid location.")
+        return None
+
+    properties = {}
+    date_value = document.get(SOLR_PARAMETER_NAME_DATE)
+    if date_value:
+        # Only the date part of the Solr timestamp is indexed from the Feature
+        properties[conf.GEOJSON_PROPERTY_NAME_DATE] = str(date_value)[:10]
+
+    taxa = document.get(conf.MAP_VIEWER_SOLR_TERM_SEARCH_FIELD_NAME)
+    if taxa:
+        properties[conf.MAP_VIEWER_SOLR_TERM_SEARCH_FIELD_NAME] = (
+            taxa if isinstance(taxa, list) else [taxa]
+        )
+
+    return {
+        "type": "Feature",
+        "id": document[SolrSpatialDatabase.PARAMETER_LOCATION_ID_STRING],
+        "geometry": {"type": "Point", "coordinates": [longitude, latitude]},
+        "properties": properties,
+    }
+
+
+def convert_json_to_raw_geojson(
+    feature_list: Iterable[dict], validate: bool = True
+) -> RawFeatureCollection:
+    """Collects the stored GeoJSON strings of the given documents without decoding them.
+    If `validate` is True, every string is decoded once to make sure it holds a GeoJSON Feature. Documents failing
+    this check are logged and left out of the result.
+    """
+    geojson_field_name = conf.MAP_VIEWER_SOLR_GEOJSON_DATA_FIELD_NAME
+    features = [document[geojson_field_name] for document in feature_list]
+
+    if validate:
+        features = [feature for feature in features if is_geojson_feature(feature)]
+
+    return RawFeatureCollection(features)
+
+
+def is_geojson_feature(serialized_feature: Union[str, bytes]) -> bool:
+    """Checks whether the given string holds a JSON serialized GeoJSON Feature."""
+    try:
+        feature = json.loads(serialized_feature)
+    except ValueError:
+        feature = None
+
+    is_feature = isinstance(feature, dict) and feature.get("type") == "Feature"
+    if not is_feature:
+        logger.warning("Skipping stored data that is not a GeoJSON Feature.")
+
+    return is_feature
+
+
 def add_parameter_to_filter_query(
     parameter_value: Any,
     solr_parameter_name: str,
@@ -1,7 +1,15 @@
+import json
 from abc import ABC, abstractmethod
+from typing import Iterator, List
 
+from asgiref.sync import sync_to_async
 from geojson import Feature, FeatureCollection
-from honeybee.commons import Query, SearchFilter
+from honeybee.commons import (
+    Query,
+    RawFeatureCollection,
+    SearchFilter,
+    SearchResult,
+)
 
 
 class SpatialDatabase(ABC):
@@ -12,9 +20,63 @@ class SpatialDatabase(ABC):
         """Returns the spatial data on a given location ID."""
         pass
 
+    def get_data_for_location_ids(self, location_ids: List[str]) -> FeatureCollection:
+        """Returns the spatial data on the given location IDs. IDs without a location are left out.
+        Databases supporting batched lookups should override this method. By default, every ID is looked up
+        separately.
+        """
+        features = [
+            self.get_data_for_location_id(location_id) for location_id in location_ids
+        ]
+        return FeatureCollection([feature for feature in features if feature])
+
     @abstractmethod
     def search_locations_related_to_query(
         self, query: Query, search_filter: SearchFilter = None
-    ) -> FeatureCollection:
-        """Returns locations that are contained in documents related to the given query and filter data."""
+    ) -> SearchResult:
+        """Returns locations that are contained in documents related to the given query and filter data.
+        Besides the spatial data, the result holds the cursor to the next result page and the total number of hits,
+        if the database supports this.
+        """
+        pass
+
+    async def search_locations_related_to_query_async(
+        self, query: Query, search_filter: SearchFilter = None
+    ) -> SearchResult:
+        """The asynchronous version of `search_locations_related_to_query`.
+        Databases with a non-blocking client should override this method. By default, the search is executed in a
+        separate thread.
+        """
+        return await sync_to_async(
+            self.search_locations_related_to_query, thread_sensitive=False
+        )(query, search_filter)
+
+    def aggregate_locations_related_to_query(
+        self, query: Query, search_filter: SearchFilter = None
+    ) -> SearchResult:
+        """Returns one weighted cluster Feature per grid cell of the viewport, instead of the single locations
+        related to the given query and filter data. Raises a NotImplementedError, if the database does not support
+        aggregations.
+        """
+        raise NotImplementedError()
+
+    def stream_locations_related_to_query(
+        self, query: Query, search_filter: SearchFilter = None
+    ) -> Iterator[str]:
+        """Yields the serialized GeoJSON Features of all locations related to the given query and filter data.
+        Databases supporting paging should override this method to walk all result pages. By default, only the
+        Features returned by `search_locations_related_to_query` are yielded.
+        """
+        feature_collection = self.search_locations_related_to_query(
+            query, search_filter
+        ).spatial_data
+
+        if isinstance(feature_collection, RawFeatureCollection):
+            yield from feature_collection.features
+        else:
+            for feature in feature_collection["features"]:
+                yield json.dumps(feature)
+
+    def close(self) -> None:
+        """Releases all resources (e.g. open connections) held by the database."""
         pass
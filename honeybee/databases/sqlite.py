@@ -0,0 +1,440 @@
+import base64
+import binascii
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from geojson import FeatureCollection
+from honeybee import conf
+from honeybee.commons import (
+    Point,
+    Query,
+    RawFeatureCollection,
+    SearchFilter,
+    SearchResult,
+    UserInputException,
+)
+from honeybee.databases.features import (
+    create_spatial_data,
+    extract_date,
+    extract_taxa,
+    project_serialized_feature,
+)
+from honeybee.databases.spatial import SpatialDatabase
+from honeybee.geometry import (
+    calculate_haversine_distance,
+    create_bounding_box_around_point,
+    extract_representative_point,
+)
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of parameters of a single statement
+SQLITE_MAXIMUM_PARAMETERS_PER_STATEMENT = 900
+SQLITE_INSERT_BATCH_SIZE = 1000
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS features (
+    position INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    date TEXT,
+    geojson TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS features_date ON features (date);
+CREATE VIRTUAL TABLE IF NOT EXISTS feature_locations USING rtree (
+    position,
+    minimum_latitude,
+    maximum_latitude,
+    minimum_longitude,
+    maximum_longitude
+);
+CREATE TABLE IF NOT EXISTS feature_taxa (
+    taxon TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (taxon, position)
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteSpatialDatabase(SpatialDatabase):
+    """Searches the spatial data stored in a single SQLite file (see `build_sqlite_database`).
+
+    The locations are indexed by an R*Tree, the dates by a B-tree index and the taxa by a join table. The GeoJSON
+    Features are stored as text and returned without being decoded. Like a Solr search sorted by `id asc`, all
+    results are ordered by ID and the result pages are walked with a cursor holding the last returned ID.
+
+    Unlike the Solr `bbox` filter, a search circle is matched exactly (by haversine distance). Search terms have
+    to match a taxon of a Feature exactly.
+    """
+
+    def __init__(self, database_configuration: dict):
+        path_parameter_name = conf.DATABASE_PATH_CONFIGURATION_NAME
+
+        if (
+            database_configuration is None
+            or database_configuration.get(path_parameter_name) is None
+        ):
+            raise ValueError("The path to the spatial database has to be set!")
+
+        self.path = database_configuration[path_parameter_name]
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        # Fail on start, if the file is no spatial database
+        self._get_connection().execute("SELECT 1 FROM features LIMIT 1")
+
+    def get_data_for_location_id(self, location_id: str) -> FeatureCollection:
+        """Returns a GeoJSON FeatureCollection holding a single Feature with the given `location_id`.
+        If no location can be found with the given `location_id`, the Feature list in the FeatureCollection
+        is empty.
+        """
+        return self.get_data_for_location_ids([location_id])
+
+    def get_data_for_location_ids(self, location_ids: List[str]) -> FeatureCollection:
+        """Returns a GeoJSON FeatureCollection holding the Features with the given `location_ids`.
+        IDs without a location are left out.
+        """
+        features_by_id = {}
+        connection = self._get_connection()
+
+        for start in range(
+            0, len(location_ids), SQLITE_MAXIMUM_PARAMETERS_PER_STATEMENT
+        ):
+            id_batch = location_ids[
+                start : start + SQLITE_MAXIMUM_PARAMETERS_PER_STATEMENT
+            ]
+            rows = connection.execute(
+                f"SELECT id, geojson FROM features WHERE id IN ({create_placeholders(id_batch)})",
+                id_batch,
+            )
+            features_by_id.update(rows)
+
+        return RawFeatureCollection(
+            [
+                features_by_id[location_id]
+                for location_id in location_ids
+                if location_id in features_by_id
+            ]
+        ).to_feature_collection()
+
+    def search_locations_related_to_query(
+        self, query: Query, search_filter: SearchFilter = None
+    ) -> SearchResult:
+        """Returns a SearchResult holding all Features fitting the given parameters, one page at a time.
+        If the GeoJSON passthrough is enabled and no projection is requested, the Features are returned undecoded in a
+        RawFeatureCollection.
+
+        The cursor of the SearchResult is None, if there are no further result pages.
+        """
+        start_time = time.perf_counter()
+        search_filter = SearchFilter() if search_filter is None else search_filter
+        hits_per_page = (
+            search_filter.hits_per_page or conf.SOLR_DEFAULT_VALUE_HITS_PER_PAGE
+        )
+
+        condition, parameters = self.create_search_condition(query, search_filter)
+        connection = self._get_connection()
+
+        # One more row than requested tells whether there is another page
+        rows = connection.execute(
+            f"SELECT features.id, features.geojson {condition} "
+            f"{create_cursor_condition(search_filter.cursor)} "
+            f"ORDER BY features.id LIMIT ?",
+            parameters
+            + create_cursor_parameters(search_filter.cursor)
+            + [hits_per_page + 1],
+        ).fetchall()
+        (total_hits,) = connection.execute(
+            f"SELECT COUNT(*) {condition}", parameters
+        ).fetchone()
+
+        page_rows = rows[:hits_per_page]
+        next_cursor = None
+        if len(rows) > hits_per_page:
+            next_cursor = encode_cursor(page_rows[-1][0])
+
+        spatial_data = create_spatial_data(
+            (geojson for _, geojson in page_rows), search_filter
+        )
+
+        return SearchResult(
+            spatial_data=spatial_data,
+            next_cursor=next_cursor,
+            total_hits=total_hits,
+            query_time=round((time.perf_counter() - start_time) * 1000),
+        )
+
+    def stream_locations_related_to_query(
+        self, query: Query, search_filter: SearchFilter = None
+    ) -> Iterator[str]:
+        """Yields the serialized GeoJSON Features of all locations fitting the given parameters.
+        The results are read page by page, so the iteration may continue in another thread.
+        """
+        search_filter = SearchFilter() if search_filter is None else search_filter
+        condition, parameters = self.create_search_condition(query, search_filter)
+        cursor = search_filter.cursor
+        page_size = conf.MAP_VIEWER_MAXIMUM_HITS_PER_PAGE
+
+        while True:
+            rows = (
+                self._get_connection()
+                .execute(
+                    f"SELECT features.id, features.geojson {condition} "
+                    f"{create_cursor_condition(cursor)} "
+                    f"ORDER BY features.id LIMIT ?",
+                    parameters + create_cursor_parameters(cursor) + [page_size],
+                )
+                .fetchall()
+            )
+
+            for _, geojson in rows:
+                yield project_serialized_feature(geojson, search_filter)
+
+            if len(rows) < page_size:
+                break
+
+            cursor = encode_cursor(rows[-1][0])
+
+    def create_search_condition(
+        self, query: Query, search_filter: SearchFilter
+    ) -> Tuple[str, list]:
+        """Returns the FROM and WHERE clauses selecting all Features fitting the given query and filter data,
+        together with their parameters. The cursor of the `search_filter` is not regarded.
+        Searches for changes are rejected, since the database does not keep track of the changes of its Features.
+        Sampled searches are rejected, since SQLite can not sort randomly with a seed. Spread searches are rejected as
+        well, since the database does not index grid cells.
+        """
+        if search_filter.since is not None:
+            raise UserInputException(conf.ERROR_MESSAGE_CHANGE_SEARCH_NOT_SUPPORTED)
+        if search_filter.sample_size is not None:
+            raise UserInputException(conf.ERROR_MESSAGE_SAMPLING_NOT_SUPPORTED)
+        if search_filter.spread is not None:
+            raise UserInputException(conf.ERROR_MESSAGE_SPREAD_NOT_SUPPORTED)
+
+        bounding_box = search_filter.bounding_box
+        spatial_center = None
+
+        if bounding_box is None:
+            spatial_center = search_filter.spatial_center or conf.default_spatial_center
+            radius = search_filter.radius or conf.SOLR_DEFAULT_VALUE_RADIUS
+            bounding_box = create_bounding_box_around_point(spatial_center, radius)
+
+        # A box crossing the antimeridian holds the Features east of its minimum or west of its maximum longitude
+        longitude_conjunction = (
+            "AND"
+            if bounding_box.minimum_longitude <= bounding_box.maximum_longitude
+            else "OR"
+        )
+        clauses = [
+            "feature_locations.maximum_latitude >= ?",
+            "feature_locations.minimum_latitude <= ?",
+            f"(feature_locations.maximum_longitude >= ? {longitude_conjunction} "
+            "feature_locations.minimum_longitude <= ?)",
+        ]
+        parameters = [
+            bounding_box.minimum_latitude,
+            bounding_box.maximum_latitude,
+            bounding_box.minimum_longitude,
+            bounding_box.maximum_longitude,
+        ]
+
+        if spatial_center is not None:
+            clauses.append(
+                "haversine_distance(features.latitude, features.longitude, ?, ?) <= ?"
+            )
+            parameters.extend(
+                [spatial_center.latitude, spatial_center.longitude, radius]
+            )
+
+        terms = query.original_raw_string_data
+        if terms:
+            clauses.append(
+                "features.position IN "
+                f"(SELECT position FROM feature_taxa WHERE taxon IN ({create_placeholders(terms)}))"
+            )
+            parameters.extend(terms)
+
+        date_span = search_filter.date_span
+        if date_span is not None:
+            clauses.append("features.date BETWEEN ? AND ?")
+            parameters.extend(
+                [
+                    (date_span.first_year or date.min).isoformat(),
+                    (date_span.last_year or date.today()).isoformat(),
+                ]
+            )
+
+        condition = (
+            "FROM feature_locations "
+            "JOIN features ON features.position = feature_locations.position "
+            f"WHERE {' AND '.join(clauses)}"
+        )
+
+        return condition, parameters
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Returns the read-only connection of the current thread.
+        SQLite connections can not be shared between threads, hence every thread opens its own one.
+        """
+        connection = getattr(self._local, "connection", None)
+
+        if connection is None:
+            connection = sqlite3.connect(
+                f"{Path(self.path).resolve().as_uri()}?mode=ro", uri=True
+            )
+            connection.create_function(
+                "haversine_distance",
+                4,
+                calculate_sql_haversine_distance,
+                deterministic=True,
+            )
+            self._local.connection = connection
+
+            with self._connections_lock:
+                self._connections.append(connection)
+
+        return connection
+
+    def close(self) -> None:
+        """Closes the connections of all threads."""
+        with self._connections_lock:
+            connections = list(self._connections)
+            self._connections.clear()
+
+        self._local = threading.local()
+        for connection in connections:
+            try:
+                connection.close()
+            except sqlite3.ProgrammingError:
+                # Connections opened by other threads can only be closed by them; they are closed on collection
+                pass
+
+
+def build_sqlite_database(path: str, features: Iterable[dict]) -> int:
+    """Writes the given GeoJSON Features into the SQLite file at `path` and creates the file if it does not exist.
+    A Feature with the ID of an already stored Feature replaces it. Features without an ID or a geometry are logged
+    and left out. Returns the number of written Features.
+    """
+    connection = sqlite3.connect(path)
+    feature_count = 0
+
+    try:
+        with connection:
+            connection.executescript(SQLITE_SCHEMA)
+
+        batch = []
+        for feature in features:
+            point = extract_representative_point(feature.get("geometry"))
+            if feature.get("id") is None or point is None:
+                logger.warning(
+                    "Skipping a GeoJSON Feature without an ID or a geometry."
+                )
+                continue
+
+            batch.append((str(feature["id"]), point, feature))
+            if len(batch) >= SQLITE_INSERT_BATCH_SIZE:
+                feature_count += write_features(connection, batch)
+                batch = []
+
+        feature_count += write_features(connection, batch)
+    finally:
+        connection.close()
+
+    return feature_count
+
+
+def write_features(
+    connection: sqlite3.Connection, entries: List[Tuple[str, Point, dict]]
+) -> int:
+    """Writes the given (ID, location, Feature) entries in a single transaction."""
+    with connection:
+        for location_id, point, feature in entries:
+            replaced_row = connection.execute(
+                "SELECT position FROM features WHERE id = ?", (location_id,)
+            ).fetchone()
+            if replaced_row is not None:
+                delete_feature(connection, position=replaced_row[0])
+
+            feature_date = extract_date(feature)
+            position = connection.execute(
+                "INSERT INTO features (id, latitude, longitude, date, geojson) VALUES (?, ?, ?, ?, ?)",
+                (
+                    location_id,
+                    point.latitude,
+                    point.longitude,
+                    feature_date.isoformat() if feature_date is not None else None,
+                    json.dumps(feature),
+                ),
+            ).lastrowid
+            connection.execute(
+                "INSERT INTO feature_locations VALUES (?, ?, ?, ?, ?)",
+                (
+                    position,
+                    point.latitude,
+                    point.latitude,
+                    point.longitude,
+                    point.longitude,
+                ),
+            )
+            connection.executemany(
+                "INSERT INTO feature_taxa (taxon, position) VALUES (?, ?)",
+                [(taxon, position) for taxon in extract_taxa(feature)],
+            )
+
+    return len(entries)
+
+
+def delete_feature(connection: sqlite3.Connection, position: int) -> None:
+    """Deletes the Feature at the given `position` together with its location and taxa."""
+    for table_name in ("feature_locations", "feature_taxa", "features"):
+        connection.execute(f"DELETE FROM {table_name} WHERE position = ?", (position,))
+
+
+def calculate_sql_haversine_distance(
+    latitude: float, longitude: float, center_latitude: float, center_longitude: float
+) -> float:
+    return calculate_haversine_distance(
+        Point(latitude=latitude, longitude=longitude),
+        Point(latitude=center_latitude, longitude=center_longitude),
+    )
+
+
+def create_placeholders(values: list) -> str:
+    return ", ".join("?" for _ in values)
+
+
+def create_cursor_condition(cursor: Optional[str]) -> str:
+    return "" if decode_cursor(cursor) is None else "AND features.id > ?"
+
+
+def create_cursor_parameters(cursor: Optional[str]) -> list:
+    last_id = decode_cursor(cursor)
+    return [] if last_id is None else [last_id]
+
+
+def encode_cursor(last_id: str) -> str:
+    """Encodes the ID of the last Feature of a result page into a cursor pointing to the next page."""
+    return base64.urlsafe_b64encode(last_id.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[str]:
+    """Returns the ID of the last Feature before the result page the `cursor` points to.
+    Returns None for the cursor of the first page.
+    """
+    if cursor is None or cursor == conf.SOLR_DEFAULT_VALUE_CURSOR:
+        return None
+
+    try:
+        return base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+    except (binascii.Error, UnicodeError, ValueError):
+        raise UserInputException(
+            conf.ERROR_MESSAGE_INVALID_RESUME_TOKEN.format(resume_token=cursor)
+        )
@@ -0,0 +1,466 @@
+import json
+import struct
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import flatbuffers
+except ImportError:  # pragma: no cover
+    flatbuffers = None
+
+from honeybee.geometry import count_dimensions, iterate_geometry_positions
+
+# See https://github.com/flatgeobuf/flatgeobuf/tree/master/src/fbs
+FLATGEOBUF_MAGIC = bytes([0x66, 0x67, 0x62, 0x03, 0x66, 0x67, 0x62, 0x00])
+DEFAULT_INDEX_NODE_SIZE = 16
+
+HEADER_FIELD_COUNT = 14
+HEADER_SLOT_NAME = 0
+HEADER_SLOT_ENVELOPE = 1
+HEADER_SLOT_GEOMETRY_TYPE = 2
+HEADER_SLOT_HAS_Z = 3
+HEADER_SLOT_COLUMNS = 7
+HEADER_SLOT_FEATURES_COUNT = 8
+HEADER_SLOT_INDEX_NODE_SIZE = 9
+HEADER_SLOT_CRS = 10
+COLUMN_FIELD_COUNT = 11
+COLUMN_SLOT_NAME = 0
+COLUMN_SLOT_TYPE = 1
+CRS_FIELD_COUNT = 6
+CRS_SLOT_ORGANIZATION = 0
+CRS_SLOT_CODE = 1
+FEATURE_FIELD_COUNT = 3
+FEATURE_SLOT_GEOMETRY = 0
+FEATURE_SLOT_PROPERTIES = 1
+GEOMETRY_FIELD_COUNT = 8
+GEOMETRY_SLOT_ENDS = 0
+GEOMETRY_SLOT_XY = 1
+GEOMETRY_SLOT_Z = 2
+GEOMETRY_SLOT_TYPE = 6
+GEOMETRY_SLOT_PARTS = 7
+
+CRS_ORGANIZATION = "EPSG"
+CRS_CODE_WGS84 = 4326
+
+GEOMETRY_TYPE_UNKNOWN = 0
+GEOMETRY_TYPES = {
+    "Point": 1,
+    "LineString": 2,
+    "Polygon": 3,
+    "MultiPoint": 4,
+    "MultiLineString": 5,
+    "MultiPolygon": 6,
+    "GeometryCollection": 7,
+}
+
+COLUMN_TYPE_BOOL = 2
+COLUMN_TYPE_LONG = 7
+COLUMN_TYPE_DOUBLE = 10
+COLUMN_TYPE_STRING = 11
+COLUMN_TYPE_JSON = 12
+
+FEATURE_ID_COLUMN_NAME = "id"
+
+UINT16_STRUCT = struct.Struct("<H")
+UINT32_STRUCT = struct.Struct("<I")
+INT64_STRUCT = struct.Struct("<q")
+DOUBLE_STRUCT = struct.Struct("<d")
+BOOL_STRUCT = struct.Struct("<?")
+# minX, minY, maxX, maxY and the offset of a node of the packed R-tree
+NODE_STRUCT = struct.Struct("<ddddQ")
+
+HILBERT_ORDER = 16
+HILBERT_MAXIMUM = (1 << HILBERT_ORDER) - 1
+
+BoundingBox = Tuple[float, float, float, float]
+
+
+@dataclass
+class FlatGeobufFeature:
+    bounding_box: BoundingBox
+    encoded_feature: bytes
+
+
+def encode_flatgeobuf(
+    features: Iterable[dict], index_node_size: int = DEFAULT_INDEX_NODE_SIZE
+) -> bytes:
+    """Encodes the given GeoJSON Features as FlatGeobuf file in WGS84.
+
+    The property columns are derived from the values of all Features. Properties mixing integers and floats are
+    stored as doubles, properties mixing other types as JSON. IDs are added as `id` column, unless a property has
+    this name. Features without a geometry are left out, since FlatGeobuf does not support them.
+    With an `index_node_size` of at least 2, the Features are sorted along a Hilbert curve and a packed R-tree is
+    added, so clients can fetch the Features within a bounding box via HTTP range requests.
+    """
+    if flatbuffers is None:
+        raise ImportError(
+            "Encoding FlatGeobuf requires FlatBuffers. Install it with: pip install .['flatgeobuf']"
+        )
+
+    features = [
+        feature
+        for feature in features
+        if next(iterate_geometry_positions(feature.get("geometry")), None) is not None
+    ]
+    columns = infer_columns(features)
+    has_z = any(count_dimensions(feature["geometry"]) > 2 for feature in features)
+
+    encoded_features = [
+        FlatGeobufFeature(
+            calculate_bounding_box(feature["geometry"]),
+            encode_feature(feature, columns, has_z),
+        )
+        for feature in features
+    ]
+
+    envelope = merge_bounding_boxes(
+        [feature.bounding_box for feature in encoded_features]
+    )
+    is_indexed = index_node_size >= 2 and len(encoded_features) > 0
+    if is_indexed:
+        encoded_features = sort_by_hilbert_value(encoded_features, envelope)
+
+    geometry_types = {feature["geometry"].get("type") for feature in features}
+    header = encode_header(
+        columns,
+        len(encoded_features),
+        (
+            GEOMETRY_TYPES.get(geometry_types.pop(), GEOMETRY_TYPE_UNKNOWN)
+            if len(geometry_types) == 1
+            else GEOMETRY_TYPE_UNKNOWN
+        ),
+        envelope,
+        has_z,
+        index_node_size if is_indexed else 0,
+    )
+
+    sections = [FLATGEOBUF_MAGIC, header]
+    if is_indexed:
+        sections.append(build_packed_r_tree(encoded_features, index_node_size))
+    sections.extend(feature.encoded_feature for feature in encoded_features)
+
+    return b"".join(sections)
+
+
+def infer_columns(features: List[dict]) -> Dict[str, int]:
+    """Returns the names of all properties and their column types, in the order of their first appearance."""
+    value_types = {}
+    for feature in features:
+        for name, value in iterate_properties(feature):
+            value_types.setdefault(name, set()).add(get_column_type(value))
+
+    columns = {}
+    for name, types in value_types.items():
+        if len(types) == 1:
+            columns[name] = types.pop()
+        elif types == {COLUMN_TYPE_LONG, COLUMN_TYPE_DOUBLE}:
+            columns[name] = COLUMN_TYPE_DOUBLE
+        else:
+            columns[name] = COLUMN_TYPE_JSON
+
+    return columns
+
+
+def iterate_properties(feature: dict) -> Iterable[Tuple[str, object]]:
+    """Yields the non-null properties of the Feature, preceded by its ID."""
+    properties = feature.get("properties") or {}
+    if feature.get("id") is not None and FEATURE_ID_COLUMN_NAME not in properties:
+        yield FEATURE_ID_COLUMN_NAME, feature["id"]
+
+    for name, value in properties.items():
+        if value is not None:
+            yield str(name), value
+
+
+def get_column_type(value) -> int:
+    if isinstance(value, bool):
+        return COLUMN_TYPE_BOOL
+    elif isinstance(value, int) and -(2**63) <= value < 2**63:
+        return COLUMN_TYPE_LONG
+    elif isinstance(value, float):
+        return COLUMN_TYPE_DOUBLE
+    elif isinstance(value, str):
+        return COLUMN_TYPE_STRING
+
+    return COLUMN_TYPE_JSON
+
+
+def encode_properties(feature: dict, columns: Dict[str, int]) -> bytes:
+    """Encodes the properties as the index of their column followed by the value, as required by FlatGeobuf."""
+    column_indexes = {name: index for index, name in enumerate(columns)}
+
+    encoded_properties = bytearray()
+    for name, value in iterate_properties(feature):
+        column_type = columns[name]
+        encoded_properties += UINT16_STRUCT.pack(column_indexes[name])
+        if column_type == COLUMN_TYPE_BOOL:
+            encoded_properties += BOOL_STRUCT.pack(value)
+        elif column_type == COLUMN_TYPE_LONG:
+            encoded_properties += INT64_STRUCT.pack(value)
+        elif column_type == COLUMN_TYPE_DOUBLE:
+            encoded_properties += DOUBLE_STRUCT.pack(value)
+        else:
+            encoded_value = (
+                value if column_type == COLUMN_TYPE_STRING else json.dumps(value)
+            ).encode("utf-8")
+            encoded_properties += UINT32_STRUCT.pack(len(encoded_value))
+            encoded_properties += encoded_value
+
+    return bytes(encoded_properties)
+
+
+def encode_header(
+    columns: Dict[str, int],
+    feature_count: int,
+    geometry_type: int,
+    envelope: Optional[BoundingBox],
+    has_z: bool,
+    index_node_size: int,
+) -> bytes:
+    builder = flatbuffers.Builder(1024)
+
+    encoded_columns = []
+    for name, column_type in columns.items():
+        encoded_name = builder.CreateString(name)
+        builder.StartObject(COLUMN_FIELD_COUNT)
+        builder.PrependUOffsetTRelativeSlot(COLUMN_SLOT_NAME, encoded_name, 0)
+        builder.PrependUint8Slot(COLUMN_SLOT_TYPE, column_type, 0)
+        encoded_columns.append(builder.EndObject())
+    encoded_column_vector = create_offset_vector(builder, encoded_columns)
+
+    organization = builder.CreateString(CRS_ORGANIZATION)
+    builder.StartObject(CRS_FIELD_COUNT)
+    builder.PrependUOffsetTRelativeSlot(CRS_SLOT_ORGANIZATION, organization, 0)
+    builder.PrependInt32Slot(CRS_SLOT_CODE, CRS_CODE_WGS84, 0)
+    crs = builder.EndObject()
+
+    name = builder.CreateString("")
+    encoded_envelope = (
+        create_double_vector(builder, envelope) if envelope is not None else None
+    )
+
+    builder.StartObject(HEADER_FIELD_COUNT)
+    builder.PrependUOffsetTRelativeSlot(HEADER_SLOT_NAME, name, 0)
+    if encoded_envelope is not None:
+        builder.PrependUOffsetTRelativeSlot(HEADER_SLOT_ENVELOPE, encoded_envelope, 0)
+    builder.PrependUint8Slot(HEADER_SLOT_GEOMETRY_TYPE, geometry_type, 0)
+    builder.PrependBoolSlot(HEADER_SLOT_HAS_Z, has_z, False)
+    builder.PrependUOffsetTRelativeSlot(HEADER_SLOT_COLUMNS, encoded_column_vector, 0)
+    builder.PrependUint64Slot(HEADER_SLOT_FEATURES_COUNT, feature_count, 0)
+    # The default node size is 16, hence a missing index has to be stored explicitly
+    builder.PrependUint16Slot(
+        HEADER_SLOT_INDEX_NODE_SIZE, index_node_size, DEFAULT_INDEX_NODE_SIZE
+    )
+    builder.PrependUOffsetTRelativeSlot(HEADER_SLOT_CRS, crs, 0)
+    builder.FinishSizePrefixed(builder.EndObject())
+
+    return bytes(builder.Output())
+
+
+def encode_feature(feature: dict, columns: Dict[str, int], has_z: bool) -> bytes:
+    builder = flatbuffers.Builder(1024)
+
+    geometry = encode_geometry(builder, feature["geometry"], has_z)
+    properties = builder.CreateByteVector(encode_properties(feature, columns))
+
+    builder.StartObject(FEATURE_FIELD_COUNT)
+    builder.PrependUOffsetTRelativeSlot(FEATURE_SLOT_GEOMETRY, geometry, 0)
+    builder.PrependUOffsetTRelativeSlot(FEATURE_SLOT_PROPERTIES, properties, 0)
+    builder.FinishSizePrefixed(builder.EndObject())
+
+    return bytes(builder.Output())
+
+
+def encode_geometry(builder: "flatbuffers.Builder", geometry: dict, has_z: bool) -> int:
+    """Adds the GeoJSON geometry to the builder and returns its offset.
+    Parts of lines and polygons are given by the index after their last position, MultiPolygons and
+    GeometryCollections consist of nested geometries.
+    """
+    geometry_type = geometry.get("type")
+    coordinates = geometry.get("coordinates") or []
+
+    parts = None
+    lines = []
+    if geometry_type == "GeometryCollection":
+        parts = [
+            encode_geometry(builder, member, has_z)
+            for member in geometry.get("geometries") or []
+        ]
+    elif geometry_type == "MultiPolygon":
+        parts = [
+            encode_geometry(builder, {"type": "Polygon", "coordinates": polygon}, has_z)
+            for polygon in coordinates
+        ]
+    elif geometry_type == "Point":
+        lines = [[coordinates]]
+    elif geometry_type in ("MultiPoint", "LineString"):
+        lines = [coordinates]
+    else:
+        lines = coordinates
+
+    positions = [position for line in lines for position in line]
+    ends = None
+    if len(lines) > 1:
+        ends = []
+        for line in lines:
+            ends.append((ends[-1] if ends else 0) + len(line))
+
+    encoded_parts = create_offset_vector(builder, parts) if parts else None
+    encoded_ends = (
+        create_vector(builder, builder.PrependUint32, 4, ends) if ends else None
+    )
+    encoded_xy = (
+        create_double_vector(
+            builder, [value for position in positions for value in position[:2]]
+        )
+        if positions
+        else None
+    )
+    encoded_z = (
+        create_double_vector(
+            builder,
+            [position[2] if len(position) > 2 else 0.0 for position in positions],
+        )
+        if positions and has_z
+        else None
+    )
+
+    builder.StartObject(GEOMETRY_FIELD_COUNT)
+    if encoded_ends is not None:
+        builder.PrependUOffsetTRelativeSlot(GEOMETRY_SLOT_ENDS, encoded_ends, 0)
+    if encoded_xy is not None:
+        builder.PrependUOffsetTRelativeSlot(GEOMETRY_SLOT_XY, encoded_xy, 0)
+    if encoded_z is not None:
+        builder.PrependUOffsetTRelativeSlot(GEOMETRY_SLOT_Z, encoded_z, 0)
+    builder.PrependUint8Slot(
+        GEOMETRY_SLOT_TYPE,
+        GEOMETRY_TYPES.get(geometry_type, GEOMETRY_TYPE_UNKNOWN),
+        GEOMETRY_TYPE_UNKNOWN,
+    )
+    if encoded_parts is not None:
+        builder.PrependUOffsetTRelativeSlot(GEOMETRY_SLOT_PARTS, encoded_parts, 0)
+
+    return builder.EndObject()
+
+
+def create_vector(
+    builder: "flatbuffers.Builder", prepend, element_size: int, values: Sequence
+) -> int:
+    """Adds a vector of scalars to the builder. Since the builder grows backwards, the values are added in reverse."""
+    builder.StartVector(element_size, len(values), element_size)
+    for value in reversed(values):
+        prepend(value)
+
+    return builder.EndVector()
+
+
+def create_double_vector(
+    builder: "flatbuffers.Builder", values: Sequence[float]
+) -> int:
+    return create_vector(
+        builder, builder.PrependFloat64, 8, [float(value) for value in values]
+    )
+
+
+def create_offset_vector(builder: "flatbuffers.Builder", offsets: Sequence[int]) -> int:
+    return create_vector(builder, builder.PrependUOffsetTRelative, 4, offsets)
+
+
+def build_packed_r_tree(features: List[FlatGeobufFeature], node_size: int) -> bytes:
+    """Builds a static R-tree over the bounding boxes of the Features, stored level by level from the root to the
+    leaves. The leaves hold the byte offsets of the Features, the other nodes the index of their first child.
+    """
+    level_bounds = calculate_level_bounds(len(features), node_size)
+    nodes = [None] * level_bounds[0][1]
+
+    offset = 0
+    for index, feature in enumerate(features):
+        nodes[level_bounds[0][0] + index] = (*feature.bounding_box, offset)
+        offset += len(feature.encoded_feature)
+
+    for (start, end), (parent_start, _) in zip(level_bounds, level_bounds[1:]):
+        for parent_index, child_start in enumerate(range(start, end, node_size)):
+            children = nodes[child_start : min(child_start + node_size, end)]
+            nodes[parent_start + parent_index] = (
+                *merge_bounding_boxes([child[:4] for child in children]),
+                child_start,
+            )
+
+    return b"".join(NODE_STRUCT.pack(*node) for node in nodes)
+
+
+def calculate_level_bounds(item_count: int, node_size: int) -> List[Tuple[int, int]]:
+    """Returns the first and the end index of the nodes of every tree level, starting with the leaves."""
+    level_node_counts = [item_count]
+    while level_node_counts[-1] > 1:
+        level_node_counts.append(-(-level_node_counts[-1] // node_size))
+
+    level_bounds = []
+    end = sum(level_node_counts)
+    for node_count in level_node_counts:
+        level_bounds.append((end - node_count, end))
+        end -= node_count
+
+    return level_bounds
+
+
+def sort_by_hilbert_value(
+    features: List[FlatGeobufFeature], envelope: BoundingBox
+) -> List[FlatGeobufFeature]:
+    """Sorts the Features by the position of their bounding box center on a Hilbert curve over the envelope, so
+    Features close to each other are stored close to each other.
+    """
+    min_x, min_y, max_x, max_y = envelope
+    width = max_x - min_x or 1.0
+    height = max_y - min_y or 1.0
+
+    def calculate_hilbert_value(feature: FlatGeobufFeature) -> int:
+        feature_min_x, feature_min_y, feature_max_x, feature_max_y = (
+            feature.bounding_box
+        )
+        x = HILBERT_MAXIMUM * ((feature_min_x + feature_max_x) / 2 - min_x) / width
+        y = HILBERT_MAXIMUM * ((feature_min_y + feature_max_y) / 2 - min_y) / height
+        return calculate_hilbert_index(int(x), int(y))
+
+    return sorted(features, key=calculate_hilbert_value)
+
+
+def calculate_hilbert_index(x: int, y: int, order: int = HILBERT_ORDER) -> int:
+    """Returns the index of the cell (x, y) along a Hilbert curve through a grid of 2^order x 2^order cells."""
+    index = 0
+    maximum = (1 << order) - 1
+    size = 1 << (order - 1)
+    while size > 0:
+        rotation_x = 1 if x & size else 0
+        rotation_y = 1 if y & size else 0
+        index += size * size * ((3 * rotation_x) ^ rotation_y)
+        if rotation_y == 0:
+            if rotation_x == 1:
+                x = maximum - x
+                y = maximum - y
+            x, y = y, x
+        size >>= 1
+
+    return index
+
+
+def calculate_bounding_box(geometry: dict) -> BoundingBox:
+    positions = list(iterate_geometry_positions(geometry))
+    return (
+        min(position[0] for position in positions),
+        min(position[1] for position in positions),
+        max(position[0] for position in positions),
+        max(position[1] for position in positions),
+    )
+
+
+def merge_bounding_boxes(bounding_boxes: List[BoundingBox]) -> Optional[BoundingBox]:
+    if not bounding_boxes:
+        return None
+
+    return (
+        min(bounding_box[0] for bounding_box in bounding_boxes),
+        min(bounding_box[1] for bounding_box in bounding_boxes),
+        max(bounding_box[2] for bounding_box in bounding_boxes),
+        max(bounding_box[3] for bounding_box in bounding_boxes),
+    )
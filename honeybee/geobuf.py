@@ -0,0 +1,187 @@
+import json
+from typing import Iterable, List, Sequence
+
+from honeybee import conf
+from honeybee.geometry import count_dimensions
+from honeybee.protobuf import ProtobufWriter
+
+# See https://github.com/mapbox/geobuf/blob/master/geobuf.proto
+DATA_FIELD_KEYS = 1
+DATA_FIELD_DIMENSIONS = 2
+DATA_FIELD_PRECISION = 3
+DATA_FIELD_FEATURE_COLLECTION = 4
+FEATURE_COLLECTION_FIELD_FEATURES = 1
+FEATURE_FIELD_GEOMETRY = 1
+FEATURE_FIELD_ID = 11
+FEATURE_FIELD_INTEGER_ID = 12
+FEATURE_FIELD_VALUES = 13
+FEATURE_FIELD_PROPERTIES = 14
+GEOMETRY_FIELD_TYPE = 1
+GEOMETRY_FIELD_LENGTHS = 2
+GEOMETRY_FIELD_COORDINATES = 3
+GEOMETRY_FIELD_GEOMETRIES = 4
+VALUE_FIELD_STRING = 1
+VALUE_FIELD_DOUBLE = 2
+VALUE_FIELD_POSITIVE_INTEGER = 3
+VALUE_FIELD_NEGATIVE_INTEGER = 4
+VALUE_FIELD_BOOLEAN = 5
+VALUE_FIELD_JSON = 6
+
+DEFAULT_DIMENSIONS = 2
+
+GEOMETRY_TYPES = {
+    "Point": 0,
+    "MultiPoint": 1,
+    "LineString": 2,
+    "MultiLineString": 3,
+    "Polygon": 4,
+    "MultiPolygon": 5,
+    "GeometryCollection": 6,
+}
+
+
+def encode_geobuf(
+    features: Iterable[dict], precision: int = conf.COORDINATE_DECIMAL_PRECISION
+) -> bytes:
+    """Encodes the given GeoJSON Features as Geobuf FeatureCollection.
+    Coordinates are stored as integers with `precision` decimal places, each one as difference to its predecessor.
+    Property keys are stored once for all Features.
+    """
+    features = list(features)
+    keys = {}
+    dimensions = DEFAULT_DIMENSIONS
+    for feature in features:
+        for key in feature.get("properties") or {}:
+            keys.setdefault(key, len(keys))
+        dimensions = max(dimensions, count_dimensions(feature.get("geometry")))
+
+    encoder = GeobufEncoder(keys, dimensions, precision)
+    feature_collection = ProtobufWriter()
+    for feature in features:
+        feature_collection.write_bytes(
+            FEATURE_COLLECTION_FIELD_FEATURES, encoder.encode_feature(feature)
+        )
+
+    writer = ProtobufWriter()
+    for key in keys:
+        writer.write_string(DATA_FIELD_KEYS, key)
+    # Both are written, even if they have their default value, since not all decoders apply the defaults
+    writer.write_varint(DATA_FIELD_DIMENSIONS, dimensions)
+    writer.write_varint(DATA_FIELD_PRECISION, precision)
+    writer.write_bytes(DATA_FIELD_FEATURE_COLLECTION, feature_collection.to_bytes())
+
+    return writer.to_bytes()
+
+
+class GeobufEncoder:
+    """Encodes GeoJSON Features as Geobuf Feature messages with a common key table, number of dimensions and
+    precision.
+    """
+
+    def __init__(self, keys: dict, dimensions: int, precision: int):
+        self.keys = keys
+        self.dimensions = dimensions
+        self.factor = 10**precision
+
+    def encode_feature(self, feature: dict) -> bytes:
+        writer = ProtobufWriter()
+
+        geometry = feature.get("geometry")
+        if geometry:
+            writer.write_bytes(FEATURE_FIELD_GEOMETRY, self.encode_geometry(geometry))
+
+        feature_id = feature.get("id")
+        if isinstance(feature_id, int) and not isinstance(feature_id, bool):
+            writer.write_signed_varint(FEATURE_FIELD_INTEGER_ID, feature_id)
+        elif feature_id is not None:
+            writer.write_string(FEATURE_FIELD_ID, str(feature_id))
+
+        # The values are stored per Feature, the properties refer to the key and the value by index
+        properties = []
+        for value_index, (key, value) in enumerate(
+            (feature.get("properties") or {}).items()
+        ):
+            writer.write_bytes(FEATURE_FIELD_VALUES, encode_value(value))
+            properties.extend([self.keys[key], value_index])
+        writer.write_packed_varints(FEATURE_FIELD_PROPERTIES, properties)
+
+        return writer.to_bytes()
+
+    def encode_geometry(self, geometry: dict) -> bytes:
+        geometry_type = geometry.get("type")
+        coordinates = geometry.get("coordinates") or []
+
+        writer = ProtobufWriter()
+        writer.write_varint(GEOMETRY_FIELD_TYPE, GEOMETRY_TYPES[geometry_type])
+
+        if geometry_type == "GeometryCollection":
+            for member in geometry.get("geometries") or []:
+                writer.write_bytes(
+                    GEOMETRY_FIELD_GEOMETRIES, self.encode_geometry(member)
+                )
+            return writer.to_bytes()
+
+        lengths = []
+        if geometry_type == "Point":
+            lines = [[coordinates]]
+        elif geometry_type in ("MultiPoint", "LineString"):
+            lines = [coordinates]
+        elif geometry_type == "MultiLineString":
+            lines = coordinates
+            if len(lines) != 1:
+                lengths = [len(line) for line in lines]
+        elif geometry_type == "Polygon":
+            # The closing position of a ring is left out
+            lines = [ring[:-1] for ring in coordinates]
+            if len(lines) != 1:
+                lengths = [len(ring) for ring in lines]
+        else:
+            lines = [ring[:-1] for polygon in coordinates for ring in polygon]
+            if len(coordinates) != 1 or len(coordinates[0]) != 1:
+                lengths = [len(coordinates)]
+                for polygon in coordinates:
+                    lengths.append(len(polygon))
+                    lengths.extend(len(ring) - 1 for ring in polygon)
+
+        writer.write_packed_varints(GEOMETRY_FIELD_LENGTHS, lengths)
+        writer.write_packed_signed_varints(
+            GEOMETRY_FIELD_COORDINATES,
+            (delta for line in lines for delta in self._encode_line(line)),
+        )
+
+        return writer.to_bytes()
+
+    def _encode_line(self, line: Sequence[Sequence[float]]) -> List[int]:
+        """Returns the differences between the consecutive quantized positions of the line.
+        The first position is given as difference to the origin.
+        """
+        deltas = []
+        previous_position = [0] * self.dimensions
+        for position in line:
+            for dimension in range(self.dimensions):
+                value = position[dimension] if dimension < len(position) else 0
+                quantized_value = round(value * self.factor)
+                deltas.append(quantized_value - previous_position[dimension])
+                previous_position[dimension] = quantized_value
+
+        return deltas
+
+
+def encode_value(value) -> bytes:
+    """Encodes a property value as Geobuf Value message. Lists and objects are stored as JSON, None as empty Value."""
+    writer = ProtobufWriter()
+
+    if isinstance(value, bool):
+        writer.write_varint(VALUE_FIELD_BOOLEAN, int(value))
+    elif isinstance(value, int) and value >= 0:
+        writer.write_varint(VALUE_FIELD_POSITIVE_INTEGER, value)
+    elif isinstance(value, int):
+        writer.write_varint(VALUE_FIELD_NEGATIVE_INTEGER, -value)
+    elif isinstance(value, float):
+        writer.write_double(VALUE_FIELD_DOUBLE, value)
+    elif isinstance(value, str):
+        writer.write_string(VALUE_FIELD_STRING, value)
+    elif value is not None:
+        writer.write_string(VALUE_FIELD_JSON, json.dumps(value))
+
+    return writer.to_bytes()
@@ -0,0 +1,273 @@
+import dataclasses
+import math
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from honeybee.commons import BoundingBox, Point, Tile
+
+EARTH_RADIUS_KILOMETERS = 6371.0087714
+KILOMETERS_PER_DEGREE_LATITUDE = 111.195
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_BITS_PER_LEVEL = 5
+MINIMUM_GEOHASH_LEVEL = 1
+MAXIMUM_GEOHASH_LEVEL = 11
+
+WEB_MERCATOR_MAXIMUM_LATITUDE = 85.0511287798066
+
+
+def create_bounding_box_around_point(center: Point, radius: float) -> BoundingBox:
+    """Returns the bounding box of the circle with the given `radius` (in kilometers) around `center`.
+    The box is clipped to valid coordinates.
+    """
+    latitude_delta = radius / KILOMETERS_PER_DEGREE_LATITUDE
+
+    latitude_cosine = math.cos(math.radians(center.latitude))
+    if latitude_cosine > 0:
+        longitude_delta = min(
+            radius / (KILOMETERS_PER_DEGREE_LATITUDE * latitude_cosine), 180
+        )
+    else:
+        longitude_delta = 180
+
+    return BoundingBox(
+        minimum_latitude=max(center.latitude - latitude_delta, -90.0),
+        minimum_longitude=max(center.longitude - longitude_delta, -180.0),
+        maximum_latitude=min(center.latitude + latitude_delta, 90.0),
+        maximum_longitude=min(center.longitude + longitude_delta, 180.0),
+    )
+
+
+def split_bounding_box_at_antimeridian(bounding_box: BoundingBox) -> List[BoundingBox]:
+    """Returns the parts of the given bounding box east and west of the antimeridian.
+    A box crosses the antimeridian, if its minimum longitude is greater than its maximum longitude (e.g. a map
+    viewport centered on the Pacific). Other boxes are returned unchanged.
+    """
+    if bounding_box.minimum_longitude <= bounding_box.maximum_longitude:
+        return [bounding_box]
+
+    return [
+        dataclasses.replace(bounding_box, maximum_longitude=180.0),
+        dataclasses.replace(bounding_box, minimum_longitude=-180.0),
+    ]
+
+
+def calculate_bounding_box_width(bounding_box: BoundingBox) -> float:
+    """Returns the width of the given bounding box in degrees longitude, also for boxes crossing the antimeridian."""
+    width = bounding_box.maximum_longitude - bounding_box.minimum_longitude
+    return width if width >= 0 else width + 360
+
+
+def calculate_geohash_bits(level: int) -> Tuple[int, int]:
+    """Returns the number of longitude and latitude bits of a geohash of the given `level`."""
+    bits = level * GEOHASH_BITS_PER_LEVEL
+    return math.ceil(bits / 2), bits // 2
+
+
+def calculate_geohash_cell_width(level: int) -> float:
+    """Returns the width (in degrees longitude) of a geohash cell of the given `level`."""
+    longitude_bits, _ = calculate_geohash_bits(level)
+    return 360 / 2**longitude_bits
+
+
+def calculate_geohash_level_for_zoom(zoom: int, cells_per_tile: int) -> int:
+    """Returns the geohash level whose cells are closest in width to 1/`cells_per_tile` of a web map tile at the
+    given `zoom` level.
+    """
+    return calculate_geohash_level_for_width(360 / 2**zoom / cells_per_tile)
+
+
+def calculate_geohash_level_for_width(target_cell_width: float) -> int:
+    """Returns the geohash level whose cells are closest in width to `target_cell_width` (in degrees longitude)."""
+    return min(
+        range(MINIMUM_GEOHASH_LEVEL, MAXIMUM_GEOHASH_LEVEL + 1),
+        key=lambda level: abs(
+            math.log2(calculate_geohash_cell_width(level) / target_cell_width)
+        ),
+    )
+
+
+def encode_geohash(point: Point, level: int) -> str:
+    """Returns the geohash of the given `level` of the cell holding the `point`."""
+    longitude_bits, latitude_bits = calculate_geohash_bits(level)
+    longitude_cell = calculate_cell_index(point.longitude, -180, 360, longitude_bits)
+    latitude_cell = calculate_cell_index(point.latitude, -90, 180, latitude_bits)
+
+    # The bits of the longitude and the latitude are interleaved, starting with the longitude
+    interleaved_bits = 0
+    for bit_index in range(level * GEOHASH_BITS_PER_LEVEL):
+        if bit_index % 2 == 0:
+            longitude_bits -= 1
+            bit = (longitude_cell >> longitude_bits) & 1
+        else:
+            latitude_bits -= 1
+            bit = (latitude_cell >> latitude_bits) & 1
+        interleaved_bits = (interleaved_bits << 1) | bit
+
+    return "".join(
+        GEOHASH_ALPHABET[
+            (interleaved_bits >> (GEOHASH_BITS_PER_LEVEL * (level - index - 1))) & 31
+        ]
+        for index in range(level)
+    )
+
+
+def calculate_cell_index(
+    coordinate: float, minimum: float, extent: float, bits: int
+) -> int:
+    """Returns the index of the cell holding the `coordinate`, if the range is split into 2 to the power of `bits`
+    cells of equal size.
+    """
+    cell_count = 2**bits
+    return min(
+        max(int((coordinate - minimum) / extent * cell_count), 0), cell_count - 1
+    )
+
+
+def calculate_tile_bounding_box(tile: Tile, buffer: float = 0.0) -> BoundingBox:
+    """Returns the bounding box of the given web map tile, extended by `buffer` (a fraction of the tile size) on
+    every side. The box is clipped to valid coordinates.
+    """
+    tile_count = 2**tile.zoom
+
+    def calculate_longitude(column: float) -> float:
+        return column / tile_count * 360 - 180
+
+    def calculate_latitude(row: float) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / tile_count))))
+
+    return BoundingBox(
+        minimum_latitude=max(calculate_latitude(tile.y + 1 + buffer), -90.0),
+        minimum_longitude=max(calculate_longitude(tile.x - buffer), -180.0),
+        maximum_latitude=min(calculate_latitude(tile.y - buffer), 90.0),
+        maximum_longitude=min(calculate_longitude(tile.x + 1 + buffer), 180.0),
+    )
+
+
+def project_to_tile(
+    longitude: float, latitude: float, tile: Tile, extent: int
+) -> Tuple[int, int]:
+    """Projects the position into the Web Mercator grid of the given tile, which is `extent` units wide and high.
+    The origin is the upper left corner of the tile. Positions outside of the tile get coordinates outside of the grid.
+    """
+    tile_count = 2**tile.zoom
+    latitude = min(
+        max(latitude, -WEB_MERCATOR_MAXIMUM_LATITUDE), WEB_MERCATOR_MAXIMUM_LATITUDE
+    )
+    latitude_sine = math.sin(math.radians(latitude))
+
+    x = (longitude + 180) / 360 * tile_count
+    y = (
+        0.5 - math.log((1 + latitude_sine) / (1 - latitude_sine)) / (4 * math.pi)
+    ) * tile_count
+
+    return round((x - tile.x) * extent), round((y - tile.y) * extent)
+
+
+def calculate_haversine_distance(point: Point, other_point: Point) -> float:
+    """Returns the great-circle distance (in kilometers) between the two points."""
+    latitude = math.radians(point.latitude)
+    other_latitude = math.radians(other_point.latitude)
+
+    haversine = (
+        math.sin((other_latitude - latitude) / 2) ** 2
+        + math.cos(latitude)
+        * math.cos(other_latitude)
+        * math.sin(math.radians(other_point.longitude - point.longitude) / 2) ** 2
+    )
+
+    return 2 * EARTH_RADIUS_KILOMETERS * math.asin(math.sqrt(min(haversine, 1.0)))
+
+
+def extract_representative_point(geometry: Optional[dict]) -> Optional[Point]:
+    """Returns the point of a GeoJSON Point geometry or the mean of all positions of any other geometry.
+    GeoJSON positions are given in the order longitude, latitude. Returns None for an empty or missing geometry.
+    """
+    if not geometry:
+        return None
+
+    if geometry.get("type") == "GeometryCollection":
+        positions = [
+            position
+            for member in geometry.get("geometries", [])
+            for position in iterate_positions(member.get("coordinates"))
+        ]
+    else:
+        positions = list(iterate_positions(geometry.get("coordinates")))
+
+    if not positions:
+        return None
+
+    return Point(
+        longitude=sum(position[0] for position in positions) / len(positions),
+        latitude=sum(position[1] for position in positions) / len(positions),
+    )
+
+
+def iterate_positions(coordinates) -> Iterator[Tuple[float, float]]:
+    """Yields all (longitude, latitude) positions of a (nested) GeoJSON coordinates array."""
+    if not coordinates:
+        return
+
+    if isinstance(coordinates[0], (int, float)):
+        yield float(coordinates[0]), float(coordinates[1])
+        return
+
+    for member in coordinates:
+        yield from iterate_positions(member)
+
+
+def iterate_geometry_positions(geometry: Optional[dict]) -> Iterator[Sequence[float]]:
+    """Yields all positions of a GeoJSON geometry, including the members of a GeometryCollection, as they are."""
+    if not geometry:
+        return
+
+    if geometry.get("type") == "GeometryCollection":
+        for member in geometry.get("geometries") or []:
+            yield from iterate_geometry_positions(member)
+        return
+
+    def iterate_nested_positions(coordinates) -> Iterator[Sequence[float]]:
+        if not coordinates:
+            return
+
+        if isinstance(coordinates[0], (int, float)):
+            yield coordinates
+            return
+
+        for member in coordinates:
+            yield from iterate_nested_positions(member)
+
+    yield from iterate_nested_positions(geometry.get("coordinates"))
+
+
+def count_dimensions(geometry: Optional[dict]) -> int:
+    """Returns the highest number of values of the positions in the GeoJSON geometry, but at least 2."""
+    return max(
+        [len(position) for position in iterate_geometry_positions(geometry)] + [2]
+    )
+
+
+def round_geometry(geometry: Optional[dict], precision: int) -> Optional[dict]:
+    """Returns a copy of the GeoJSON geometry with all coordinates rounded to `precision` decimal places."""
+    if not geometry:
+        return geometry
+
+    if geometry.get("type") == "GeometryCollection":
+        return {
+            **geometry,
+            "geometries": [
+                round_geometry(member, precision)
+                for member in geometry.get("geometries") or []
+            ],
+        }
+
+    def round_coordinates(coordinates):
+        if not coordinates:
+            return coordinates
+
+        if isinstance(coordinates[0], (int, float)):
+            return [round(value, precision) for value in coordinates]
+
+        return [round_coordinates(member) for member in coordinates]
+
+    return {**geometry, "coordinates": round_coordinates(geometry.get("coordinates"))}
@@ -0,0 +1,265 @@
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from pysolr import SolrError
+
+from honeybee import conf
+from honeybee.databases.features import (
+    extract_date,
+    extract_taxa,
+    load_features_from_file,
+)
+from honeybee.databases.solr import (
+    SOLR_NOW_KEYWORD_STRING,
+    SOLR_PARAMETER_NAME_DATE,
+    create_http_session,
+)
+from honeybee.geometry import encode_geohash, extract_representative_point
+
+logger = logging.getLogger(__name__)
+
+SOLR_UPDATE_HANDLER = "update"
+
+
+@dataclass
+class IndexingCheckpoint:
+    """Holds the progress of indexing a file. All Features before `position` are committed to Solr."""
+
+    path: str
+    position: int = 0
+
+    @classmethod
+    def load(cls, checkpoint_path: str, path: str) -> "IndexingCheckpoint":
+        """Loads the checkpoint of `path` from the file at `checkpoint_path`.
+        If there is no checkpoint file or it belongs to another file, indexing starts from the beginning.
+        """
+        try:
+            with open(checkpoint_path, encoding="utf-8") as checkpoint_file:
+                checkpoint = cls(**json.load(checkpoint_file))
+        except FileNotFoundError:
+            return cls(path=path)
+
+        if checkpoint.path != path:
+            logger.warning(
+                f"Ignoring the checkpoint {checkpoint_path}, because it belongs to {checkpoint.path}."
+            )
+            return cls(path=path)
+
+        return checkpoint
+
+    def save(self, checkpoint_path: str) -> None:
+        """Writes the checkpoint atomically, so an interruption never leaves a broken checkpoint file."""
+        temporary_path = f"{checkpoint_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as checkpoint_file:
+            json.dump({"path": self.path, "position": self.position}, checkpoint_file)
+
+        os.replace(temporary_path, checkpoint_path)
+
+
+class SolrIndexer:
+    """Indexes GeoJSON Features into a Solr core.
+
+    The documents are posted in batches of `batch_size` by `worker_count` parallel threads sharing a pooled HTTP
+    session. After every `commit_size` documents, the indexer waits for all pending batches and commits them.
+    """
+
+    def __init__(
+        self,
+        solr_url: str,
+        batch_size: int = None,
+        commit_size: int = None,
+        worker_count: int = None,
+    ):
+        self.solr_url = solr_url.rstrip("/")
+        self.batch_size = batch_size or conf.MAP_VIEWER_SOLR_INDEXING_BATCH_SIZE
+        self.commit_size = max(
+            commit_size or conf.MAP_VIEWER_SOLR_INDEXING_COMMIT_SIZE, self.batch_size
+        )
+        self.worker_count = worker_count or conf.MAP_VIEWER_SOLR_INDEXING_WORKERS
+        self._session = create_http_session(
+            pool_size=self.worker_count, keep_alive=True
+        )
+        self._timeout = (
+            conf.MAP_VIEWER_SOLR_CONNECT_TIMEOUT,
+            conf.MAP_VIEWER_SOLR_READ_TIMEOUT,
+        )
+
+    def index_file(
+        self,
+        path: str,
+        checkpoint_path: Optional[str] = None,
+        on_commit: Callable[[int], None] = None,
+    ) -> int:
+        """Indexes all Features of a FeatureCollection or NDJSON file and returns the number of indexed documents.
+        If a `checkpoint_path` is given, indexing resumes after the last committed Feature of a previous run and
+        the checkpoint is removed when the whole file is indexed.
+        `on_commit` is called with the number of Features read from the file after every commit.
+        """
+        path = str(Path(path).resolve())
+        checkpoint = (
+            IndexingCheckpoint.load(checkpoint_path, path)
+            if checkpoint_path is not None
+            else IndexingCheckpoint(path=path)
+        )
+
+        features = islice(load_features_from_file(path), checkpoint.position, None)
+
+        def save_checkpoint(feature_count: int) -> None:
+            checkpoint.position += feature_count
+            if checkpoint_path is not None:
+                checkpoint.save(checkpoint_path)
+            if on_commit is not None:
+                on_commit(checkpoint.position)
+
+        document_count = self.index_features(features, on_commit=save_checkpoint)
+
+        if checkpoint_path is not None and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+        return document_count
+
+    def index_features(
+        self, features: Iterable[dict], on_commit: Callable[[int], None] = None
+    ) -> int:
+        """Indexes the given Features and returns the number of indexed documents.
+        Features that can not be converted into a Solr document are logged and left out.
+        `on_commit` is called with the number of Features covered by every commit.
+        """
+        document_count = 0
+        feature_iterator = iter(features)
+
+        with ThreadPoolExecutor(max_workers=self.worker_count) as executor:
+            while True:
+                commit_features = list(islice(feature_iterator, self.commit_size))
+                if not commit_features:
+                    break
+
+                documents = [
+                    document
+                    for document in map(create_solr_document, commit_features)
+                    if document is not None
+                ]
+                if documents:
+                    # Raises the first error of any batch, so the uncommitted Features are indexed again on resume
+                    for _ in executor.map(
+                        self.post_documents,
+                        iterate_batches(documents, self.batch_size),
+                    ):
+                        pass
+
+                    self.commit()
+                    document_count += len(documents)
+
+                if on_commit is not None:
+                    on_commit(len(commit_features))
+
+        return document_count
+
+    def mark_as_deleted(self, location_ids: Iterable[str]) -> int:
+        """Marks the documents with the given IDs as deleted and commits them. Returns the number of marked documents.
+        The documents are updated in place instead of being removed, so they are returned as tombstones to searches
+        for changes. Indexing a Feature with the same ID again revives it.
+        """
+        deleted_field_name = conf.MAP_VIEWER_SOLR_DELETED_FIELD_NAME
+        last_modified_field_name = conf.MAP_VIEWER_SOLR_LAST_MODIFIED_FIELD_NAME
+        if deleted_field_name is None or last_modified_field_name is None:
+            raise ValueError(
+                "Marking documents as deleted requires a deleted and a last-modified field!"
+            )
+
+        documents = [
+            {
+                "id": location_id,
+                deleted_field_name: {"set": True},
+                last_modified_field_name: {"set": SOLR_NOW_KEYWORD_STRING},
+            }
+            for location_id in dict.fromkeys(location_ids)
+        ]
+        if documents:
+            for batch in iterate_batches(documents, self.batch_size):
+                self.post_documents(batch)
+
+            self.commit()
+
+        return len(documents)
+
+    def post_documents(self, documents: List[dict]) -> None:
+        """Sends the documents to Solr in a single update request without committing them."""
+        self._post_update(json.dumps(documents))
+
+    def commit(self) -> None:
+        self._post_update(json.dumps({"commit": {}}))
+
+    def _post_update(self, body: str) -> None:
+        response = self._session.post(
+            f"{self.solr_url}/{SOLR_UPDATE_HANDLER}",
+            params={"wt": "json"},
+            data=body.encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            timeout=self._timeout,
+        )
+
+        if not response.ok:
+            raise SolrError(
+                f"Solr responded with an error (HTTP {response.status_code}): {response.text}"
+            )
+
+    def close(self) -> None:
+        self._session.close()
+
+
+def create_solr_document(feature: dict) -> Optional[dict]:
+    """Converts a GeoJSON Feature into a Solr document holding the ID, the location, the date, the taxa and the
+    serialized Feature. Returns None, if the Feature has no ID or no geometry.
+    If a last-modified field is configured, it is set to the time Solr receives the document. If a geohash cell field
+    prefix is configured, the geohash prefixes of all levels up to `conf.MAP_VIEWER_SOLR_GEOHASH_CELL_LEVELS` are set
+    for spread searches.
+    """
+    point = extract_representative_point(feature.get("geometry"))
+    if feature.get("id") is None or point is None:
+        logger.warning("Skipping a GeoJSON Feature without an ID or a geometry.")
+        return None
+
+    location = (
+        f"{round(point.latitude, conf.COORDINATE_DECIMAL_PRECISION)},"
+        f"{round(point.longitude, conf.COORDINATE_DECIMAL_PRECISION)}"
+    )
+
+    document = {
+        "id": str(feature["id"]),
+        conf.MAP_VIEWER_SOLR_GEOSPATIAL_FIELD_NAME: location,
+        conf.MAP_VIEWER_SOLR_HEATMAP_FIELD_NAME: location,
+        conf.MAP_VIEWER_SOLR_GEOJSON_DATA_FIELD_NAME: json.dumps(feature),
+    }
+
+    taxa = extract_taxa(feature)
+    if taxa:
+        document[conf.MAP_VIEWER_SOLR_TERM_SEARCH_FIELD_NAME] = taxa
+
+    feature_date = extract_date(feature)
+    if feature_date is not None:
+        document[SOLR_PARAMETER_NAME_DATE] = f"{feature_date.isoformat()}T00:00:00Z"
+
+    if conf.MAP_VIEWER_SOLR_LAST_MODIFIED_FIELD_NAME is not None:
+        document[conf.MAP_VIEWER_SOLR_LAST_MODIFIED_FIELD_NAME] = (
+            SOLR_NOW_KEYWORD_STRING
+        )
+
+    if conf.MAP_VIEWER_SOLR_GEOHASH_CELL_FIELD_PREFIX is not None:
+        geohash = encode_geohash(point, conf.MAP_VIEWER_SOLR_GEOHASH_CELL_LEVELS)
+        for level in range(1, conf.MAP_VIEWER_SOLR_GEOHASH_CELL_LEVELS + 1):
+            field_name = f"{conf.MAP_VIEWER_SOLR_GEOHASH_CELL_FIELD_PREFIX}{level}"
+            document[field_name] = geohash[:level]
+
+    return document
+
+
+def iterate_batches(items: List, batch_size: int) -> Iterator[List]:
+    for start in range(0, len(items), batch_size):
+        yield items[start : start + batch_size]
@@ -0,0 +1,31 @@
+import itertools
+
+from django.core.management.base import BaseCommand, CommandError
+
+from honeybee.databases.features import load_features_from_file
+from honeybee.databases.mapped import build_feature_store
+
+
+class Command(BaseCommand):
+    help = (
+        "Builds a feature store for the memory-mapped spatial database from the GeoJSON Features of "
+        "FeatureCollection or NDJSON (.ndjson, .jsonl) files. An existing store is replaced atomically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="The GeoJSON files to store.")
+        parser.add_argument("output", help="The path of the feature store file.")
+
+    def handle(self, *args, **options):
+        features = itertools.chain.from_iterable(
+            load_features_from_file(path) for path in options["paths"]
+        )
+
+        try:
+            feature_count = build_feature_store(options["output"], features)
+        except (ImportError, OSError, ValueError) as error:
+            raise CommandError(f"Building the feature store failed: {error}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{options['output']}: stored {feature_count} Features")
+        )
@@ -0,0 +1,91 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from pysolr import SolrError
+
+from honeybee import conf
+from honeybee.indexing import SolrIndexer
+
+CHECKPOINT_FILE_SUFFIX = ".checkpoint"
+
+
+class Command(BaseCommand):
+    help = (
+        "Indexes the GeoJSON Features of FeatureCollection or NDJSON (.ndjson, .jsonl) files into Solr. "
+        "An interrupted run resumes after the last commit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="The GeoJSON files to index.")
+        parser.add_argument(
+            "--solr-url",
+            default=conf.MAP_VIEWER_SOLR_SPATIAL_DATABASE_HOSTNAME,
+            help="The URL of the Solr core. Defaults to MAP_VIEWER_SOLR_SPATIAL_DATABASE_HOSTNAME.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=conf.MAP_VIEWER_SOLR_INDEXING_BATCH_SIZE,
+            help="The number of documents per update request.",
+        )
+        parser.add_argument(
+            "--commit-size",
+            type=int,
+            default=conf.MAP_VIEWER_SOLR_INDEXING_COMMIT_SIZE,
+            help="The number of documents between two commits (and checkpoints).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=conf.MAP_VIEWER_SOLR_INDEXING_WORKERS,
+            help="The number of update requests sent in parallel.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore existing checkpoints and index all files from the beginning.",
+        )
+
+    def handle(self, *args, **options):
+        if options["solr_url"] is None:
+            raise CommandError("The URL of the Solr core has to be set!")
+
+        for name in ("batch_size", "commit_size", "workers"):
+            if options[name] <= 0:
+                raise CommandError(
+                    conf.ERROR_MESSAGE_PARAMETER_HAS_TO_BE_POSITIVE.format(name=name)
+                )
+
+        indexer = SolrIndexer(
+            options["solr_url"],
+            batch_size=options["batch_size"],
+            commit_size=options["commit_size"],
+            worker_count=options["workers"],
+        )
+
+        try:
+            for path in options["paths"]:
+                self.index_file(indexer, path, restart=options["restart"])
+        except (OSError, ValueError, SolrError) as error:
+            raise CommandError(
+                f"Indexing stopped: {error} Run the command again to resume after the last commit."
+            )
+        finally:
+            indexer.close()
+
+    def index_file(self, indexer: SolrIndexer, path: str, restart: bool) -> None:
+        checkpoint_path = f"{path}{CHECKPOINT_FILE_SUFFIX}"
+        if restart and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+        document_count = indexer.index_file(
+            path,
+            checkpoint_path=checkpoint_path,
+            on_commit=lambda position: self.stdout.write(
+                f"{path}: committed the first {position} Features"
+            ),
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{path}: indexed {document_count} documents")
+        )
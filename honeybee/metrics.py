@@ -0,0 +1,475 @@
+import glob
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from honeybee import conf
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRICS_FILE_PREFIX = "honeybee_"
+METRICS_FILE_SUFFIX = ".db"
+METRICS_FILE_INITIAL_SIZE = 64 * 1024
+
+# The first 8 bytes of a metrics file hold the number of used bytes
+METRICS_FILE_HEADER = struct.Struct("<I4x")
+METRICS_ENTRY_KEY_LENGTH = struct.Struct("<I")
+METRICS_ENTRY_VALUE = struct.Struct("<d")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RESULT_SIZE_BUCKETS = (0, 1, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+SampleKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class MetricValues:
+    """Holds the sample values of the current process in memory."""
+
+    def __init__(self):
+        self._values = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def add(self, key: str, amount: float) -> None:
+        with self._lock:
+            self._values[key] += amount
+
+    def read(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class MmapMetricValues(MetricValues):
+    """Holds the sample values of the current process in a memory-mapped file, so other processes can read them.
+    Every entry consists of the length of the key, the UTF-8 encoded key (padded to 8 bytes) and the value as double.
+    Entries are only appended, and the number of used bytes is updated after an entry is complete, so readers never
+    see partial entries.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._positions = {}
+
+        with open(path, "a+b") as metrics_file:
+            if os.fstat(metrics_file.fileno()).st_size < METRICS_FILE_INITIAL_SIZE:
+                metrics_file.truncate(METRICS_FILE_INITIAL_SIZE)
+        self._file = open(path, "r+b")
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+
+        self._used = METRICS_FILE_HEADER.unpack_from(self._mmap, 0)[0]
+        if self._used == 0:
+            self._used = METRICS_FILE_HEADER.size
+            METRICS_FILE_HEADER.pack_into(self._mmap, 0, self._used)
+
+        for key, value, position in iterate_metrics_file_entries(
+            self._mmap, self._used
+        ):
+            self._positions[key] = position
+
+    def add(self, key: str, amount: float) -> None:
+        with self._lock:
+            position = self._positions.get(key)
+            if position is None:
+                position = self._append_entry(key)
+
+            value = METRICS_ENTRY_VALUE.unpack_from(self._mmap, position)[0]
+            METRICS_ENTRY_VALUE.pack_into(self._mmap, position, value + amount)
+
+    def read(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                key: value
+                for key, value, _ in iterate_metrics_file_entries(
+                    self._mmap, self._used
+                )
+            }
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+    def _append_entry(self, key: str) -> int:
+        encoded_key = key.encode("utf-8")
+        key_size = METRICS_ENTRY_KEY_LENGTH.size + len(encoded_key)
+        padded_key_size = key_size + (-key_size % 8)
+        entry_size = padded_key_size + METRICS_ENTRY_VALUE.size
+
+        while self._used + entry_size > len(self._mmap):
+            self._resize(len(self._mmap) * 2)
+
+        METRICS_ENTRY_KEY_LENGTH.pack_into(self._mmap, self._used, len(encoded_key))
+        start = self._used + METRICS_ENTRY_KEY_LENGTH.size
+        self._mmap[start : start + len(encoded_key)] = encoded_key
+        position = self._used + padded_key_size
+        METRICS_ENTRY_VALUE.pack_into(self._mmap, position, 0.0)
+
+        self._used += entry_size
+        METRICS_FILE_HEADER.pack_into(self._mmap, 0, self._used)
+        self._positions[key] = position
+
+        return position
+
+    def _resize(self, size: int) -> None:
+        self._mmap.close()
+        self._file.truncate(size)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+
+
+def iterate_metrics_file_entries(data, used: int) -> Iterable[Tuple[str, float, int]]:
+    """Yields the key, the value and the position of the value of every entry in the used part of a metrics file."""
+    position = METRICS_FILE_HEADER.size
+    while position < used:
+        key_length = METRICS_ENTRY_KEY_LENGTH.unpack_from(data, position)[0]
+        key_start = position + METRICS_ENTRY_KEY_LENGTH.size
+        key = bytes(data[key_start : key_start + key_length]).decode("utf-8")
+        key_size = METRICS_ENTRY_KEY_LENGTH.size + key_length
+        value_position = position + key_size + (-key_size % 8)
+
+        yield key, METRICS_ENTRY_VALUE.unpack_from(data, value_position)[
+            0
+        ], value_position
+
+        position = value_position + METRICS_ENTRY_VALUE.size
+
+
+def read_metrics_file(path: str) -> Dict[str, float]:
+    with open(path, "rb") as metrics_file:
+        data = metrics_file.read()
+
+    if len(data) < METRICS_FILE_HEADER.size:
+        return {}
+
+    used = METRICS_FILE_HEADER.unpack_from(data, 0)[0]
+    return {key: value for key, value, _ in iterate_metrics_file_entries(data, used)}
+
+
+def create_metrics_file_path(directory: str, pid: int) -> str:
+    return os.path.join(directory, f"{METRICS_FILE_PREFIX}{pid}{METRICS_FILE_SUFFIX}")
+
+
+def parse_metrics_file_pid(path: str) -> Optional[int]:
+    """Returns the ID of the process writing the metrics file at `path`, or None for foreign file names."""
+    name = os.path.basename(path)[len(METRICS_FILE_PREFIX) : -len(METRICS_FILE_SUFFIX)]
+    try:
+        return int(name)
+    except ValueError:
+        return None
+
+
+def remove_metrics_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def is_process_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The process exists, but belongs to another user
+        return True
+
+    return True
+
+
+def mark_process_dead(pid: int, directory: Optional[str] = None) -> None:
+    """Removes the metrics file of the process with the given `pid` from `directory` (by default
+    `conf.MAP_VIEWER_METRICS_DIRECTORY`), so its values are no longer reported. Call it when a worker process exits,
+    e.g. in the `child_exit` hook of gunicorn. Otherwise, the file is removed when the metrics are collected next.
+    """
+    directory = directory or conf.MAP_VIEWER_METRICS_DIRECTORY
+    if directory is not None:
+        remove_metrics_file(create_metrics_file_path(directory, pid))
+
+
+class Metric:
+    """A named metric, whose samples are identified by the values of its labels."""
+
+    metric_type = None
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        registry: "MetricsRegistry" = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.registry = registry or metrics_registry
+        self.registry.register(self)
+
+    @property
+    def sample_names(self) -> Tuple[str, ...]:
+        return (self.name,)
+
+    def _add(self, sample_name: str, amount: float, labels: Dict[str, str]) -> None:
+        if not conf.MAP_VIEWER_METRICS_ENABLED:
+            return
+
+        self.registry.add(create_sample_key(sample_name, labels), amount)
+
+    def _validate_labels(self, labels: Dict[str, object]) -> Dict[str, str]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(
+                f"The metric {self.name} requires the labels {', '.join(self.label_names)}!"
+            )
+
+        return {name: str(value) for name, value in labels.items()}
+
+
+class Counter(Metric):
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        self._add(self.name, amount, self._validate_labels(labels))
+
+
+class Histogram(Metric):
+    """Counts the observed values in cumulative buckets with the given upper bounds and sums them up."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float],
+        label_names: Sequence[str] = (),
+        registry: "MetricsRegistry" = None,
+    ):
+        super().__init__(name, documentation, label_names, registry)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    @property
+    def sample_names(self) -> Tuple[str, ...]:
+        return f"{self.name}_bucket", f"{self.name}_count", f"{self.name}_sum"
+
+    def observe(self, value: float, **labels) -> None:
+        labels = self._validate_labels(labels)
+        for upper_bound in self.buckets:
+            if value <= upper_bound:
+                self._add(
+                    f"{self.name}_bucket",
+                    1.0,
+                    {**labels, "le": format_sample_value(upper_bound)},
+                )
+        self._add(f"{self.name}_sum", value, labels)
+        self._add(f"{self.name}_count", 1.0, labels)
+
+
+class MetricsRegistry:
+    """Holds all metrics and the sample values of the current process.
+    If `conf.MAP_VIEWER_METRICS_DIRECTORY` is set, every process writes its values to its own memory-mapped file in
+    this directory and the values of all files are summed up when they are collected. This way, all worker processes
+    of a server (e.g. gunicorn) report the same totals. Otherwise, every process reports only its own values.
+    """
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+        self._values: Optional[MetricValues] = None
+        self._values_pid = None
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> None:
+        self.metrics.append(metric)
+
+    def add(self, key: str, amount: float) -> None:
+        self._get_values().add(key, amount)
+
+    def collect(self) -> Dict[SampleKey, float]:
+        """Returns the summed up values of all processes sharing the metrics directory, or of this process only.
+        The files of processes which are no longer running (e.g. exited workers or the workers of a previous run)
+        are removed instead of being summed up.
+        """
+        directory = conf.MAP_VIEWER_METRICS_DIRECTORY
+        if directory is None:
+            raw_values = [self._get_values().read()]
+        else:
+            self._get_values()
+            raw_values = []
+            for path in sorted(
+                glob.glob(
+                    os.path.join(
+                        directory, f"{METRICS_FILE_PREFIX}*{METRICS_FILE_SUFFIX}"
+                    )
+                )
+            ):
+                pid = parse_metrics_file_pid(path)
+                if pid is not None and not is_process_running(pid):
+                    remove_metrics_file(path)
+                    continue
+
+                try:
+                    raw_values.append(read_metrics_file(path))
+                except FileNotFoundError:
+                    # Another process removed the file in the meantime
+                    continue
+
+        samples = defaultdict(float)
+        for values in raw_values:
+            for key, value in values.items():
+                samples[parse_sample_key(key)] += value
+
+        return dict(samples)
+
+    def render(self) -> str:
+        """Renders all metrics in the Prometheus text exposition format."""
+        samples = self.collect()
+        lines = []
+
+        for metric in self.metrics:
+            lines.append(
+                f"# HELP {metric.name} {escape_help_text(metric.documentation)}"
+            )
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+
+            metric_samples = [
+                (sample_name, labels, value)
+                for (sample_name, labels), value in samples.items()
+                if sample_name in metric.sample_names
+            ]
+            for sample_name, labels, value in sorted(
+                metric_samples, key=lambda sample: create_sample_sort_key(*sample)
+            ):
+                lines.append(
+                    f"{sample_name}{format_labels(labels)} {format_sample_value(value)}"
+                )
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Drops the values of this process, e.g. in tests. The files of other processes are left untouched."""
+        with self._lock:
+            if isinstance(self._values, MmapMetricValues):
+                self._values.close()
+                os.remove(self._values.path)
+            self._values = None
+            self._values_pid = None
+
+    def _get_values(self) -> MetricValues:
+        """Returns the values of the current process. Forked processes get their own values."""
+        pid = os.getpid()
+        if self._values is not None and self._values_pid == pid:
+            return self._values
+
+        with self._lock:
+            if self._values is None or self._values_pid != pid:
+                directory = conf.MAP_VIEWER_METRICS_DIRECTORY
+                if directory is None:
+                    self._values = MetricValues()
+                else:
+                    os.makedirs(directory, exist_ok=True)
+                    path = create_metrics_file_path(directory, pid)
+                    # A file of this process ID belongs to a previous process, which got the same ID
+                    remove_metrics_file(path)
+                    self._values = MmapMetricValues(path)
+                self._values_pid = pid
+
+        return self._values
+
+
+def create_sample_key(sample_name: str, labels: Dict[str, str]) -> str:
+    return json.dumps([sample_name, sorted(labels.items())])
+
+
+def parse_sample_key(key: str) -> SampleKey:
+    sample_name, labels = json.loads(key)
+    return sample_name, tuple((name, value) for name, value in labels)
+
+
+def create_sample_sort_key(sample_name: str, labels: tuple, value: float) -> tuple:
+    """Sorts the samples by name and labels, histogram buckets by their numeric upper bound."""
+    return sample_name, tuple(
+        (name, float(value) if name == "le" else value, value) for name, value in labels
+    )
+
+
+def format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    formatted_labels = ",".join(
+        f'{name}="{escape_label_value(value)}"' for name, value in labels
+    )
+    return f"{{{formatted_labels}}}" if formatted_labels else ""
+
+
+def format_sample_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+
+    return repr(float(value))
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def escape_help_text(text: str) -> str:
+    return text.replace("\\", r"\\").replace("\n", r"\n")
+
+
+metrics_registry = MetricsRegistry()
+
+search_requests = Counter(
+    "honeybee_search_requests_total",
+    "Number of search requests by view and HTTP status code.",
+    label_names=("view", "status"),
+)
+search_duration = Histogram(
+    "honeybee_search_duration_seconds",
+    "Duration of search requests in seconds, including the serialization of the response.",
+    buckets=DURATION_BUCKETS,
+    label_names=("view",),
+)
+search_result_size = Histogram(
+    "honeybee_search_result_features",
+    "Number of Features returned by successful search requests.",
+    buckets=RESULT_SIZE_BUCKETS,
+    label_names=("view",),
+)
+solr_requests = Counter(
+    "honeybee_solr_requests_total",
+    "Number of requests sent to Solr.",
+    label_names=("handler",),
+)
+solr_errors = Counter(
+    "honeybee_solr_errors_total",
+    "Number of failed Solr requests by kind of error (error or timeout).",
+    label_names=("handler", "kind"),
+)
+solr_duration = Histogram(
+    "honeybee_solr_request_duration_seconds",
+    "Duration of Solr requests in seconds.",
+    buckets=DURATION_BUCKETS,
+    label_names=("handler",),
+)
+cache_requests = Counter(
+    "honeybee_cache_requests_total",
+    "Number of cache lookups by cache and result (hit or miss).",
+    label_names=("cache", "result"),
+)
+coalesced_requests = Counter(
+    "honeybee_coalesced_requests_total",
+    "Number of coalesced database requests by role (leader sending the request or follower sharing its result).",
+    label_names=("role",),
+)
+
+
+def record_search_request(
+    view_name: str,
+    status_code: int,
+    duration: float,
+    feature_count: Optional[int] = None,
+) -> None:
+    """Records a finished search request with its duration in seconds and the number of returned Features."""
+    search_requests.inc(view=view_name, status=int(status_code))
+    search_duration.observe(duration, view=view_name)
+    if feature_count is not None:
+        search_result_size.observe(feature_count, view=view_name)
@@ -0,0 +1,83 @@
+import struct
+from typing import Iterable
+
+WIRE_TYPE_VARINT = 0
+WIRE_TYPE_64_BIT = 1
+WIRE_TYPE_LENGTH_DELIMITED = 2
+
+DOUBLE_STRUCT = struct.Struct("<d")
+
+
+class ProtobufWriter:
+    """Encodes the fields of a Protocol Buffers message one after another.
+    Only the wire types needed for the binary map formats are supported. Nested messages are encoded with their own
+    writer and added as bytes.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._buffer)
+
+    def write_varint(self, field_number: int, value: int) -> None:
+        """Writes an unsigned integer, enum or bool field."""
+        self._write_key(field_number, WIRE_TYPE_VARINT)
+        self._buffer += encode_varint(value)
+
+    def write_signed_varint(self, field_number: int, value: int) -> None:
+        """Writes a `sint32` or `sint64` field."""
+        self.write_varint(field_number, encode_zigzag(value))
+
+    def write_double(self, field_number: int, value: float) -> None:
+        self._write_key(field_number, WIRE_TYPE_64_BIT)
+        self._buffer += DOUBLE_STRUCT.pack(value)
+
+    def write_bytes(self, field_number: int, value: bytes) -> None:
+        """Writes a bytes field or an already encoded message."""
+        self._write_key(field_number, WIRE_TYPE_LENGTH_DELIMITED)
+        self._buffer += encode_varint(len(value))
+        self._buffer += value
+
+    def write_string(self, field_number: int, value: str) -> None:
+        self.write_bytes(field_number, value.encode("utf-8"))
+
+    def write_packed_varints(self, field_number: int, values: Iterable[int]) -> None:
+        """Writes a packed repeated field of unsigned integers. Empty fields are left out."""
+        encoded_values = b"".join(encode_varint(value) for value in values)
+        if encoded_values:
+            self.write_bytes(field_number, encoded_values)
+
+    def write_packed_signed_varints(
+        self, field_number: int, values: Iterable[int]
+    ) -> None:
+        """Writes a packed repeated `sint32` or `sint64` field. Empty fields are left out."""
+        self.write_packed_varints(
+            field_number, (encode_zigzag(value) for value in values)
+        )
+
+    def _write_key(self, field_number: int, wire_type: int) -> None:
+        self._buffer += encode_varint((field_number << 3) | wire_type)
+
+
+def encode_varint(value: int) -> bytes:
+    """Encodes a non-negative integer in 7-bit groups, least significant group first."""
+    if value < 0:
+        # Negative int32 and int64 values are encoded as 64 bit two's complement
+        value += 1 << 64
+
+    encoded_value = bytearray()
+    while value > 0x7F:
+        encoded_value.append((value & 0x7F) | 0x80)
+        value >>= 7
+    encoded_value.append(value)
+
+    return bytes(encoded_value)
+
+
+def encode_zigzag(value: int) -> int:
+    """Maps signed integers to unsigned integers, so that numbers with a small absolute value have a short encoding."""
+    return value * 2 if value >= 0 else -value * 2 - 1
@@ -0,0 +1,246 @@
+import json
+import re
+from typing import Callable, Iterable, Iterator, List, Optional, Union
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
+
+from honeybee import conf
+from honeybee.commons import RawFeatureCollection
+from honeybee.flatgeobuf import encode_flatgeobuf
+from honeybee.geobuf import encode_geobuf
+from honeybee.timing import (
+    STAGE_RENDER,
+    StageTiming,
+    add_server_timing_header,
+    collect_timings,
+    measure,
+)
+
+RAW_FEATURE_COLLECTION_START = b'{"type":"FeatureCollection","features":['
+RAW_FEATURE_COLLECTION_END = b"]}"
+RAW_FEATURE_SEPARATOR = b","
+NDJSON_LINE_SEPARATOR = b"\n"
+
+STREAM_CHUNK_SIZE = 100
+
+SPATIAL_DATA_CONTENT_NAME = "spatialData"
+RESPONSE_HEADER_NAME_PREFIX = "X-"
+
+
+class SpatialDataJSONRenderer(JSONRenderer):
+    """Renders the response data as JSON.
+    RawFeatureCollections in the top level of the data are spliced into the output as they are, all other values
+    are rendered by the JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, dict) or not any(
+            isinstance(value, RawFeatureCollection) for value in data.values()
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        rendered_items = []
+        for key, value in data.items():
+            if isinstance(value, RawFeatureCollection):
+                rendered_value = render_raw_feature_collection(value)
+            elif value is None:
+                rendered_value = b"null"
+            else:
+                rendered_value = super().render(value, None, renderer_context)
+
+            rendered_key = json.dumps(str(key), ensure_ascii=self.ensure_ascii)
+            rendered_items.append(rendered_key.encode("utf-8") + b":" + rendered_value)
+
+        return b"{" + b",".join(rendered_items) + b"}"
+
+
+class SpatialDataBinaryRenderer(BaseRenderer):
+    """Base class of the renderers encoding the spatial data of the response data in a binary format.
+    All other values of the response data (e.g. the pagination) are sent as response headers, see
+    `create_response_headers`. Response data without spatial data (e.g. errors) is rendered as JSON.
+    """
+
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get("response")
+
+        if not isinstance(data, dict) or data.get(SPATIAL_DATA_CONTENT_NAME) is None:
+            json_renderer = SpatialDataJSONRenderer()
+            if response is not None:
+                response["Content-Type"] = json_renderer.media_type
+            return json_renderer.render(data, renderer_context=renderer_context)
+
+        if response is not None:
+            for name, value in create_response_headers(data).items():
+                response[name] = value
+
+        return self.encode(decode_features(data[SPATIAL_DATA_CONTENT_NAME]))
+
+    def encode(self, features: List[dict]) -> bytes:
+        raise NotImplementedError()
+
+
+class GeobufRenderer(SpatialDataBinaryRenderer):
+    """Renders the spatial data as Geobuf, a compact Protocol Buffers encoding of GeoJSON."""
+
+    media_type = "application/x-geobuf"
+    format = conf.URL_PARAMETER_VALUE_FORMAT_GEOBUF
+
+    def encode(self, features: List[dict]) -> bytes:
+        return encode_geobuf(features)
+
+
+class FlatGeobufRenderer(SpatialDataBinaryRenderer):
+    """Renders the spatial data as FlatGeobuf file, with a spatial index unless
+    `MAP_VIEWER_FLATGEOBUF_INDEX_NODE_SIZE` is 0.
+    """
+
+    media_type = "application/flatgeobuf"
+    format = conf.URL_PARAMETER_VALUE_FORMAT_FLATGEOBUF
+
+    def encode(self, features: List[dict]) -> bytes:
+        return encode_flatgeobuf(
+            features, index_node_size=conf.MAP_VIEWER_FLATGEOBUF_INDEX_NODE_SIZE
+        )
+
+
+class TimedResponse(Response):
+    """A Response measuring its rendering as part of the given stage `timings` of the request.
+    All timings are sent in the Server-Timing header. Without `timings`, the Response is rendered as usual.
+    `on_rendered` is called after the rendering, e.g. to record the duration of the complete request.
+    """
+
+    def __init__(
+        self,
+        *args,
+        timings: Optional[List[StageTiming]] = None,
+        on_rendered: Optional[Callable[[], None]] = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.timings = timings
+        self.on_rendered = on_rendered
+
+    @property
+    def rendered_content(self):
+        if self.timings is None:
+            content = super().rendered_content
+        else:
+            with collect_timings(self.timings), measure(STAGE_RENDER):
+                content = super().rendered_content
+
+            add_server_timing_header(self, self.timings)
+
+        if self.on_rendered is not None:
+            self.on_rendered()
+
+        return content
+
+
+def decode_features(spatial_data) -> List[dict]:
+    """Returns the GeoJSON Features of a (Raw)FeatureCollection or a single Feature as dictionaries."""
+    if isinstance(spatial_data, RawFeatureCollection):
+        return [json.loads(feature) for feature in spatial_data.features]
+
+    if spatial_data.get("type") == "FeatureCollection":
+        return list(spatial_data.get("features") or [])
+
+    return [spatial_data]
+
+
+def count_features(spatial_data) -> int:
+    """Returns the number of Features of a (Raw)FeatureCollection without decoding them."""
+    if isinstance(spatial_data, RawFeatureCollection):
+        return len(spatial_data.features)
+
+    return len(spatial_data.get("features") or [])
+
+
+def create_response_headers(data: dict) -> dict:
+    """Converts the values of the response data next to the spatial data into response headers.
+    The values of nested objects are added one by one, e.g. `{"pagination": {"totalHits": 3}}` becomes
+    `X-Total-Hits: 3`. Lists are encoded as JSON and None values are left out.
+    """
+    values = {}
+    for name, value in data.items():
+        if name == SPATIAL_DATA_CONTENT_NAME:
+            continue
+
+        values.update(value if isinstance(value, dict) else {name: value})
+
+    return {
+        create_response_header_name(name): (
+            json.dumps(value) if isinstance(value, (list, tuple)) else str(value)
+        )
+        for name, value in values.items()
+        if value is not None
+    }
+
+
+def create_response_header_name(name: str) -> str:
+    """Converts a camel case name into a response header name, e.g. `resumeToken` into `X-Resume-Token`."""
+    words = re.findall(r"[a-zA-Z][a-z0-9]*", name)
+    return RESPONSE_HEADER_NAME_PREFIX + "-".join(word.capitalize() for word in words)
+
+
+def render_raw_feature_collection(feature_collection: RawFeatureCollection) -> bytes:
+    """Splices the serialized Features of the RawFeatureCollection into a GeoJSON FeatureCollection."""
+    features = RAW_FEATURE_SEPARATOR.join(
+        encode_feature(feature) for feature in feature_collection.features
+    )
+    return RAW_FEATURE_COLLECTION_START + features + RAW_FEATURE_COLLECTION_END
+
+
+def encode_feature(feature: Union[str, bytes]) -> bytes:
+    return feature if isinstance(feature, bytes) else feature.encode("utf-8")
+
+
+def render_features_as_ndjson(
+    features: Iterable[Union[str, bytes]], chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Yields the given serialized Features as newline-delimited JSON, `chunk_size` Features per chunk."""
+    for chunk in iterate_chunks(features, chunk_size):
+        yield b"".join(
+            encode_feature_as_single_line(feature) + NDJSON_LINE_SEPARATOR
+            for feature in chunk
+        )
+
+
+def render_features_as_feature_collection(
+    features: Iterable[Union[str, bytes]], chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Yields the given serialized Features as a GeoJSON FeatureCollection, `chunk_size` Features per chunk."""
+    yield RAW_FEATURE_COLLECTION_START
+
+    is_first_chunk = True
+    for chunk in iterate_chunks(features, chunk_size):
+        rendered_chunk = RAW_FEATURE_SEPARATOR.join(
+            encode_feature(feature) for feature in chunk
+        )
+        if not is_first_chunk:
+            rendered_chunk = RAW_FEATURE_SEPARATOR + rendered_chunk
+
+        yield rendered_chunk
+        is_first_chunk = False
+
+    yield RAW_FEATURE_COLLECTION_END
+
+
+def encode_feature_as_single_line(feature: Union[str, bytes]) -> bytes:
+    """Line breaks in serialized JSON can only be whitespace, hence they are replaced by blanks."""
+    return encode_feature(feature).replace(b"\r", b" ").replace(b"\n", b" ")
+
+
+def iterate_chunks(items: Iterable, chunk_size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
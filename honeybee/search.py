@@ -1,37 +1,115 @@
+import dataclasses
 import datetime
+import itertools
+import json
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterator, List, Optional
 
+from asgiref.sync import sync_to_async
 from django.http import QueryDict
-from geojson import FeatureCollection, Feature
+from geojson import Feature, FeatureCollection
 
 from honeybee.commons import (
+    BoundingBox,
     DateSpan,
     Point,
     Query,
     SearchFilter,
+    SearchResult,
+    Tile,
+    boolean,
     get_from_data,
     UserInputException,
 )
 from honeybee import conf
-from honeybee.databases.solr import SolrSpatialDatabase
+from honeybee.caching import (
+    LRUCache,
+    SearchResultCache,
+    create_tile_cache_key,
+    feature_cache,
+    get_search_result_cache,
+    tile_cache,
+)
+from honeybee.databases.registry import get_spatial_database
 from honeybee.databases.spatial import SpatialDatabase
+from honeybee.geometry import calculate_tile_bounding_box
+from honeybee.tiles import VECTOR_TILE_BUFFER, VECTOR_TILE_EXTENT, encode_vector_tile
+from honeybee.timing import STAGE_PARSE, measure
 
 
-def search_spatial_data(raw_url_parameters: QueryDict) -> dict:
+def search_spatial_data(raw_url_parameters: QueryDict) -> SearchResult:
     """Searches GeoJSON data in a database for the given parameters."""
-    database_configuration = {
-        conf.DATABASE_HOSTNAME_CONFIGURATION_NAME: conf.MAP_VIEWER_SOLR_SPATIAL_DATABASE_HOSTNAME
-    }
+    spatial_search = SpatialSearch(
+        spatial_database=get_spatial_database(),
+        result_cache=get_search_result_cache(),
+    )
+
+    with measure(STAGE_PARSE):
+        search_filter = create_search_filter_from_url_parameters(raw_url_parameters)
+        query = create_query_from_url_parameters(raw_url_parameters)
+
+    return spatial_search.search(query, search_filter)
+
+
+async def search_spatial_data_async(raw_url_parameters: QueryDict) -> SearchResult:
+    """The asynchronous version of `search_spatial_data`."""
+    spatial_search = SpatialSearch(
+        spatial_database=get_spatial_database(),
+        result_cache=get_search_result_cache(),
+    )
+
+    with measure(STAGE_PARSE):
+        search_filter = create_search_filter_from_url_parameters(raw_url_parameters)
+        query = create_query_from_url_parameters(raw_url_parameters)
+
+    return await spatial_search.search_async(query, search_filter)
+
+
+def get_spatial_data_for_ids(feature_ids: List[str]) -> FeatureCollection:
+    """Returns a FeatureCollection with the Features of the given IDs from the database.
+    IDs without a Feature are left out.
+    """
+    if len(feature_ids) > conf.MAP_VIEWER_MAXIMUM_HITS_PER_PAGE:
+        raise UserInputException(
+            conf.ERROR_MESSAGE_TOO_MANY_IDS.format(
+                maximum=conf.MAP_VIEWER_MAXIMUM_HITS_PER_PAGE
+            )
+        )
+
+    spatial_search = SpatialSearch(
+        spatial_database=get_spatial_database(), feature_cache=feature_cache
+    )
+
+    return spatial_search.get_data_for_ids(feature_ids)
+
+
+def stream_spatial_data(raw_url_parameters: QueryDict) -> Iterator[str]:
+    """Returns an iterator over all serialized GeoJSON Features in the database fitting the given parameters.
+    The parameters are validated and the first Feature is read before the iterator is returned, so invalid or
+    unsupported searches raise a UserInputException here instead of while the iterator is consumed.
+    """
+    spatial_search = SpatialSearch(spatial_database=get_spatial_database())
+
+    search_filter = create_search_filter_from_url_parameters(raw_url_parameters)
+    query = create_query_from_url_parameters(raw_url_parameters)
+
+    return spatial_search.stream(query, search_filter)
+
+
+def create_vector_tile(raw_url_parameters: QueryDict, tile: Tile) -> bytes:
+    """Returns a Mapbox Vector Tile holding the GeoJSON data within the given tile that fits the given parameters.
+    The tile is validated before the database is searched.
+    """
+    validate_tile(tile)
 
     spatial_search = SpatialSearch(
-        spatial_database=SolrSpatialDatabase(database_configuration)
+        spatial_database=get_spatial_database(), tile_cache=tile_cache
     )
 
     search_filter = create_search_filter_from_url_parameters(raw_url_parameters)
     query = create_query_from_url_parameters(raw_url_parameters)
 
-    return spatial_search.search(query, search_filter)
+    return spatial_search.create_vector_tile(query, search_filter, tile)
 
 
 @dataclass
@@ -39,16 +117,162 @@ class SpatialSearch:
     """A class to retrieve data from a SpatialDatabase."""
 
     spatial_database: SpatialDatabase
+    result_cache: Optional[SearchResultCache] = None
+    feature_cache: Optional[LRUCache] = None
+    tile_cache: Optional[LRUCache] = None
 
-    def search(self, query: Query, search_filter: SearchFilter) -> FeatureCollection:
-        """Search spatial data according to the given parameters and return the data as GeoJSON Feature Collection."""
-        return self.spatial_database.search_locations_related_to_query(
-            query, search_filter
+    def search(self, query: Query, search_filter: SearchFilter) -> SearchResult:
+        """Search spatial data according to the given parameters and return the data as GeoJSON Feature Collection
+        together with the pagination data. If a `result_cache` is set, equivalent searches are answered from the cache.
+        """
+
+        def search_database() -> SearchResult:
+            if search_filter.aggregate:
+                return self.aggregate(query, search_filter)
+
+            return self.spatial_database.search_locations_related_to_query(
+                query, search_filter
+            )
+
+        if self.result_cache is None:
+            return search_database()
+
+        return self.result_cache.get_or_search(query, search_filter, search_database)
+
+    async def search_async(
+        self, query: Query, search_filter: SearchFilter
+    ) -> SearchResult:
+        """The asynchronous version of `search`."""
+
+        async def search_database() -> SearchResult:
+            if search_filter.aggregate:
+                return await sync_to_async(self.aggregate, thread_sensitive=False)(
+                    query, search_filter
+                )
+
+            return await self.spatial_database.search_locations_related_to_query_async(
+                query, search_filter
+            )
+
+        if self.result_cache is None:
+            return await search_database()
+
+        return await self.result_cache.get_or_search_async(
+            query, search_filter, search_database
         )
 
-    def get_data_for_id(self, feature_id: str) -> Feature:
-        """Searches the Feature data for a given ID."""
-        pass
+    def aggregate(self, query: Query, search_filter: SearchFilter) -> SearchResult:
+        """Search spatial data according to the given parameters and return one cluster Feature per grid cell."""
+        try:
+            return self.spatial_database.aggregate_locations_related_to_query(
+                query, search_filter
+            )
+        except NotImplementedError:
+            raise UserInputException(conf.ERROR_MESSAGE_AGGREGATION_NOT_SUPPORTED)
+
+    def stream(self, query: Query, search_filter: SearchFilter) -> Iterator[str]:
+        """Iterate over all spatial data fitting the given parameters as serialized GeoJSON Features.
+        At most `conf.MAP_VIEWER_MAXIMUM_FEATURES_PER_REQUEST` Features are returned. The first Feature is read before
+        the iterator is returned, so that the database rejects unsupported searches before a response is started.
+        """
+        features = iter(
+            self.spatial_database.stream_locations_related_to_query(
+                query, search_filter
+            )
+        )
+        first_feature = next(features, None)
+        if first_feature is None:
+            return iter(())
+
+        return itertools.islice(
+            itertools.chain([first_feature], features),
+            conf.MAP_VIEWER_MAXIMUM_FEATURES_PER_REQUEST,
+        )
+
+    def create_vector_tile(
+        self, query: Query, search_filter: SearchFilter, tile: Tile
+    ) -> bytes:
+        """Encodes the spatial data within the given tile that fits the given parameters as Mapbox Vector Tile.
+        The tile replaces the search area of the `search_filter`. At most `conf.MAP_VIEWER_MAXIMUM_FEATURES_PER_TILE`
+        Features are encoded. If a `tile_cache` is set, tiles are cached per tile and equivalent search.
+        """
+        tile_filter = dataclasses.replace(
+            search_filter,
+            aggregate=False,
+            bounding_box=calculate_tile_bounding_box(
+                tile, buffer=VECTOR_TILE_BUFFER / VECTOR_TILE_EXTENT
+            ),
+            cursor=None,
+            hits_per_page=min(
+                conf.MAP_VIEWER_MAXIMUM_FEATURES_PER_TILE,
+                conf.MAP_VIEWER_MAXIMUM_HITS_PER_PAGE,
+            ),
+        )
+
+        cache_key = None
+        if self.tile_cache is not None:
+            cache_key = create_tile_cache_key(tile, query, tile_filter)
+            vector_tile = self.tile_cache.get(cache_key)
+            if vector_tile is not None:
+                return vector_tile
+
+        features = itertools.islice(
+            self.spatial_database.stream_locations_related_to_query(query, tile_filter),
+            conf.MAP_VIEWER_MAXIMUM_FEATURES_PER_TILE,
+        )
+        vector_tile = encode_vector_tile(
+            (json.loads(feature) for feature in features),
+            tile,
+            layer_name=conf.MAP_VIEWER_TILE_LAYER_NAME,
+        )
+
+        if cache_key is not None:
+            self.tile_cache.set(cache_key, vector_tile)
+
+        return vector_tile
+
+    def get_data_for_id(self, feature_id: str) -> Optional[Feature]:
+        """Searches the Feature data for a given ID. Returns None, if there is no Feature with this ID."""
+        features = self.get_data_for_ids([feature_id])["features"]
+        return features[0] if features else None
+
+    def get_data_for_ids(self, feature_ids: List[str]) -> FeatureCollection:
+        """Searches the Feature data for the given IDs. The Features are returned in the order of the given IDs,
+        IDs without a Feature are left out.
+        If a `feature_cache` is set, only the Features missing in the cache are requested from the database.
+        """
+        cached_features = {}
+        if self.feature_cache is not None:
+            for feature_id in feature_ids:
+                feature = self.feature_cache.get(feature_id)
+                if feature is not None:
+                    cached_features[feature_id] = feature
+
+        missing_ids = [
+            feature_id
+            for feature_id in dict.fromkeys(feature_ids)
+            if feature_id not in cached_features
+        ]
+        if missing_ids:
+            feature_collection = self.spatial_database.get_data_for_location_ids(
+                missing_ids
+            )
+            for feature in feature_collection["features"]:
+                if feature.get("id") is None:
+                    continue
+                # The IDs of the documents are the string values of the Feature IDs, which may be numbers.
+                feature_id = str(feature["id"])
+                cached_features[feature_id] = feature
+                if self.feature_cache is not None:
+                    self.feature_cache.set(feature_id, feature)
+
+        return FeatureCollection(
+            [
+                cached_features[feature_id]
+                for feature_id in feature_ids
+                if feature_id in cached_features
+            ]
+        )
 
 
 def create_query_from_url_parameters(url_parameters: QueryDict) -> Query:
@@ -67,12 +291,7 @@ def create_search_filter_from_url_parameters(url_parameters: QueryDict) -> Searc
     cursor_token = get_from_data(
         data=url_parameters, name=conf.URL_PARAMETER_NAME_RESUME_TOKEN, optional=True
     )
-    hits_per_page = get_from_data(
-        data=url_parameters,
-        name=conf.URL_PARAMETER_NAME_HITS_PER_PAGE,
-        parameter_type=int,
-        optional=True,
-    )
+    hits_per_page = create_hits_per_page_from_url_parameters(url_parameters)
     radius = get_from_data(
         data=url_parameters,
         name=conf.URL_PARAMETER_NAME_RADIUS,
@@ -80,20 +299,224 @@ def create_search_filter_from_url_parameters(url_parameters: QueryDict) -> Searc
         optional=True,
     )
 
+    aggregate = get_from_data(
+        data=url_parameters,
+        name=conf.URL_PARAMETER_NAME_AGGREGATE,
+        parameter_type=boolean,
+        optional=True,
+        default=False,
+    )
+    zoom = create_zoom_from_url_parameters(url_parameters)
+
+    bounding_box = create_bounding_box_from_url_parameters(url_parameters)
     center_point = create_point_from_url_parameter(url_parameters)
     date_span = create_date_span_from_url_parameters(url_parameters)
+    since = create_since_from_url_parameters(url_parameters)
+    return_fields = create_return_fields_from_url_parameters(url_parameters)
+    coordinate_precision = create_coordinate_precision_from_url_parameters(
+        url_parameters
+    )
+    sample_size = create_sample_size_from_url_parameters(url_parameters)
+    sample_seed = create_sample_seed_from_url_parameters(url_parameters)
+    spread = create_spread_from_url_parameters(url_parameters)
 
     mapping = {
+        "aggregate": aggregate,
+        "bounding_box": bounding_box,
+        "coordinate_precision": coordinate_precision,
         "cursor": cursor_token,
         "date_span": date_span,
         "hits_per_page": hits_per_page,
         "spatial_center": center_point,
         "radius": radius,
+        "return_fields": return_fields,
+        "sample_seed": sample_seed,
+        "sample_size": sample_size,
+        "since": since,
+        "spread": spread,
+        "zoom": zoom,
     }
 
     return SearchFilter(**mapping)
 
 
+def create_hits_per_page_from_url_parameters(
+    url_parameters: QueryDict,
+) -> Optional[int]:
+    """Extracts the number of hits per page from the parameters.
+    Values above the configured maximum page size or the maximum number of Features per request are rejected.
+    """
+    return create_page_size_from_url_parameters(
+        url_parameters, conf.URL_PARAMETER_NAME_HITS_PER_PAGE
+    )
+
+
+def create_sample_size_from_url_parameters(
+    url_parameters: QueryDict,
+) -> Optional[int]:
+    """Extracts the number of randomly sampled Features from the parameters.
+    Like the number of hits per page, the value must not exceed the maximum page size.
+    """
+    return create_page_size_from_url_parameters(
+        url_parameters, conf.URL_PARAMETER_NAME_SAMPLE
+    )
+
+
+def create_page_size_from_url_parameters(
+    url_parameters: QueryDict, name: str
+) -> Optional[int]:
+    page_size = get_from_data(
+        data=url_parameters,
+        name=name,
+        parameter_type=int,
+        optional=True,
+    )
+
+    if page_size is None:
+        return None
+
+    if page_size <= 0:
+        raise UserInputException(
+            conf.ERROR_MESSAGE_PARAMETER_HAS_TO_BE_POSITIVE.format(name=name)
+        )
+
+    maximum_page_size = min(
+        conf.MAP_VIEWER_MAXIMUM_HITS_PER_PAGE,
+        conf.MAP_VIEWER_MAXIMUM_FEATURES_PER_REQUEST,
+    )
+    if page_size > maximum_page_size:
+        raise UserInputException(
+            conf.ERROR_MESSAGE_PARAMETER_EXCEEDS_MAXIMUM.format(
+                name=name, maximum=maximum_page_size
+            )
+        )
+
+    return page_size
+
+
+def create_spread_from_url_parameters(url_parameters: QueryDict) -> Optional[int]:
+    """Extracts the maximum number of Features per grid cell from the parameters."""
+    spread = get_from_data(
+        data=url_parameters,
+        name=conf.URL_PARAMETER_NAME_SPREAD,
+        parameter_type=int,
+        optional=True,
+    )
+
+    if spread is not None and spread <= 0:
+        raise UserInputException(
+            conf.ERROR_MESSAGE_PARAMETER_HAS_TO_BE_POSITIVE.format(
+                name=conf.URL_PARAMETER_NAME_SPREAD
+            )
+        )
+
+    return spread
+
+
+def create_sample_seed_from_url_parameters(
+    url_parameters: QueryDict,
+) -> Optional[int]:
+    """Extracts the seed selecting the random sample from the parameters."""
+    seed = get_from_data(
+        data=url_parameters,
+        name=conf.URL_PARAMETER_NAME_SEED,
+        parameter_type=int,
+        optional=True,
+    )
+
+    if seed is not None and seed < 0:
+        raise UserInputException(
+            conf.ERROR_MESSAGE_PARAMETER_HAS_TO_BE_NON_NEGATIVE.format(
+                name=conf.URL_PARAMETER_NAME_SEED
+            )
+        )
+
+    return seed
+
+
+def create_zoom_from_url_parameters(url_parameters: QueryDict) -> Optional[int]:
+    """Extracts the web map zoom level from the parameters."""
+    zoom = get_from_data(
+        data=url_parameters,
+        name=conf.URL_PARAMETER_NAME_ZOOM,
+        parameter_type=int,
+        optional=True,
+    )
+
+    if zoom is not None and not 0 <= zoom <= conf.MAXIMUM_ZOOM_LEVEL:
+        raise UserInputException(
+            conf.ERROR_MESSAGE_ZOOM_OUT_OF_RANGE.format(
+                maximum_zoom=conf.MAXIMUM_ZOOM_LEVEL
+            )
+        )
+
+    return zoom
+
+
+def create_return_fields_from_url_parameters(
+    url_parameters: QueryDict,
+) -> Optional[List[str]]:
+    """Extracts the names of the Feature properties to return. The names can be given comma-separated or by repeating
+    the parameter. If the parameter is missing, None is returned to keep all properties; an empty value keeps none.
+    """
+    values = get_from_data(
+        data=url_parameters,
+        name=conf.URL_PARAMETER_NAME_FIELDS,
+        is_list=True,
+        optional=True,
+    )
+
+    if not values:
+        return None
+
+    return list(
+        dict.fromkeys(
+            name.strip()
+            for value in values
+            for name in value.split(",")
+            if name.strip()
+        )
+    )
+
+
+def create_coordinate_precision_from_url_parameters(
+    url_parameters: QueryDict,
+) -> Optional[int]:
+    """Extracts the number of decimal places to round the coordinates of the Features to."""
+    precision = get_from_data(
+        data=url_parameters,
+        name=conf.URL_PARAMETER_NAME_PRECISION,
+        parameter_type=int,
+        optional=True,
+    )
+
+    if precision is not None and not (
+        0 <= precision <= conf.COORDINATE_DECIMAL_PRECISION
+    ):
+        raise UserInputException(
+            conf.ERROR_MESSAGE_PRECISION_OUT_OF_RANGE.format(
+                maximum_precision=conf.COORDINATE_DECIMAL_PRECISION
+            )
+        )
+
+    return precision
+
+
+def validate_tile(tile: Tile) -> None:
+    """Raises a UserInputException, if the tile is not part of the web map tile grid."""
+    tile_count = 2**tile.zoom if 0 <= tile.zoom <= conf.MAXIMUM_ZOOM_LEVEL else 0
+
+    if not (0 <= tile.x < tile_count and 0 <= tile.y < tile_count):
+        raise UserInputException(
+            conf.ERROR_MESSAGE_TILE_OUT_OF_RANGE.format(
+                zoom=tile.zoom,
+                x=tile.x,
+                y=tile.y,
+                maximum_zoom=conf.MAXIMUM_ZOOM_LEVEL,
+            )
+        )
+
+
 def create_date_span_from_url_parameters(url_parameters: QueryDict) -> DateSpan:
     first_year = get_from_data(
         data=url_parameters,
@@ -117,6 +540,37 @@ def create_date_span_from_url_parameters(url_parameters: QueryDict) -> DateSpan:
     return DateSpan(first_year=first_year, last_year=last_year)
 
 
+def create_since_from_url_parameters(
+    url_parameters: QueryDict,
+) -> Optional[datetime.datetime]:
+    """Extracts the timestamp to search changed Features from. The timestamp has to be given in ISO 8601 format.
+    Timestamps without a time zone are taken as UTC. The returned timestamp is always in UTC.
+    """
+    since = get_from_data(
+        data=url_parameters, name=conf.URL_PARAMETER_NAME_SINCE, optional=True
+    )
+
+    if since is None:
+        return None
+
+    try:
+        # Python < 3.11 does not parse the "Z" suffix
+        timestamp = datetime.datetime.fromisoformat(
+            since.strip().replace("Z", "+00:00").replace("z", "+00:00")
+        )
+    except ValueError:
+        raise UserInputException(
+            conf.ERROR_MESSAGE_INVALID_TIMESTAMP.format(
+                name=conf.URL_PARAMETER_NAME_SINCE
+            )
+        )
+
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=datetime.timezone.utc)
+
+    return timestamp.astimezone(datetime.timezone.utc)
+
+
 def create_point_from_url_parameter(url_parameters: QueryDict) -> Optional[Point]:
     """Creates a Point object from the given URL parameters.
     If only one of the two values, longitude or latitude, is set while the other is None, a ValueError is raised.
@@ -144,3 +598,47 @@ def create_point_from_url_parameter(url_parameters: QueryDict) -> Optional[Point
         return None
 
     return Point(longitude=longitude, latitude=latitude)
+
+
+def create_bounding_box_from_url_parameters(
+    url_parameters: QueryDict,
+) -> Optional[BoundingBox]:
+    """Creates a BoundingBox object from the given URL parameters.
+    Either all four coordinates have to be set or none, otherwise a UserInputException is raised. The same applies
+    for minimum coordinates greater than the maximum coordinates and coordinates outside the valid range.
+    If none of the coordinates is set, None is returned.
+    """
+    coordinates = {
+        name: get_from_data(
+            data=url_parameters,
+            name=parameter_name,
+            parameter_type=float,
+            optional=True,
+        )
+        for name, parameter_name in (
+            ("minimum_latitude", conf.URL_PARAMETER_NAME_MINIMUM_LATITUDE),
+            ("minimum_longitude", conf.URL_PARAMETER_NAME_MINIMUM_LONGITUDE),
+            ("maximum_latitude", conf.URL_PARAMETER_NAME_MAXIMUM_LATITUDE),
+            ("maximum_longitude", conf.URL_PARAMETER_NAME_MAXIMUM_LONGITUDE),
+        )
+    }
+
+    number_of_missing_coordinates = list(coordinates.values()).count(None)
+    if number_of_missing_coordinates == len(coordinates):
+        return None
+    if number_of_missing_coordinates > 0:
+        raise UserInputException(conf.ERROR_MESSAGE_INCOMPLETE_BOUNDING_BOX)
+
+    bounding_box = BoundingBox(**coordinates)
+    are_latitudes_valid = (
+        -90 <= bounding_box.minimum_latitude <= bounding_box.maximum_latitude <= 90
+    )
+    # A minimum longitude greater than the maximum longitude selects a box crossing the antimeridian
+    are_longitudes_valid = (
+        -180 <= bounding_box.minimum_longitude <= 180
+        and -180 <= bounding_box.maximum_longitude <= 180
+    )
+    if not are_latitudes_valid or not are_longitudes_valid:
+        raise UserInputException(conf.ERROR_MESSAGE_INVALID_BOUNDING_BOX)
+
+    return bounding_box
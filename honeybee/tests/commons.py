@@ -1,3 +1,73 @@
+import datetime
+import json
+
+from honeybee.commons import (
+    BoundingBox,
+    DateSpan,
+    Point,
+    RawFeatureCollection,
+    SearchFilter,
+)
+
+FRANKFURT = Point(latitude=50.11552, longitude=8.68417)
+GERMANY = BoundingBox(
+    minimum_latitude=47.0,
+    minimum_longitude=5.0,
+    maximum_latitude=55.0,
+    maximum_longitude=15.0,
+)
+# A viewport centered on the antimeridian, hence its minimum longitude is greater than its maximum longitude
+FIJI = BoundingBox(
+    minimum_latitude=-20.0,
+    minimum_longitude=175.0,
+    maximum_latitude=-15.0,
+    maximum_longitude=-175.0,
+)
+
+# The expected IDs of searches in the `local_features`
+LOCAL_SEARCH_SCENARIOS = [
+    (  # Scenario - Search circle
+        SearchFilter(spatial_center=FRANKFURT, radius=10),
+        [],
+        ["a", "d"],
+    ),
+    (  # Scenario - Bounding box
+        SearchFilter(bounding_box=GERMANY),
+        [],
+        ["a", "b", "c", "d"],
+    ),
+    (  # Scenario - Any of the terms has to match
+        SearchFilter(bounding_box=GERMANY),
+        ["https://www.biofid.de/ontologies/Fagus", "unknown"],
+        ["a", "b"],
+    ),
+    (  # Scenario - Date span
+        SearchFilter(
+            bounding_box=GERMANY,
+            date_span=DateSpan(
+                first_year=datetime.date(1800, 1, 1),
+                last_year=datetime.date(1850, 1, 1),
+            ),
+        ),
+        [],
+        ["a"],
+    ),
+    (  # Scenario - Open date span
+        SearchFilter(
+            bounding_box=GERMANY,
+            date_span=DateSpan(first_year=datetime.date(1850, 1, 1), last_year=None),
+        ),
+        [],
+        ["b"],
+    ),
+    (  # Scenario - Nothing in the default search circle
+        SearchFilter(),
+        [],
+        [],
+    ),
+]
+
+
 def create_url_from_parameters(base_url: str, parameters: dict) -> str:
     base_url = base_url.strip("/")
 
@@ -12,3 +82,32 @@ def create_url_from_parameters(base_url: str, parameters: dict) -> str:
     parameters_string = "&".join(parameter_strings)
 
     return f"/{base_url}?{parameters_string}"
+
+
+def create_feature(location_id, geometry, taxa=None, date=None) -> dict:
+    properties = {"taxa": taxa or []}
+    if date is not None:
+        properties["date"] = date
+
+    return {
+        "type": "Feature",
+        "id": location_id,
+        "geometry": geometry,
+        "properties": properties,
+    }
+
+
+def create_antimeridian_features() -> list:
+    """Creates Features east and west of the antimeridian within `FIJI`, and one Feature outside of it."""
+    return [
+        create_feature(location_id, {"type": "Point", "coordinates": coordinates})
+        for location_id, coordinates in (
+            ("east", [178.4, -18.1]),
+            ("west", [-178.9, -16.5]),
+            ("greenwich", [0.0, -18.0]),
+        )
+    ]
+
+
+def get_ids(raw_feature_collection: RawFeatureCollection) -> list:
+    return [json.loads(feature)["id"] for feature in raw_feature_collection.features]
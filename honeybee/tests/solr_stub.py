@@ -0,0 +1,96 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+CORE_PATH = "/solr/geo"
+
+ResponseFactory = Callable[[str, dict], dict]
+
+
+class StubSolrServer:
+    """A local HTTP server standing in for a Solr core.
+    Every request is answered with the JSON returned by `response_factory`, which gets the request handler name
+    (e.g. "select") and the parsed URL parameters (as lists of values). A decoded JSON request body is passed as
+    parameter "json". If the `response_factory` raises an exception, the request is answered with HTTP 500.
+    """
+
+    def __init__(self, response_factory: ResponseFactory):
+        self.response_factory = response_factory
+        self.requests: List[Tuple[str, dict]] = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._create_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.01},
+            daemon=True,
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{CORE_PATH}"
+
+    def start(self) -> "StubSolrServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubSolrServer":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def _create_handler(self):
+        stub_server = self
+
+        class StubSolrRequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately, which would wait for delayed ACKs on kept-alive connections
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                self._respond(url.path, parse_qs(url.query))
+
+            def do_POST(self):
+                url = urlsplit(self.path)
+                body_length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(body_length).decode("utf-8")
+
+                if self.headers.get("Content-Type", "").startswith("application/json"):
+                    parameters = parse_qs(url.query)
+                    parameters["json"] = json.loads(body)
+                else:
+                    parameters = parse_qs(body)
+
+                self._respond(url.path, parameters)
+
+            def _respond(self, path: str, parameters: dict) -> None:
+                handler = path[len(CORE_PATH) :].strip("/")
+                stub_server.requests.append((handler, parameters))
+
+                try:
+                    response = stub_server.response_factory(handler, parameters)
+                    status = 200
+                except Exception as error:
+                    response = {"error": {"msg": str(error)}}
+                    status = 500
+
+                content = json.dumps(response).encode("utf-8")
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return StubSolrRequestHandler
@@ -0,0 +1,208 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from honeybee.commons import (
+    Point,
+    Query,
+    RawFeatureCollection,
+    SearchFilter,
+    UserInputException,
+)
+from honeybee.databases.memory import (
+    InMemorySpatialDatabase,
+    calculate_haversine_distances,
+)
+from honeybee.databases.registry import SpatialDatabaseRegistry
+from honeybee.geometry import iterate_geometry_positions
+from honeybee.tests.commons import (
+    FIJI,
+    FRANKFURT,
+    GERMANY,
+    LOCAL_SEARCH_SCENARIOS,
+    create_antimeridian_features,
+    get_ids,
+)
+
+
+class TestInMemorySpatialDatabase:
+    @pytest.mark.parametrize(
+        ["search_filter", "query_terms", "expected_ids"], LOCAL_SEARCH_SCENARIOS
+    )
+    def test_search(self, spatial_database, search_filter, query_terms, expected_ids):
+        search_result = spatial_database.search_locations_related_to_query(
+            Query(original_raw_string_data=query_terms), search_filter
+        )
+
+        assert isinstance(search_result.spatial_data, RawFeatureCollection)
+        assert get_ids(search_result.spatial_data) == expected_ids
+        assert search_result.total_hits == len(expected_ids)
+        assert search_result.next_cursor is None
+
+    def test_search_pages_follow_the_cursor(self, spatial_database):
+        query = Query(original_raw_string_data=[])
+        search_filter = SearchFilter(bounding_box=GERMANY, hits_per_page=3)
+
+        first_page = spatial_database.search_locations_related_to_query(
+            query, search_filter
+        )
+        search_filter.cursor = first_page.next_cursor
+        second_page = spatial_database.search_locations_related_to_query(
+            query, search_filter
+        )
+
+        assert get_ids(first_page.spatial_data) == ["a", "b", "c"]
+        assert get_ids(second_page.spatial_data) == ["d"]
+        assert second_page.next_cursor is None
+        assert first_page.total_hits == second_page.total_hits == 4
+
+    def test_search_returns_reproducible_sample(self, spatial_database):
+        query = Query(original_raw_string_data=[])
+
+        samples = [
+            spatial_database.search_locations_related_to_query(
+                query, SearchFilter(bounding_box=GERMANY, sample_size=2, sample_seed=3)
+            )
+            for _ in range(2)
+        ]
+        streamed_ids = [
+            json.loads(feature)["id"]
+            for feature in spatial_database.stream_locations_related_to_query(
+                query, SearchFilter(bounding_box=GERMANY, sample_size=2, sample_seed=3)
+            )
+        ]
+
+        sampled_ids = get_ids(samples[0].spatial_data)
+        assert len(sampled_ids) == 2
+        assert set(sampled_ids) <= {"a", "b", "c", "d"}
+        assert get_ids(samples[1].spatial_data) == sampled_ids == streamed_ids
+        assert samples[0].next_cursor is None
+        assert samples[0].total_hits == 4
+
+    def test_search_returns_spread_features(self, spatial_database):
+        search_result = spatial_database.search_locations_related_to_query(
+            Query(original_raw_string_data=[]),
+            SearchFilter(bounding_box=GERMANY, spread=1),
+        )
+
+        # The Features "a" and "d" are both in Frankfurt, hence in the same grid cell
+        assert get_ids(search_result.spatial_data) == ["a", "b", "c"]
+        assert search_result.total_hits == 4
+        assert search_result.next_cursor is None
+
+    def test_invalid_cursor_is_rejected(self, spatial_database):
+        with pytest.raises(UserInputException):
+            spatial_database.search_locations_related_to_query(
+                Query(original_raw_string_data=[]), SearchFilter(cursor="abc")
+            )
+
+    def test_search_for_changes_is_rejected(self, spatial_database):
+        with pytest.raises(UserInputException):
+            spatial_database.search_locations_related_to_query(
+                Query(original_raw_string_data=[]),
+                SearchFilter(since=datetime(2024, 1, 31, tzinfo=timezone.utc)),
+            )
+
+    def test_stream_all_features(self, spatial_database):
+        features = spatial_database.stream_locations_related_to_query(
+            Query(original_raw_string_data=[]),
+            SearchFilter(bounding_box=GERMANY, hits_per_page=1),
+        )
+
+        assert [json.loads(feature)["id"] for feature in features] == [
+            "a",
+            "b",
+            "c",
+            "d",
+        ]
+
+    def test_search_projects_features(self, spatial_database):
+        search_filter = SearchFilter(
+            bounding_box=GERMANY, return_fields=[], coordinate_precision=1
+        )
+
+        search_result = spatial_database.search_locations_related_to_query(
+            Query(original_raw_string_data=[]), search_filter
+        )
+        streamed_features = spatial_database.stream_locations_related_to_query(
+            Query(original_raw_string_data=[]), search_filter
+        )
+
+        for feature in search_result.spatial_data["features"] + [
+            json.loads(feature) for feature in streamed_features
+        ]:
+            assert feature["properties"] == {}
+            assert all(
+                round(value, 1) == value
+                for position in iterate_geometry_positions(feature["geometry"])
+                for value in position
+            )
+
+    def test_get_data_for_ids(self, spatial_database):
+        feature_collection = spatial_database.get_data_for_location_ids(
+            ["d", "unknown", "b"]
+        )
+
+        assert [feature["id"] for feature in feature_collection["features"]] == [
+            "d",
+            "b",
+        ]
+
+    @pytest.mark.parametrize("file_name", ["features.geojson", "features.ndjson"])
+    def test_load_features_from_file(self, tmp_path, local_features, file_name):
+        path = tmp_path / file_name
+        if path.suffix == ".ndjson":
+            path.write_text(
+                "\n".join(json.dumps(feature) for feature in local_features)
+            )
+        else:
+            path.write_text(
+                json.dumps({"type": "FeatureCollection", "features": local_features})
+            )
+
+        spatial_database = InMemorySpatialDatabase({"path": str(path)})
+        feature_collection = spatial_database.get_data_for_location_id("a")
+
+        assert len(feature_collection["features"]) == 1
+
+    def test_backend_is_selected_by_configuration(self, tmp_path, local_features):
+        path = tmp_path / "features.ndjson"
+        path.write_text("\n".join(json.dumps(feature) for feature in local_features))
+        database_registry = SpatialDatabaseRegistry()
+
+        spatial_database = database_registry.get(
+            {
+                "backend": "honeybee.databases.memory.InMemorySpatialDatabase",
+                "path": str(path),
+            }
+        )
+
+        assert isinstance(spatial_database, InMemorySpatialDatabase)
+
+    def test_search_across_the_antimeridian(self):
+        spatial_database = InMemorySpatialDatabase.from_features(
+            create_antimeridian_features()
+        )
+
+        search_result = spatial_database.search_locations_related_to_query(
+            Query(original_raw_string_data=[]), SearchFilter(bounding_box=FIJI)
+        )
+
+        assert get_ids(search_result.spatial_data) == ["east", "west"]
+
+    def test_haversine_distance(self):
+        berlin = Point(latitude=52.52, longitude=13.405)
+
+        distances = calculate_haversine_distances(
+            [berlin.latitude, FRANKFURT.latitude],
+            [berlin.longitude, FRANKFURT.longitude],
+            FRANKFURT,
+        )
+
+        assert distances[0] == pytest.approx(424, abs=1)
+        assert distances[1] == 0
+
+    @pytest.fixture
+    def spatial_database(self, local_features):
+        return InMemorySpatialDatabase.from_features(local_features)
@@ -0,0 +1,111 @@
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from honeybee.commons import Query, RawFeatureCollection, SearchFilter
+from honeybee.databases.mapped import (
+    MemoryMappedSpatialDatabase,
+    build_feature_store,
+)
+from honeybee.tests.commons import GERMANY, LOCAL_SEARCH_SCENARIOS, get_ids
+
+
+class TestMemoryMappedSpatialDatabase:
+    @pytest.mark.parametrize(
+        ["search_filter", "query_terms", "expected_ids"], LOCAL_SEARCH_SCENARIOS
+    )
+    def test_search(self, spatial_database, search_filter, query_terms, expected_ids):
+        search_result = spatial_database.search_locations_related_to_query(
+            Query(original_raw_string_data=query_terms), search_filter
+        )
+
+        assert isinstance(search_result.spatial_data, RawFeatureCollection)
+        assert all(
+            isinstance(feature, bytes)
+            for feature in search_result.spatial_data.features
+        )
+        assert get_ids(search_result.spatial_data) == expected_ids
+        assert search_result.total_hits == len(expected_ids)
+
+    def test_search_pages_follow_the_cursor(self, spatial_database):
+        query = Query(original_raw_string_data=[])
+        search_filter = SearchFilter(bounding_box=GERMANY, hits_per_page=3)
+
+        first_page = spatial_database.search_locations_related_to_query(
+            query, search_filter
+        )
+        search_filter.cursor = first_page.next_cursor
+        second_page = spatial_database.search_locations_related_to_query(
+            query, search_filter
+        )
+
+        assert get_ids(first_page.spatial_data) == ["a", "b", "c"]
+        assert get_ids(second_page.spatial_data) == ["d"]
+        assert second_page.next_cursor is None
+
+    def test_get_data_for_ids(self, spatial_database):
+        feature_collection = spatial_database.get_data_for_location_ids(
+            ["d", "unknown", "b", "0"]
+        )
+
+        assert [feature["id"] for feature in feature_collection["features"]] == [
+            "d",
+            "b",
+        ]
+
+    def test_empty_feature_store(self, tmp_path):
+        path = str(tmp_path / "empty.store")
+
+        assert build_feature_store(path, []) == 0
+
+        spatial_database = MemoryMappedSpatialDatabase({"path": path})
+        search_result = spatial_database.search_locations_related_to_query(
+            Query(original_raw_string_data=["unknown"]),
+            SearchFilter(bounding_box=GERMANY),
+        )
+
+        assert search_result.total_hits == 0
+
+    def test_reject_other_files(self, tmp_path):
+        path = tmp_path / "features.geojson"
+        path.write_text(json.dumps({"type": "FeatureCollection", "features": []}))
+
+        with pytest.raises(ValueError):
+            MemoryMappedSpatialDatabase({"path": str(path)})
+
+    def test_management_command(self, tmp_path, local_features):
+        geojson_path = tmp_path / "features.ndjson"
+        geojson_path.write_text(
+            "\n".join(json.dumps(feature) for feature in local_features)
+        )
+        store_path = str(tmp_path / "features.store")
+        output = io.StringIO()
+
+        call_command(
+            "build_feature_store", str(geojson_path), store_path, stdout=output
+        )
+
+        spatial_database = MemoryMappedSpatialDatabase({"path": store_path})
+        search_result = spatial_database.search_locations_related_to_query(
+            Query(original_raw_string_data=[]), SearchFilter(bounding_box=GERMANY)
+        )
+
+        assert "stored 4 Features" in output.getvalue()
+        assert get_ids(search_result.spatial_data) == ["a", "b", "c", "d"]
+
+    def test_management_command_rejects_missing_files(self, tmp_path):
+        with pytest.raises(CommandError):
+            call_command(
+                "build_feature_store",
+                str(tmp_path / "missing.ndjson"),
+                str(tmp_path / "features.store"),
+            )
+
+    @pytest.fixture
+    def spatial_database(self, tmp_path, local_features):
+        path = str(tmp_path / "features.store")
+        assert build_feature_store(path, local_features) == 4
+
+        return MemoryMappedSpatialDatabase({"path": path})
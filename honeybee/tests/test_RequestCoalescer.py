@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from honeybee.databases.coalescing import RequestCoalescer
+
+NUMBER_OF_CALLERS = 10
+
+
+class TestRequestCoalescer:
+    def test_concurrent_threads_share_a_single_call(self, request_coalescer):
+        release_call = threading.Event()
+        calls = []
+        results = []
+
+        def slow_function():
+            calls.append(1)
+            release_call.wait(timeout=5)
+            return "result"
+
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    request_coalescer.call("key", slow_function)
+                )
+            )
+            for _ in range(NUMBER_OF_CALLERS)
+        ]
+        for thread in threads:
+            thread.start()
+
+        wait_for(lambda: request_coalescer.coalesced_calls == NUMBER_OF_CALLERS - 1)
+        release_call.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == ["result"] * NUMBER_OF_CALLERS
+        assert request_coalescer.calls == 1
+
+    def test_exception_is_raised_for_all_callers(self, request_coalescer):
+        def failing_function():
+            raise ValueError()
+
+        with pytest.raises(ValueError):
+            request_coalescer.call("key", failing_function)
+
+        assert request_coalescer.call("key", lambda: "result") == "result"
+
+    def test_concurrent_coroutines_share_a_single_call(self, request_coalescer):
+        calls = []
+
+        async def slow_coroutine():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def call_concurrently():
+            return await asyncio.gather(
+                *(
+                    request_coalescer.call_async("key", slow_coroutine)
+                    for _ in range(NUMBER_OF_CALLERS)
+                )
+            )
+
+        results = asyncio.run(call_concurrently())
+
+        assert len(calls) == 1
+        assert results == ["result"] * NUMBER_OF_CALLERS
+        assert request_coalescer.coalesced_calls == NUMBER_OF_CALLERS - 1
+
+    def test_cancelled_leader_does_not_cancel_the_other_callers(
+        self, request_coalescer
+    ):
+        async def slow_coroutine():
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def cancel_leader():
+            leader = asyncio.ensure_future(
+                request_coalescer.call_async("key", slow_coroutine)
+            )
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(
+                request_coalescer.call_async("key", slow_coroutine)
+            )
+            await asyncio.sleep(0)
+            leader.cancel()
+
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            return await follower
+
+        assert asyncio.run(cancel_leader()) == "result"
+        assert request_coalescer.calls == 1
+        assert request_coalescer.coalesced_calls == 1
+
+    def test_different_keys_are_not_coalesced(self, request_coalescer):
+        request_coalescer.call("first-key", lambda: 1)
+        request_coalescer.call("second-key", lambda: 2)
+
+        assert request_coalescer.calls == 2
+        assert request_coalescer.coalesced_calls == 0
+
+    @pytest.fixture
+    def request_coalescer(self):
+        return RequestCoalescer()
+
+
+def wait_for(condition, timeout: float = 5) -> None:
+    end_time = time.monotonic() + timeout
+    while not condition() and time.monotonic() < end_time:
+        time.sleep(0.001)
@@ -0,0 +1,171 @@
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from honeybee.commons import (
+    Query,
+    RawFeatureCollection,
+    SearchFilter,
+    UserInputException,
+)
+from honeybee.databases.sqlite import SQLiteSpatialDatabase, build_sqlite_database
+from honeybee.search import SpatialSearch
+from honeybee.tests.commons import (
+    FIJI,
+    GERMANY,
+    LOCAL_SEARCH_SCENARIOS,
+    create_antimeridian_features,
+    create_feature,
+    get_ids,
+)
+
+
+class TestSQLiteSpatialDatabase:
+    @pytest.mark.parametrize(
+        ["search_filter", "query_terms", "expected_ids"], LOCAL_SEARCH_SCENARIOS
+    )
+    def test_search(self, spatial_database, search_filter, query_terms, expected_ids):
+        search_result = spatial_database.search_locations_related_to_query(
+            Query(original_raw_string_data=query_terms), search_filter
+        )
+
+        assert isinstance(search_result.spatial_data, RawFeatureCollection)
+        assert get_ids(search_result.spatial_data) == expected_ids
+        assert search_result.total_hits == len(expected_ids)
+        assert search_result.next_cursor is None
+
+    def test_search_pages_follow_the_cursor(self, spatial_database):
+        query = Query(original_raw_string_data=[])
+        search_filter = SearchFilter(bounding_box=GERMANY, hits_per_page=3)
+
+        first_page = spatial_database.search_locations_related_to_query(
+            query, search_filter
+        )
+        search_filter.cursor = first_page.next_cursor
+        second_page = spatial_database.search_locations_related_to_query(
+            query, search_filter
+        )
+
+        assert get_ids(first_page.spatial_data) == ["a", "b", "c"]
+        assert get_ids(second_page.spatial_data) == ["d"]
+        assert second_page.next_cursor is None
+        assert first_page.total_hits == second_page.total_hits == 4
+
+    def test_search_across_the_antimeridian(self, tmp_path):
+        path = str(tmp_path / "antimeridian.sqlite")
+        build_sqlite_database(path, create_antimeridian_features())
+        spatial_database = SQLiteSpatialDatabase({"path": path})
+
+        search_result = spatial_database.search_locations_related_to_query(
+            Query(original_raw_string_data=[]), SearchFilter(bounding_box=FIJI)
+        )
+        spatial_database.close()
+
+        assert get_ids(search_result.spatial_data) == ["east", "west"]
+
+    def test_invalid_cursor_is_rejected(self, spatial_database):
+        with pytest.raises(UserInputException):
+            spatial_database.search_locations_related_to_query(
+                Query(original_raw_string_data=[]), SearchFilter(cursor="a")
+            )
+
+    @pytest.mark.parametrize(
+        "search_filter", [SearchFilter(sample_size=2), SearchFilter(spread=1)]
+    )
+    def test_sampling_and_spreading_are_rejected(self, spatial_database, search_filter):
+        with pytest.raises(UserInputException):
+            spatial_database.search_locations_related_to_query(
+                Query(original_raw_string_data=[]), search_filter
+            )
+
+    @pytest.mark.parametrize(
+        "search_filter", [SearchFilter(sample_size=2), SearchFilter(spread=1)]
+    )
+    def test_sampled_and_spread_exports_are_rejected_before_streaming(
+        self, spatial_database, search_filter
+    ):
+        spatial_search = SpatialSearch(spatial_database=spatial_database)
+
+        with pytest.raises(UserInputException):
+            spatial_search.stream(Query(original_raw_string_data=[]), search_filter)
+
+    def test_stream_all_features(self, spatial_database, monkeypatch):
+        monkeypatch.setattr("honeybee.conf.MAP_VIEWER_MAXIMUM_HITS_PER_PAGE", 2)
+
+        features = spatial_database.stream_locations_related_to_query(
+            Query(original_raw_string_data=[]), SearchFilter(bounding_box=GERMANY)
+        )
+
+        assert [json.loads(feature)["id"] for feature in features] == [
+            "a",
+            "b",
+            "c",
+            "d",
+        ]
+
+    def test_get_data_for_ids(self, spatial_database):
+        feature_collection = spatial_database.get_data_for_location_ids(
+            ["d", "unknown", "b"]
+        )
+
+        assert [feature["id"] for feature in feature_collection["features"]] == [
+            "d",
+            "b",
+        ]
+
+    def test_rebuild_replaces_features(self, spatial_database):
+        build_sqlite_database(
+            spatial_database.path,
+            [
+                create_feature(
+                    "a",
+                    {"type": "Point", "coordinates": [0.0, 0.0]},
+                    taxa=["https://www.biofid.de/ontologies/Quercus"],
+                )
+            ],
+        )
+
+        moved_feature_result = spatial_database.search_locations_related_to_query(
+            Query(original_raw_string_data=[]), SearchFilter(bounding_box=GERMANY)
+        )
+        taxon_result = spatial_database.search_locations_related_to_query(
+            Query(original_raw_string_data=["https://www.biofid.de/ontologies/Vogel"]),
+            SearchFilter(bounding_box=GERMANY),
+        )
+
+        assert get_ids(moved_feature_result.spatial_data) == ["b", "c", "d"]
+        assert get_ids(taxon_result.spatial_data) == ["c"]
+
+    def test_every_thread_uses_its_own_connection(self, spatial_database):
+        results = []
+
+        def search():
+            results.append(
+                spatial_database.search_locations_related_to_query(
+                    Query(original_raw_string_data=[]),
+                    SearchFilter(bounding_box=GERMANY),
+                ).total_hits
+            )
+
+        threads = [threading.Thread(target=search) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [4, 4, 4]
+
+    def test_missing_database_file_is_rejected(self, tmp_path):
+        with pytest.raises(sqlite3.OperationalError):
+            SQLiteSpatialDatabase({"path": str(tmp_path / "missing.sqlite")})
+
+    @pytest.fixture
+    def spatial_database(self, tmp_path, local_features):
+        path = str(tmp_path / "features.sqlite")
+        assert build_sqlite_database(path, local_features) == 4
+
+        spatial_database = SQLiteSpatialDatabase({"path": path})
+        yield spatial_database
+        spatial_database.close()
@@ -1,29 +1,287 @@
+import asyncio
+import json
 from unittest.mock import Mock
 
+import pysolr
 import pytest
 from geojson import FeatureCollection
 
-from honeybee.databases.solr import SolrSpatialDatabase
+from honeybee import conf
+from honeybee.commons import Point, Query, RawFeatureCollection, SearchFilter
+from honeybee.databases.solr import SolrSpatialDatabase, convert_heatmap_to_features
+from honeybee.tests.solr_stub import StubSolrServer
 
 
 class TestSolrSpatialDatabase:
     def test_get_data_for_id(
         self, solr_spatial_database, solr_response_with_geojson_field_only
     ):
-        solr_spatial_database.call_db.return_value = (
-            solr_response_with_geojson_field_only
+        solr_spatial_database.call_db_for_ids = Mock(
+            return_value=solr_response_with_geojson_field_only.docs
         )
 
         response_data = solr_spatial_database.get_data_for_location_id("123abc")
 
         assert isinstance(response_data, FeatureCollection)
-        solr_spatial_database.call_db.assert_called_with(
-            query="id:123abc"
+        assert len(response_data["features"]) == 1
+        solr_spatial_database.call_db_for_ids.assert_called_with(["123abc"])
+        solr_spatial_database.call_db.assert_not_called()
+
+    @pytest.mark.parametrize(
+        ["location_ids", "real_time_get_response", "expected_number_of_features"],
+        [
+            (  # Scenario - Single ID, Solr returns the document directly
+                ["a:b/c"],
+                {"doc": {"id": "a:b/c", "geojson": '{"type": "Feature"}'}},
+                1,
+            ),
+            (  # Scenario - Single unknown ID
+                ["unknown"],
+                {"doc": None},
+                0,
+            ),
+            (  # Scenario - Multiple IDs, Solr returns a document list
+                ["a", "b,c"],
+                {
+                    "response": {
+                        "numFound": 2,
+                        "docs": [
+                            {"id": "a", "geojson": '{"type": "Feature"}'},
+                            {"id": "b,c", "geojson": '{"type": "Feature"}'},
+                        ],
+                    }
+                },
+                2,
+            ),
+        ],
+    )
+    def test_get_data_for_ids_uses_real_time_get(
+        self, location_ids, real_time_get_response, expected_number_of_features
+    ):
+        with StubSolrServer(
+            lambda handler, parameters: real_time_get_response
+        ) as server:
+            spatial_database = SolrSpatialDatabase({"url": server.url})
+            response_data = spatial_database.get_data_for_location_ids(location_ids)
+
+        handler, parameters = server.requests[0]
+        assert handler == "get"
+        assert parameters["id"] == location_ids
+        assert len(response_data["features"]) == expected_number_of_features
+
+    @pytest.mark.parametrize(
+        ["is_validated", "expected_number_of_features"], [(True, 1), (False, 2)]
+    )
+    def test_search_passes_stored_geojson_through(
+        self,
+        solr_spatial_database,
+        solr_response_with_geojson_field_only,
+        monkeypatch,
+        is_validated,
+        expected_number_of_features,
+    ):
+        monkeypatch.setattr(
+            conf, "MAP_VIEWER_GEOJSON_PASSTHROUGH_VALIDATION", is_validated
+        )
+        stored_feature = solr_response_with_geojson_field_only.docs[0]["geojson"]
+        solr_response_with_geojson_field_only.docs.append({"geojson": "not a feature"})
+        solr_spatial_database.call_db.return_value = (
+            solr_response_with_geojson_field_only
+        )
+
+        response_data = solr_spatial_database.search_locations_related_to_query(
+            Query(original_raw_string_data=[])
+        ).spatial_data
+
+        assert isinstance(response_data, RawFeatureCollection)
+        assert len(response_data.features) == expected_number_of_features
+        assert response_data.features[0] == stored_feature
+
+    def test_search_builds_features_from_doc_values(
+        self, solr_spatial_database, monkeypatch
+    ):
+        monkeypatch.setattr(conf, "MAP_VIEWER_SOLR_FEATURES_FROM_DOC_VALUES", True)
+        solr_spatial_database.call_db.return_value = pysolr.Results(
+            {
+                "response": {
+                    "numFound": 2,
+                    "docs": [
+                        {
+                            "id": "a",
+                            "location": "50.11552,8.68417",
+                            "date": "1836-01-01T00:00:00Z",
+                            "taxa": ["https://www.biofid.de/ontologies/Fagus"],
+                        },
+                        {"id": "b"},
+                    ],
+                }
+            }
+        )
+        search_filter = SearchFilter(return_fields=["date"], coordinate_precision=2)
+
+        search_result = solr_spatial_database.search_locations_related_to_query(
+            Query(original_raw_string_data=[]), search_filter
+        )
+        streamed_features = list(
+            solr_spatial_database.stream_locations_related_to_query(
+                Query(original_raw_string_data=[])
+            )
+        )
+
+        assert search_result.spatial_data["features"] == [
+            {
+                "type": "Feature",
+                "id": "a",
+                "geometry": {"type": "Point", "coordinates": [8.68, 50.12]},
+                "properties": {"date": "1836-01-01"},
+            }
+        ]
+        assert json.loads(streamed_features[0])["properties"] == {
+            "date": "1836-01-01",
+            "taxa": ["https://www.biofid.de/ontologies/Fagus"],
+        }
+        assert len(streamed_features) == 1
+        solr_parameters = solr_spatial_database.call_db.call_args.kwargs
+        assert solr_parameters["fl"] == "id,location,date,taxa"
+
+    def test_detail_fetch_loads_serialized_features_with_doc_values(self, monkeypatch):
+        monkeypatch.setattr(conf, "MAP_VIEWER_SOLR_FEATURES_FROM_DOC_VALUES", True)
+
+        with StubSolrServer(
+            lambda handler, parameters: {
+                "doc": {"id": "a", "geojson": '{"type": "Feature", "id": "a"}'}
+            }
+        ) as server:
+            spatial_database = SolrSpatialDatabase({"url": server.url})
+            response_data = spatial_database.get_data_for_location_ids(["a"])
+
+        handler, parameters = server.requests[0]
+        assert parameters["fl"] == ["id,geojson"]
+        assert response_data["features"][0]["id"] == "a"
+
+    def test_aggregate_locations_to_heatmap_cells(self, solr_spatial_database):
+        heatmap = [
+            "gridLevel", 4,
+            "columns", 2,
+            "rows", 2,
+            "minX", 8.0,
+            "maxX", 10.0,
+            "minY", 50.0,
+            "maxY", 52.0,
+            "counts_ints2D", [[0, 3], None],
+        ]  # fmt: skip
+        solr_spatial_database.call_db.return_value = pysolr.Results(
+            {
+                "response": {"numFound": 3, "docs": []},
+                "facet_counts": {"facet_heatmaps": {"location": heatmap}},
+            }
+        )
+        search_filter = SearchFilter(
+            spatial_center=Point(latitude=51.0, longitude=9.0), radius=50, zoom=8
+        )
+
+        search_result = solr_spatial_database.aggregate_locations_related_to_query(
+            Query(original_raw_string_data=[]), search_filter
         )
 
+        features = search_result.spatial_data["features"]
+        assert len(features) == 1
+        assert features[0]["geometry"]["coordinates"] == [9.5, 51.5]
+        assert features[0]["properties"]["count"] == 3
+        solr_parameters = solr_spatial_database.call_db.call_args.kwargs
+        assert solr_parameters["rows"] == 0
+        assert solr_parameters["facet.heatmap"] == "location"
+        assert solr_parameters["facet.heatmap.gridLevel"] == 4
+        assert "cursorMark" not in solr_parameters
+
+    def test_heatmap_cells_across_the_antimeridian(self):
+        heatmap = {
+            "gridLevel": 2,
+            "columns": 2,
+            "rows": 1,
+            "minX": 170.0,
+            "maxX": -170.0,
+            "minY": -20.0,
+            "maxY": -10.0,
+            "counts_ints2D": [[1, 2]],
+        }
+
+        features = convert_heatmap_to_features(heatmap)
+
+        assert [feature["geometry"]["coordinates"] for feature in features] == [
+            [175.0, -15.0],
+            [-175.0, -15.0],
+        ]
+
     @pytest.fixture
     def solr_spatial_database(self):
         spatial_database = SolrSpatialDatabase({"url": "http://localhost:1234/solr"})
         spatial_database.call_db = Mock()
 
         return spatial_database
+
+
+class TestAsyncSolrSpatialDatabase:
+    def test_search_without_blocking(self, solr_response_geojson_data):
+        solr_response_geojson_data["nextCursorMark"] = "AoE/next"
+
+        with StubSolrServer(
+            lambda handler, parameters: solr_response_geojson_data
+        ) as server:
+            spatial_database = SolrSpatialDatabase({"url": server.url})
+            search_result = asyncio.run(
+                spatial_database.search_locations_related_to_query_async(
+                    Query(original_raw_string_data=["Fagus"])
+                )
+            )
+
+        handler, parameters = server.requests[0]
+        assert handler == "select"
+        assert parameters["q"] == ['taxa:("Fagus")']
+        assert parameters["cursorMark"] == ["*"]
+        assert parameters["sort"] == ["id asc"]
+        assert search_result.next_cursor == "AoE/next"
+        assert search_result.total_hits == 1
+        assert len(search_result.spatial_data.features) == 1
+
+    def test_concurrent_identical_searches_are_sent_once(
+        self, solr_response_geojson_data
+    ):
+        async def search_concurrently(spatial_database):
+            return await asyncio.gather(
+                *(
+                    spatial_database.search_locations_related_to_query_async(
+                        Query(original_raw_string_data=[])
+                    )
+                    for _ in range(5)
+                )
+            )
+
+        with StubSolrServer(
+            lambda handler, parameters: solr_response_geojson_data
+        ) as server:
+            spatial_database = SolrSpatialDatabase({"url": server.url})
+            search_results = asyncio.run(search_concurrently(spatial_database))
+
+        assert len(server.requests) == 1
+        assert len(search_results) == 5
+
+    def test_event_loops_share_a_single_client(self, solr_response_geojson_data):
+        async def search(spatial_database):
+            await spatial_database.search_locations_related_to_query_async(
+                Query(original_raw_string_data=[])
+            )
+            return spatial_database._get_async_client()
+
+        with StubSolrServer(
+            lambda handler, parameters: solr_response_geojson_data
+        ) as server:
+            spatial_database = SolrSpatialDatabase({"url": server.url})
+            first_client, event_loop = asyncio.run(search(spatial_database))
+            second_client, _ = asyncio.run(search(spatial_database))
+            spatial_database.close()
+
+        assert len(server.requests) == 2
+        assert first_client is second_client
+        assert first_client.is_closed
+        assert event_loop.is_closed()
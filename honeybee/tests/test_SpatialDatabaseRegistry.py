@@ -0,0 +1,59 @@
+import pytest
+
+from honeybee.databases import registry
+from honeybee.databases.registry import SpatialDatabaseRegistry
+
+
+class TestSpatialDatabaseRegistry:
+    def test_same_database_is_returned_for_same_configuration(
+        self, database_registry, database_configuration
+    ):
+        first_database = database_registry.get(database_configuration)
+        second_database = database_registry.get(dict(database_configuration))
+
+        assert first_database is second_database
+
+    def test_different_databases_for_different_configurations(
+        self, database_registry, database_configuration
+    ):
+        other_configuration = {"url": "http://localhost:5678/solr"}
+
+        assert database_registry.get(
+            database_configuration
+        ) is not database_registry.get(other_configuration)
+
+    def test_databases_are_not_shared_with_forked_processes(
+        self, database_registry, database_configuration, monkeypatch
+    ):
+        parent_database = database_registry.get(database_configuration)
+
+        monkeypatch.setattr(registry.os, "getpid", lambda: -1)
+        child_database = database_registry.get(database_configuration)
+
+        assert parent_database is not child_database
+
+    def test_connection_pool_is_configured(self, database_registry):
+        configuration = {
+            "url": "http://localhost:1234/solr",
+            "pool_size": 3,
+            "keep_alive": False,
+            "connect_timeout": 1,
+            "read_timeout": 2,
+        }
+
+        solr = database_registry.get(configuration)._solr_db
+        session = solr.get_session()
+
+        assert solr.timeout == (1, 2)
+        assert session.get_adapter("http://localhost")._pool_maxsize == 3
+        assert session.headers["Connection"] == "close"
+
+    @pytest.fixture
+    def database_configuration(self):
+        return {"url": "http://localhost:1234/solr"}
+
+    @pytest.fixture
+    def database_registry(self):
+        database_registry = SpatialDatabaseRegistry()
+        yield database_registry
+        database_registry.clear()
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from benchmarks.search_pipeline import (
+    STAGE_NAMES,
+    BenchmarkResult,
+    SyntheticCorpus,
+    calculate_percentile,
+    find_regressions,
+    run_benchmark,
+)
+
+
+class TestSearchPipelineBenchmark:
+    def test_corpus_pages_follow_the_cursor(self):
+        corpus = SyntheticCorpus(size=25)
+
+        first_page = corpus.respond("select", {"rows": ["20"], "cursorMark": ["*"]})
+        last_page = corpus.respond(
+            "select",
+            {"rows": ["20"], "cursorMark": [first_page["nextCursorMark"]]},
+        )
+
+        assert len(first_page["response"]["docs"]) == 20
+        assert len(last_page["response"]["docs"]) == 5
+        assert last_page["nextCursorMark"] == first_page["nextCursorMark"]
+        assert first_page["response"]["numFound"] == 25
+        assert corpus.create_document(3) == SyntheticCorpus(size=25).create_document(3)
+        feature = json.loads(first_page["response"]["docs"][0]["geojson"])
+        assert feature["type"] == "Feature"
+
+    def test_corpus_returns_only_requested_fields(self):
+        corpus = SyntheticCorpus(size=10)
+
+        response = corpus.respond("select", {"rows": ["1"], "fl": ["id,location"]})
+
+        assert set(response["response"]["docs"][0]) == {"id", "location"}
+
+    def test_every_stage_is_measured(self):
+        result = run_benchmark(
+            corpus_size=1000, iterations=3, warmup_iterations=0, hits_per_page=10
+        )
+
+        assert set(result.latencies) == set(STAGE_NAMES) | {"total"}
+        assert all(
+            latencies["p50"] <= latencies["p99"]
+            for latencies in result.latencies.values()
+        )
+        assert result.features_per_second == pytest.approx(
+            result.requests_per_second * 10
+        )
+        assert result.peak_memory > 0
+
+    def test_regressions_are_found(self):
+        baseline = create_result(latency=10.0, peak_memory=100.0)
+        slower_result = create_result(latency=12.0, peak_memory=100.0)
+
+        assert find_regressions([baseline], [baseline]) == []
+        assert find_regressions([slower_result], [baseline], threshold=0.5) == []
+        regressions = find_regressions([slower_result], [baseline], threshold=0.1)
+        assert len(regressions) == 3
+        assert regressions[0].startswith("1000 documents, total p50 (ms)")
+
+    @pytest.mark.parametrize(
+        ["percentile", "expected_value"], [(50, 5), (99, 10), (100, 10), (1, 1)]
+    )
+    def test_percentile(self, percentile, expected_value):
+        assert (
+            calculate_percentile(list(range(10, 0, -1)), percentile) == expected_value
+        )
+
+
+def create_result(latency: float, peak_memory: float) -> BenchmarkResult:
+    return BenchmarkResult(
+        corpus_size=1000,
+        iterations=10,
+        hits_per_page=100,
+        response_format="json",
+        latencies={"total": {"p50": latency, "p99": latency}},
+        requests_per_second=1000 / latency,
+        features_per_second=100000 / latency,
+        peak_memory=peak_memory,
+    )
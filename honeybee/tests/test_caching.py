@@ -0,0 +1,163 @@
+import datetime
+from unittest.mock import Mock
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+
+from honeybee import caching, conf
+from honeybee.caching import LRUCache, SearchResultCache, create_search_cache_key
+from honeybee.commons import DateSpan, Point, Query, SearchFilter
+
+
+class TestSearchCacheKey:
+    @pytest.mark.parametrize(
+        ["first_search", "second_search"],
+        [
+            (  # Scenario - Terms in different order and duplicated
+                (Query(["b", "a"]), SearchFilter()),
+                (Query(["a", "b", "a"]), SearchFilter()),
+            ),
+            (  # Scenario - Coordinates differ beyond the decimal precision
+                (
+                    Query([]),
+                    SearchFilter(spatial_center=Point(latitude=8.1, longitude=50.1)),
+                ),
+                (
+                    Query([]),
+                    SearchFilter(
+                        spatial_center=Point(latitude=8.1000000001, longitude=50.1)
+                    ),
+                ),
+            ),
+            (  # Scenario - Default values are given explicitly
+                (Query([]), SearchFilter()),
+                (
+                    Query([]),
+                    SearchFilter(
+                        spatial_center=Point(latitude=51.16336, longitude=10.44768),
+                        radius=50,
+                        hits_per_page=100,
+                        cursor="*",
+                    ),
+                ),
+            ),
+            (  # Scenario - Empty date span
+                (Query([]), SearchFilter()),
+                (Query([]), SearchFilter(date_span=DateSpan(None, None))),
+            ),
+            (  # Scenario - Default sample seed is given explicitly
+                (Query([]), SearchFilter(sample_size=10)),
+                (Query([]), SearchFilter(sample_size=10, sample_seed=0)),
+            ),
+        ],
+    )
+    def test_equivalent_searches_have_same_key(self, first_search, second_search):
+        assert create_search_cache_key(*first_search) == create_search_cache_key(
+            *second_search
+        )
+
+    @pytest.mark.parametrize(
+        "other_search",
+        [
+            (Query(["a"]), SearchFilter()),
+            (Query([]), SearchFilter(radius=10)),
+            (Query([]), SearchFilter(cursor="AoE")),
+            (Query([]), SearchFilter(sample_size=10)),
+            (Query([]), SearchFilter(sample_size=10, sample_seed=1)),
+            (
+                Query([]),
+                SearchFilter(
+                    date_span=DateSpan(datetime.date(1900, 1, 1), None),
+                ),
+            ),
+        ],
+    )
+    def test_different_searches_have_different_keys(self, other_search):
+        assert create_search_cache_key(
+            Query([]), SearchFilter()
+        ) != create_search_cache_key(*other_search)
+
+
+class TestSearchResultCache:
+    def test_result_is_searched_only_once(self, search_result_cache):
+        search = Mock(return_value="result")
+
+        first_result = search_result_cache.get_or_search(
+            Query(["a"]), SearchFilter(), search
+        )
+        second_result = search_result_cache.get_or_search(
+            Query(["a"]), SearchFilter(), search
+        )
+
+        assert first_result == second_result == "result"
+        assert search.call_count == 1
+        assert search_result_cache.hits == 1
+        assert search_result_cache.misses == 1
+        assert search_result_cache.hit_ratio == 0.5
+
+    def test_oldest_entries_are_evicted(self):
+        cache = LocMemCache(
+            "test-eviction", {"OPTIONS": {"MAX_ENTRIES": 2, "CULL_FREQUENCY": 0}}
+        )
+        search_result_cache = SearchResultCache(cache, timeout=None)
+
+        for term in ["a", "b", "c"]:
+            search_result_cache.get_or_search(
+                Query([term]), SearchFilter(), Mock(return_value=term)
+            )
+
+        assert len(cache._cache) < 3
+
+    def test_search_view_uses_cache(
+        self, client, monkeypatch, solr_response_with_geojson_field_only
+    ):
+        from pysolr import Solr
+
+        monkeypatch.setattr(conf, "MAP_VIEWER_SEARCH_CACHE_ENABLED", True)
+        monkeypatch.setattr(caching, "_search_result_cache", None)
+        caching.get_search_result_cache().clear()
+        mock = Mock(return_value=solr_response_with_geojson_field_only)
+        monkeypatch.setattr(Solr, name="search", value=mock)
+
+        first_response = client.get("/map/search?term=a&term=b")
+        second_response = client.get("/map/search?term=b&term=a")
+
+        assert first_response.content == second_response.content
+        assert mock.call_count == 1
+        assert caching.get_search_result_cache().hits == 1
+
+    @pytest.fixture
+    def search_result_cache(self):
+        search_result_cache = SearchResultCache(LocMemCache("test", {}), timeout=60)
+        yield search_result_cache
+        search_result_cache.clear()
+
+
+class TestLRUCache:
+    def test_evict_least_recently_used_entry(self):
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+
+        cache.set("c", 3)
+
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert (cache.hits, cache.misses) == (3, 1)
+
+    def test_entries_expire_after_timeout(self, monkeypatch):
+        now = 1000.0
+        monkeypatch.setattr(caching.time, "monotonic", lambda: now)
+        cache = LRUCache(max_size=2, timeout=10)
+        cache.set("a", 1)
+
+        now = 1009.0
+        assert cache.get("a") == 1
+
+        now = 1010.0
+        assert cache.get("a") is None
+        assert len(cache) == 0
+        assert (cache.hits, cache.misses) == (1, 1)
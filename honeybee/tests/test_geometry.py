@@ -0,0 +1,119 @@
+import pytest
+
+from honeybee.commons import BoundingBox, Point, Tile
+from honeybee.geometry import (
+    calculate_geohash_level_for_zoom,
+    calculate_tile_bounding_box,
+    calculate_bounding_box_width,
+    create_bounding_box_around_point,
+    encode_geohash,
+    project_to_tile,
+    round_geometry,
+    split_bounding_box_at_antimeridian,
+)
+from honeybee.tests.commons import FIJI, GERMANY
+
+
+class TestGeometry:
+    def test_bounding_box_around_point(self):
+        bounding_box = create_bounding_box_around_point(
+            Point(latitude=0, longitude=0), radius=111.195
+        )
+
+        assert bounding_box.minimum_latitude == pytest.approx(-1)
+        assert bounding_box.minimum_longitude == pytest.approx(-1)
+        assert bounding_box.maximum_latitude == pytest.approx(1)
+        assert bounding_box.maximum_longitude == pytest.approx(1)
+
+    def test_bounding_box_is_clipped_at_poles(self):
+        bounding_box = create_bounding_box_around_point(
+            Point(latitude=89.9, longitude=0), radius=100
+        )
+
+        assert bounding_box == BoundingBox(
+            minimum_latitude=pytest.approx(89.0, abs=0.01),
+            minimum_longitude=-180,
+            maximum_latitude=90,
+            maximum_longitude=180,
+        )
+
+    def test_bounding_box_crossing_the_antimeridian_is_split(self):
+        assert split_bounding_box_at_antimeridian(FIJI) == [
+            BoundingBox(-20.0, 175.0, -15.0, 180.0),
+            BoundingBox(-20.0, -180.0, -15.0, -175.0),
+        ]
+        assert split_bounding_box_at_antimeridian(GERMANY) == [GERMANY]
+        assert calculate_bounding_box_width(FIJI) == 10
+        assert calculate_bounding_box_width(GERMANY) == 10
+
+    @pytest.mark.parametrize(
+        ["zoom", "expected_level"], [(0, 1), (5, 3), (8, 4), (18, 8)]
+    )
+    def test_geohash_level_fits_zoom(self, zoom, expected_level):
+        assert (
+            calculate_geohash_level_for_zoom(zoom, cells_per_tile=4) == expected_level
+        )
+
+    @pytest.mark.parametrize(
+        ["point", "level", "expected_geohash"],
+        [
+            (Point(latitude=57.64911, longitude=10.40744), 11, "u4pruydqqvj"),
+            (Point(latitude=52.52, longitude=13.405), 6, "u33dc0"),
+            (Point(latitude=90, longitude=180), 2, "zz"),
+            (Point(latitude=-90, longitude=-180), 2, "00"),
+        ],
+    )
+    def test_encode_geohash(self, point, level, expected_geohash):
+        assert encode_geohash(point, level) == expected_geohash
+
+    def test_tile_bounding_box(self):
+        bounding_box = calculate_tile_bounding_box(Tile(zoom=1, x=1, y=0))
+
+        assert bounding_box == BoundingBox(
+            minimum_latitude=pytest.approx(0),
+            minimum_longitude=0,
+            maximum_latitude=pytest.approx(85.0511287798066),
+            maximum_longitude=180,
+        )
+
+    def test_tile_bounding_box_with_buffer_is_clipped(self):
+        bounding_box = calculate_tile_bounding_box(Tile(zoom=0, x=0, y=0), buffer=0.5)
+
+        assert bounding_box.minimum_longitude == -180
+        assert bounding_box.maximum_longitude == 180
+        assert bounding_box.maximum_latitude < 90
+
+    @pytest.mark.parametrize(
+        ["longitude", "latitude", "expected_position"],
+        [
+            (0, 0, (0, 4096)),  # Lower left corner of the tile
+            (90, 66.51326044311186, (2048, 2048)),  # Center of the tile
+            (-90, 0, (-2048, 4096)),  # Outside of the tile
+            (0, 90, (0, 0)),  # Latitudes are clipped to the Web Mercator range
+        ],
+    )
+    def test_project_to_tile(self, longitude, latitude, expected_position):
+        assert (
+            project_to_tile(longitude, latitude, Tile(zoom=1, x=1, y=0), extent=4096)
+            == expected_position
+        )
+
+    def test_round_geometry(self):
+        geometry = {
+            "type": "GeometryCollection",
+            "geometries": [
+                {"type": "Point", "coordinates": [8.6821267, 50.1109221]},
+                {
+                    "type": "LineString",
+                    "coordinates": [[8.6821267, 50.1109221], [9.0, 51.12345]],
+                },
+            ],
+        }
+
+        assert round_geometry(geometry, 2) == {
+            "type": "GeometryCollection",
+            "geometries": [
+                {"type": "Point", "coordinates": [8.68, 50.11]},
+                {"type": "LineString", "coordinates": [[8.68, 50.11], [9.0, 51.12]]},
+            ],
+        }
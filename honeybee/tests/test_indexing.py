@@ -0,0 +1,186 @@
+import io
+import json
+import os
+
+import pytest
+from django.core.management import CommandError, call_command
+from pysolr import SolrError
+
+from honeybee import conf
+from honeybee.databases.features import iterate_feature_collection
+from honeybee.indexing import SolrIndexer, create_solr_document
+from honeybee.tests.solr_stub import StubSolrServer
+
+
+class TestFeatureCollectionStreaming:
+    @pytest.mark.parametrize("chunk_size", [1, 7, 1024])
+    def test_features_are_read_one_by_one(self, local_features, chunk_size):
+        feature_collection = {
+            "type": "FeatureCollection",
+            "name": 'Not a "features": [ member }',
+            "features": local_features,
+            "crs": {"type": "name", "properties": {"name": "EPSG:4326"}},
+        }
+        geojson_file = SmallChunkFile(
+            json.dumps(feature_collection, indent=2), chunk_size
+        )
+
+        assert list(iterate_feature_collection(geojson_file)) == local_features
+
+    @pytest.mark.parametrize(
+        "content", ['{"type": "FeatureCollection", "features": []}', "{}"]
+    )
+    def test_empty_feature_collection(self, content):
+        assert list(iterate_feature_collection(io.StringIO(content))) == []
+
+    def test_broken_file_raises_error(self):
+        with pytest.raises(ValueError):
+            list(iterate_feature_collection(io.StringIO('{"features": [{"id": 1}')))
+
+
+class TestSolrIndexer:
+    def test_create_solr_document(self, local_features):
+        document = create_solr_document(local_features[2])
+
+        assert document["id"] == "b"
+        assert document["location"] == "52.52,13.405"
+        assert document["date"] == "1900-05-01T00:00:00Z"
+        assert document["taxa"] == ["https://www.biofid.de/ontologies/Fagus"]
+        assert json.loads(document["geojson"]) == local_features[2]
+
+    def test_create_solr_document_with_geohash_cells(self, local_features, monkeypatch):
+        monkeypatch.setattr(conf, "MAP_VIEWER_SOLR_GEOHASH_CELL_FIELD_PREFIX", "cell_")
+        monkeypatch.setattr(conf, "MAP_VIEWER_SOLR_GEOHASH_CELL_LEVELS", 3)
+
+        document = create_solr_document(local_features[2])
+
+        assert document["cell_1"] == "u"
+        assert document["cell_2"] == "u3"
+        assert document["cell_3"] == "u33"
+        assert "cell_4" not in document
+
+    def test_create_no_document_without_geometry(self, local_features):
+        assert create_solr_document(local_features[-1]) is None
+
+    def test_documents_are_posted_in_batches_and_committed(
+        self, local_features, geojson_path
+    ):
+        with StubSolrServer(lambda handler, parameters: {}) as server:
+            indexer = SolrIndexer(
+                server.url, batch_size=2, commit_size=4, worker_count=2
+            )
+            document_count = indexer.index_file(geojson_path)
+
+        updates = [parameters["json"] for _, parameters in server.requests]
+        posted_documents = [
+            document
+            for update in updates
+            if isinstance(update, list)
+            for document in update
+        ]
+
+        assert document_count == 4
+        assert {handler for handler, _ in server.requests} == {"update"}
+        assert sorted(document["id"] for document in posted_documents) == [
+            "a",
+            "b",
+            "c",
+            "d",
+        ]
+        assert [len(update) for update in updates if isinstance(update, list)] == [
+            2,
+            2,
+        ]
+        # The second commit group only holds the Feature without geometry
+        assert updates[-1] == {"commit": {}}
+        assert updates.count({"commit": {}}) == 1
+
+    def test_documents_are_marked_as_deleted(self, monkeypatch):
+        monkeypatch.setattr(
+            conf, "MAP_VIEWER_SOLR_LAST_MODIFIED_FIELD_NAME", "last_modified"
+        )
+        monkeypatch.setattr(conf, "MAP_VIEWER_SOLR_DELETED_FIELD_NAME", "deleted")
+
+        with StubSolrServer(lambda handler, parameters: {}) as server:
+            indexer = SolrIndexer(server.url, batch_size=2)
+            document_count = indexer.mark_as_deleted(["a", "b", "a", "c"])
+
+        updates = [parameters["json"] for _, parameters in server.requests]
+        assert document_count == 3
+        assert updates == [
+            [
+                {"id": "a", "deleted": {"set": True}, "last_modified": {"set": "NOW"}},
+                {"id": "b", "deleted": {"set": True}, "last_modified": {"set": "NOW"}},
+            ],
+            [{"id": "c", "deleted": {"set": True}, "last_modified": {"set": "NOW"}}],
+            {"commit": {}},
+        ]
+
+    def test_interrupted_indexing_resumes_after_last_commit(self, geojson_path):
+        checkpoint_path = f"{geojson_path}.checkpoint"
+        update_count = 0
+
+        def fail_on_third_update(handler, parameters):
+            nonlocal update_count
+            update_count += 1
+            if update_count == 3:
+                raise RuntimeError("Solr is down")
+            return {}
+
+        with StubSolrServer(fail_on_third_update) as server:
+            indexer = SolrIndexer(
+                server.url, batch_size=2, commit_size=2, worker_count=1
+            )
+            with pytest.raises(SolrError):
+                indexer.index_file(geojson_path, checkpoint_path=checkpoint_path)
+
+            with open(checkpoint_path) as checkpoint_file:
+                assert json.load(checkpoint_file)["position"] == 2
+
+            server.requests.clear()
+            document_count = indexer.index_file(
+                geojson_path, checkpoint_path=checkpoint_path
+            )
+
+        posted_ids = [
+            document["id"]
+            for _, parameters in server.requests
+            if isinstance(parameters["json"], list)
+            for document in parameters["json"]
+        ]
+        assert document_count == 2
+        assert posted_ids == ["b", "d"]
+        assert not os.path.exists(checkpoint_path)
+
+    def test_management_command(self, geojson_path):
+        output = io.StringIO()
+
+        with StubSolrServer(lambda handler, parameters: {}) as server:
+            call_command(
+                "index_geojson", geojson_path, solr_url=server.url, stdout=output
+            )
+
+        assert "indexed 4 documents" in output.getvalue()
+
+    def test_management_command_rejects_invalid_batch_size(self, geojson_path):
+        with pytest.raises(CommandError):
+            call_command(
+                "index_geojson", geojson_path, solr_url="http://localhost", batch_size=0
+            )
+
+    @pytest.fixture
+    def geojson_path(self, tmp_path, local_features):
+        path = tmp_path / "features.ndjson"
+        path.write_text("\n".join(json.dumps(feature) for feature in local_features))
+        return str(path)
+
+
+class SmallChunkFile(io.StringIO):
+    """A file returning at most `chunk_size` characters per read."""
+
+    def __init__(self, content: str, chunk_size: int):
+        super().__init__(content)
+        self.chunk_size = chunk_size
+
+    def read(self, size=-1):
+        return super().read(self.chunk_size)
@@ -0,0 +1,250 @@
+import asyncio
+import multiprocessing
+import os
+
+import pytest
+from pysolr import SolrError
+
+from honeybee import conf
+from honeybee.caching import LRUCache
+from honeybee.databases.coalescing import RequestCoalescer
+from honeybee.databases.solr import track_solr_request
+from honeybee.metrics import (
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    MmapMetricValues,
+    create_sample_key,
+    mark_process_dead,
+    metrics_registry,
+    read_metrics_file,
+)
+
+
+@pytest.fixture
+def enabled_metrics(monkeypatch):
+    monkeypatch.setattr(conf, "MAP_VIEWER_METRICS_ENABLED", True)
+    metrics_registry.reset()
+    yield metrics_registry
+    metrics_registry.reset()
+
+
+class TestMetrics:
+    def test_metrics_are_rendered_in_prometheus_text_format(self, monkeypatch):
+        monkeypatch.setattr(conf, "MAP_VIEWER_METRICS_ENABLED", True)
+        registry = MetricsRegistry()
+        counter = Counter(
+            "requests_total", "Requests.", label_names=["view"], registry=registry
+        )
+        histogram = Histogram(
+            "duration_seconds", "Durations.", buckets=[0.1, 1], registry=registry
+        )
+
+        counter.inc(view='say "hi"')
+        counter.inc(2, view='say "hi"')
+        histogram.observe(0.5)
+        histogram.observe(2)
+
+        assert registry.render().splitlines() == [
+            "# HELP requests_total Requests.",
+            "# TYPE requests_total counter",
+            'requests_total{view="say \\"hi\\""} 3.0',
+            "# HELP duration_seconds Durations.",
+            "# TYPE duration_seconds histogram",
+            'duration_seconds_bucket{le="1.0"} 1.0',
+            'duration_seconds_bucket{le="+Inf"} 2.0',
+            "duration_seconds_count 2.0",
+            "duration_seconds_sum 2.5",
+        ]
+
+    def test_nothing_is_recorded_when_disabled(self, monkeypatch):
+        monkeypatch.setattr(conf, "MAP_VIEWER_METRICS_ENABLED", False)
+        registry = MetricsRegistry()
+        counter = Counter("requests_total", "Requests.", registry=registry)
+
+        counter.inc()
+
+        assert registry.collect() == {}
+
+    def test_missing_labels_are_rejected(self, monkeypatch):
+        monkeypatch.setattr(conf, "MAP_VIEWER_METRICS_ENABLED", True)
+        counter = Counter(
+            "requests_total",
+            "Requests.",
+            label_names=["view"],
+            registry=MetricsRegistry(),
+        )
+
+        with pytest.raises(ValueError):
+            counter.inc()
+
+    def test_metrics_of_all_processes_are_summed_up(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(conf, "MAP_VIEWER_METRICS_ENABLED", True)
+        monkeypatch.setattr(conf, "MAP_VIEWER_METRICS_DIRECTORY", str(tmp_path))
+        registry = MetricsRegistry()
+        counter = Counter("requests_total", "Requests.", registry=registry)
+
+        context = multiprocessing.get_context("fork")
+        counted = context.Barrier(4)
+        collected = context.Event()
+
+        def increment_counter():
+            for _ in range(10):
+                counter.inc()
+            counted.wait()
+            collected.wait()
+
+        processes = [context.Process(target=increment_counter) for _ in range(3)]
+        for process in processes:
+            process.start()
+        counter.inc()
+        counted.wait()
+
+        try:
+            assert len(list(tmp_path.iterdir())) == 4
+            assert registry.collect() == {("requests_total", ()): 31.0}
+        finally:
+            collected.set()
+            for process in processes:
+                process.join()
+
+    def test_metrics_of_exited_processes_are_removed(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(conf, "MAP_VIEWER_METRICS_ENABLED", True)
+        monkeypatch.setattr(conf, "MAP_VIEWER_METRICS_DIRECTORY", str(tmp_path))
+        registry = MetricsRegistry()
+        counter = Counter("requests_total", "Requests.", registry=registry)
+
+        process = multiprocessing.get_context("fork").Process(target=counter.inc)
+        process.start()
+        process.join()
+        counter.inc()
+
+        assert registry.collect() == {("requests_total", ()): 1.0}
+        assert len(list(tmp_path.iterdir())) == 1
+
+    def test_metrics_files_of_a_previous_run_are_not_counted(
+        self, monkeypatch, tmp_path
+    ):
+        monkeypatch.setattr(conf, "MAP_VIEWER_METRICS_ENABLED", True)
+        monkeypatch.setattr(conf, "MAP_VIEWER_METRICS_DIRECTORY", str(tmp_path))
+        registry = MetricsRegistry()
+        counter = Counter("requests_total", "Requests.", registry=registry)
+        exited_process = multiprocessing.get_context("fork").Process(target=int)
+        exited_process.start()
+        exited_process.join()
+        # Files left behind by the workers of a previous run, one of them with the process ID of this process
+        for pid in (exited_process.pid, os.getpid()):
+            leftover_values = MmapMetricValues(str(tmp_path / f"honeybee_{pid}.db"))
+            leftover_values.add(create_sample_key("requests_total", {}), 5.0)
+            leftover_values.close()
+
+        counter.inc()
+
+        assert registry.collect() == {("requests_total", ()): 1.0}
+        assert [path.name for path in tmp_path.iterdir()] == [
+            f"honeybee_{os.getpid()}.db"
+        ]
+
+    def test_mark_process_dead_removes_the_metrics_file(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(conf, "MAP_VIEWER_METRICS_ENABLED", True)
+        monkeypatch.setattr(conf, "MAP_VIEWER_METRICS_DIRECTORY", str(tmp_path))
+        registry = MetricsRegistry()
+        counter = Counter("requests_total", "Requests.", registry=registry)
+        counter.inc()
+
+        mark_process_dead(os.getpid())
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_metrics_files_grow_with_the_number_of_samples(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(conf, "MAP_VIEWER_METRICS_ENABLED", True)
+        monkeypatch.setattr(conf, "MAP_VIEWER_METRICS_DIRECTORY", str(tmp_path))
+        registry = MetricsRegistry()
+        counter = Counter(
+            "requests_total", "Requests.", label_names=["id"], registry=registry
+        )
+
+        for index in range(5000):
+            counter.inc(id=f"feature-{index}")
+        counter.inc(id="feature-0")
+
+        [metrics_file] = tmp_path.iterdir()
+        values = read_metrics_file(str(metrics_file))
+        assert len(values) == 5000
+        assert registry.collect()[("requests_total", (("id", "feature-0"),))] == 2.0
+
+    def test_solr_errors_and_timeouts_are_counted(self, enabled_metrics):
+        with pytest.raises(SolrError):
+            with track_solr_request("select"):
+                raise SolrError("Connection to server 'solr' timed out: read timeout")
+        with pytest.raises(SolrError):
+            with track_solr_request("select"):
+                raise SolrError("Solr responded with an error (HTTP 500)")
+        with track_solr_request("select"):
+            pass
+
+        samples = enabled_metrics.collect()
+        assert (
+            get_sample(samples, "honeybee_solr_requests_total", handler="select") == 3
+        )
+        assert (
+            get_sample(
+                samples, "honeybee_solr_errors_total", handler="select", kind="timeout"
+            )
+            == 1
+        )
+        assert (
+            get_sample(
+                samples, "honeybee_solr_errors_total", handler="select", kind="error"
+            )
+            == 1
+        )
+
+    def test_cache_hits_and_misses_are_counted(self, enabled_metrics):
+        cache = LRUCache(max_size=1, name="test")
+        cache.set("a", 1)
+
+        cache.get("a")
+        cache.get("b")
+        cache.get("b")
+
+        samples = enabled_metrics.collect()
+        assert (
+            get_sample(
+                samples, "honeybee_cache_requests_total", cache="test", result="hit"
+            )
+            == 1
+        )
+        assert (
+            get_sample(
+                samples, "honeybee_cache_requests_total", cache="test", result="miss"
+            )
+            == 2
+        )
+
+    def test_coalesced_requests_are_counted(self, enabled_metrics):
+        request_coalescer = RequestCoalescer()
+
+        async def search():
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def search_concurrently():
+            return await asyncio.gather(
+                *(request_coalescer.call_async("key", search) for _ in range(3))
+            )
+
+        asyncio.run(search_concurrently())
+
+        samples = enabled_metrics.collect()
+        assert (
+            get_sample(samples, "honeybee_coalesced_requests_total", role="leader") == 1
+        )
+        assert (
+            get_sample(samples, "honeybee_coalesced_requests_total", role="follower")
+            == 2
+        )
+
+
+def get_sample(samples: dict, name: str, **labels) -> float:
+    return samples[(name, tuple(sorted(labels.items())))]
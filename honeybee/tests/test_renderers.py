@@ -0,0 +1,502 @@
+import json
+import struct
+
+import flatbuffers
+import geobuf
+import pytest
+from flatbuffers.table import Table
+
+from honeybee.commons import RawFeatureCollection
+from honeybee.flatgeobuf import (
+    FLATGEOBUF_MAGIC,
+    NODE_STRUCT,
+    calculate_level_bounds,
+    encode_flatgeobuf,
+)
+from honeybee.geobuf import encode_geobuf
+from honeybee.renderers import (
+    FlatGeobufRenderer,
+    GeobufRenderer,
+    create_response_header_name,
+    create_response_headers,
+)
+
+POINT_FEATURE = {
+    "type": "Feature",
+    "id": "https://www.biofid.de/document/1/a",
+    "geometry": {"type": "Point", "coordinates": [8.123456, 50.654321]},
+    "properties": {
+        "name": "Fagus sylvatica",
+        "count": 3,
+        "area": 1.5,
+        "isVerified": True,
+        "taxa": ["Fagus", "Quercus"],
+        "missing": None,
+    },
+}
+POLYGON_FEATURE = {
+    "type": "Feature",
+    "id": 42,
+    "geometry": {
+        "type": "Polygon",
+        "coordinates": [
+            [[0.0, 0.0], [4.0, 0.0], [4.0, 4.0], [0.0, 4.0], [0.0, 0.0]],
+            [[1.0, 1.0], [1.0, 2.0], [2.0, 2.0], [1.0, 1.0]],
+        ],
+    },
+    "properties": {"count": 2.5},
+}
+MULTI_POLYGON_FEATURE = {
+    "type": "Feature",
+    "id": "c",
+    "geometry": {
+        "type": "MultiPolygon",
+        "coordinates": [
+            [[[10.0, 10.0], [11.0, 10.0], [11.0, 11.0], [10.0, 10.0]]],
+            [[[20.0, 20.0], [21.0, 20.0], [21.0, 21.0], [20.0, 20.0]]],
+        ],
+    },
+    "properties": {},
+}
+COLLECTION_FEATURE = {
+    "type": "Feature",
+    "id": "d",
+    "geometry": {
+        "type": "GeometryCollection",
+        "geometries": [
+            {"type": "Point", "coordinates": [1.0, 2.0]},
+            {
+                "type": "MultiLineString",
+                "coordinates": [[[1.0, 2.0], [3.0, 4.0]], [[5.0, 6.0], [7.0, 8.0]]],
+            },
+        ],
+    },
+    "properties": {},
+}
+
+
+class TestGeobufEncoding:
+    def test_features_are_decodable(self):
+        features = [POINT_FEATURE, POLYGON_FEATURE, MULTI_POLYGON_FEATURE]
+
+        feature_collection = geobuf.decode(encode_geobuf(features))
+
+        decoded_features = feature_collection["features"]
+        assert [feature["id"] for feature in decoded_features] == [
+            "https://www.biofid.de/document/1/a",
+            42,
+            "c",
+        ]
+        assert [feature["geometry"] for feature in decoded_features] == [
+            feature["geometry"] for feature in features
+        ]
+        expected_properties = dict(POINT_FEATURE["properties"])
+        del expected_properties["missing"]
+        assert decoded_features[0]["properties"] == expected_properties
+        assert decoded_features[1]["properties"] == {"count": 2.5}
+
+    def test_geometry_collections_are_decodable(self):
+        feature_collection = geobuf.decode(encode_geobuf([COLLECTION_FEATURE]))
+
+        assert (
+            feature_collection["features"][0]["geometry"]
+            == COLLECTION_FEATURE["geometry"]
+        )
+
+    def test_coordinates_are_rounded_to_the_precision(self):
+        feature = {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [8.12345678, 50.1, 120.5]},
+            "properties": {},
+        }
+
+        feature_collection = geobuf.decode(encode_geobuf([feature], precision=3))
+
+        assert feature_collection["features"][0]["geometry"]["coordinates"] == [
+            8.123,
+            50.1,
+            120.5,
+        ]
+
+    def test_geobuf_is_smaller_than_geojson(self):
+        features = [
+            {
+                "type": "Feature",
+                "id": str(index),
+                "geometry": {
+                    "type": "LineString",
+                    "coordinates": [
+                        [8.0 + position / 1000, 50.0 + position / 1000]
+                        for position in range(100)
+                    ],
+                },
+                "properties": {"name": "Fagus sylvatica"},
+            }
+            for index in range(10)
+        ]
+
+        encoded_size = len(encode_geobuf(features))
+
+        assert encoded_size * 4 < len(json.dumps(features))
+
+
+class TestFlatGeobufEncoding:
+    def test_header_describes_the_features(self):
+        flatgeobuf = encode_flatgeobuf([POINT_FEATURE, POLYGON_FEATURE])
+
+        header = read_header(flatgeobuf)
+        assert flatgeobuf[:8] == FLATGEOBUF_MAGIC
+        assert header.read_vector(1, flatbuffers.number_types.Float64Flags) == [
+            0.0,
+            0.0,
+            8.123456,
+            50.654321,
+        ]
+        # Mixed geometry types
+        assert header.read_scalar(2, flatbuffers.number_types.Uint8Flags, 0) == 0
+        assert header.read_scalar(8, flatbuffers.number_types.Uint64Flags, 0) == 2
+        assert header.read_scalar(9, flatbuffers.number_types.Uint16Flags, 16) == 16
+        crs = header.read_table(10)
+        assert crs.read_string(0) == "EPSG"
+        assert crs.read_scalar(1, flatbuffers.number_types.Int32Flags, 0) == 4326
+        columns = [
+            (
+                column.read_string(0),
+                column.read_scalar(1, flatbuffers.number_types.Uint8Flags, 0),
+            )
+            for column in header.read_tables(7)
+        ]
+        assert columns == [
+            ("id", 12),  # JSON, since the IDs are strings and integers
+            ("name", 11),
+            ("count", 10),  # Double, since the values are integers and floats
+            ("area", 10),
+            ("isVerified", 2),
+            ("taxa", 12),
+        ]
+
+    def test_features_are_decodable(self):
+        features = [
+            POINT_FEATURE,
+            POLYGON_FEATURE,
+            MULTI_POLYGON_FEATURE,
+            COLLECTION_FEATURE,
+        ]
+
+        decoded_features = decode_flatgeobuf(
+            encode_flatgeobuf(features, index_node_size=0)
+        )
+
+        assert [feature["geometry"] for feature in decoded_features] == [
+            feature["geometry"] for feature in features
+        ]
+        assert decoded_features[0]["properties"] == {
+            "id": "https://www.biofid.de/document/1/a",
+            "name": "Fagus sylvatica",
+            "count": 3.0,
+            "area": 1.5,
+            "isVerified": True,
+            "taxa": ["Fagus", "Quercus"],
+        }
+        assert decoded_features[1]["properties"] == {"id": 42, "count": 2.5}
+
+    def test_features_without_geometry_are_left_out(self):
+        feature = {"type": "Feature", "id": "a", "geometry": None, "properties": {}}
+
+        flatgeobuf = encode_flatgeobuf([feature, POINT_FEATURE])
+
+        assert len(decode_flatgeobuf(flatgeobuf)) == 1
+        assert (
+            read_header(flatgeobuf).read_scalar(
+                8, flatbuffers.number_types.Uint64Flags, 0
+            )
+            == 1
+        )
+
+    def test_empty_file_has_no_index(self):
+        flatgeobuf = encode_flatgeobuf([])
+
+        header = read_header(flatgeobuf)
+        assert header.read_scalar(8, flatbuffers.number_types.Uint64Flags, 0) == 0
+        assert header.read_scalar(9, flatbuffers.number_types.Uint16Flags, 16) == 0
+        assert decode_flatgeobuf(flatgeobuf) == []
+
+    @pytest.mark.parametrize("node_size", [2, 16])
+    def test_spatial_index_finds_the_features_in_a_bounding_box(self, node_size):
+        features = [
+            {
+                "type": "Feature",
+                "id": f"{x},{y}",
+                "geometry": {"type": "Point", "coordinates": [x, y]},
+                "properties": {},
+            }
+            for x in range(10)
+            for y in range(10)
+        ]
+
+        flatgeobuf = encode_flatgeobuf(features, index_node_size=node_size)
+
+        found_features = search_flatgeobuf_index(flatgeobuf, (2.5, 3.5, 4.5, 5))
+        assert sorted(feature["properties"]["id"] for feature in found_features) == [
+            "3,4",
+            "3,5",
+            "4,4",
+            "4,5",
+        ]
+        # The index does not change the Features themselves
+        assert len(decode_flatgeobuf(flatgeobuf)) == 100
+
+
+class TestBinaryRenderers:
+    @pytest.mark.parametrize("renderer_class", [GeobufRenderer, FlatGeobufRenderer])
+    def test_raw_feature_collections_are_decoded(self, renderer_class):
+        renderer = renderer_class()
+        data = {
+            "spatialData": RawFeatureCollection([json.dumps(POINT_FEATURE)]),
+            "pagination": {"resumeToken": "abc", "totalHits": 1},
+        }
+
+        rendered_data = renderer.render(data)
+
+        assert rendered_data == renderer.encode([POINT_FEATURE])
+
+    def test_data_without_spatial_data_is_rendered_as_json(self):
+        response = {}
+
+        rendered_data = GeobufRenderer().render(
+            {"error-message": "Oops!"}, renderer_context={"response": response}
+        )
+
+        assert json.loads(rendered_data) == {"error-message": "Oops!"}
+        assert response["Content-Type"] == "application/json"
+
+    def test_response_headers_hold_the_other_data(self):
+        data = {
+            "spatialData": None,
+            "pagination": {"resumeToken": None, "totalHits": 12},
+            "deletedIds": ["a", "b"],
+        }
+
+        headers = create_response_headers(data)
+
+        assert headers == {"X-Total-Hits": "12", "X-Deleted-Ids": '["a", "b"]'}
+
+    @pytest.mark.parametrize(
+        ["name", "expected_header_name"],
+        [("resumeToken", "X-Resume-Token"), ("totalHits", "X-Total-Hits")],
+    )
+    def test_header_names_are_derived_from_camel_case(self, name, expected_header_name):
+        assert create_response_header_name(name) == expected_header_name
+
+
+class FlatBufferTable:
+    """Reads the fields of a FlatBuffers table by their slot in the schema."""
+
+    def __init__(self, buffer: bytearray, position: int):
+        self._table = Table(buffer, position)
+
+    def read_scalar(self, slot: int, flags, default):
+        offset = self._field_offset(slot)
+        return self._table.Get(flags, self._table.Pos + offset) if offset else default
+
+    def read_string(self, slot: int):
+        offset = self._field_offset(slot)
+        return (
+            self._table.String(self._table.Pos + offset).decode("utf-8")
+            if offset
+            else None
+        )
+
+    def read_vector(self, slot: int, flags) -> list:
+        offset = self._field_offset(slot)
+        if not offset:
+            return []
+
+        start = self._table.Vector(offset)
+        return [
+            self._table.Get(flags, start + index * flags.bytewidth)
+            for index in range(self._table.VectorLen(offset))
+        ]
+
+    def read_bytes(self, slot: int) -> bytes:
+        offset = self._field_offset(slot)
+        if not offset:
+            return b""
+
+        start = self._table.Vector(offset)
+        return bytes(self._table.Bytes[start : start + self._table.VectorLen(offset)])
+
+    def read_table(self, slot: int) -> "FlatBufferTable":
+        offset = self._field_offset(slot)
+        return FlatBufferTable(
+            self._table.Bytes, self._table.Indirect(self._table.Pos + offset)
+        )
+
+    def read_tables(self, slot: int) -> list:
+        offset = self._field_offset(slot)
+        if not offset:
+            return []
+
+        start = self._table.Vector(offset)
+        return [
+            FlatBufferTable(self._table.Bytes, self._table.Indirect(start + index * 4))
+            for index in range(self._table.VectorLen(offset))
+        ]
+
+    def _field_offset(self, slot: int) -> int:
+        return self._table.Offset(4 + 2 * slot)
+
+
+def read_size_prefixed_table(data: bytes, position: int) -> tuple:
+    """Returns the root table of the size-prefixed FlatBuffer at `position` and the position after it."""
+    size = struct.unpack_from("<I", data, position)[0]
+    buffer = bytearray(data[position + 4 : position + 4 + size])
+    root_position = struct.unpack_from("<I", buffer, 0)[0]
+
+    return FlatBufferTable(buffer, root_position), position + 4 + size
+
+
+def read_header(data: bytes) -> FlatBufferTable:
+    return read_size_prefixed_table(data, len(FLATGEOBUF_MAGIC))[0]
+
+
+def decode_flatgeobuf(data: bytes) -> list:
+    header, position = read_size_prefixed_table(data, len(FLATGEOBUF_MAGIC))
+    feature_count = header.read_scalar(8, flatbuffers.number_types.Uint64Flags, 0)
+    index_node_size = header.read_scalar(9, flatbuffers.number_types.Uint16Flags, 16)
+    columns = [
+        (
+            column.read_string(0),
+            column.read_scalar(1, flatbuffers.number_types.Uint8Flags, 0),
+        )
+        for column in header.read_tables(7)
+    ]
+
+    if feature_count and index_node_size:
+        position += (
+            calculate_level_bounds(feature_count, index_node_size)[0][1]
+            * NODE_STRUCT.size
+        )
+
+    features = []
+    while position < len(data):
+        feature, position = read_size_prefixed_table(data, position)
+        features.append(decode_feature(feature, columns))
+
+    return features
+
+
+def search_flatgeobuf_index(data: bytes, bounding_box: tuple) -> list:
+    """Traverses the packed R-tree from the root and decodes the Features of all leaves within the bounding box."""
+    header, position = read_size_prefixed_table(data, len(FLATGEOBUF_MAGIC))
+    feature_count = header.read_scalar(8, flatbuffers.number_types.Uint64Flags, 0)
+    node_size = header.read_scalar(9, flatbuffers.number_types.Uint16Flags, 16)
+    columns = [
+        (
+            column.read_string(0),
+            column.read_scalar(1, flatbuffers.number_types.Uint8Flags, 0),
+        )
+        for column in header.read_tables(7)
+    ]
+    level_bounds = calculate_level_bounds(feature_count, node_size)
+    features_position = position + level_bounds[0][1] * NODE_STRUCT.size
+
+    min_x, min_y, max_x, max_y = bounding_box
+    found_features = []
+    node_ranges = [(0, 1, len(level_bounds) - 1)]
+    while node_ranges:
+        start, end, level = node_ranges.pop()
+        for node_index in range(start, end):
+            node_min_x, node_min_y, node_max_x, node_max_y, offset = (
+                NODE_STRUCT.unpack_from(data, position + node_index * NODE_STRUCT.size)
+            )
+            if (
+                node_max_x < min_x
+                or node_max_y < min_y
+                or node_min_x > max_x
+                or node_min_y > max_y
+            ):
+                continue
+
+            if level == 0:
+                feature, _ = read_size_prefixed_table(data, features_position + offset)
+                found_features.append(decode_feature(feature, columns))
+            else:
+                child_end = min(offset + node_size, level_bounds[level - 1][1])
+                node_ranges.append((offset, child_end, level - 1))
+
+    return found_features
+
+
+def decode_feature(feature: FlatBufferTable, columns: list) -> dict:
+    properties = {}
+    encoded_properties = feature.read_bytes(1)
+    position = 0
+    while position < len(encoded_properties):
+        name, column_type = columns[
+            struct.unpack_from("<H", encoded_properties, position)[0]
+        ]
+        position += 2
+        if column_type == 2:
+            properties[name] = encoded_properties[position] == 1
+            position += 1
+        elif column_type == 7:
+            properties[name] = struct.unpack_from("<q", encoded_properties, position)[0]
+            position += 8
+        elif column_type == 10:
+            properties[name] = struct.unpack_from("<d", encoded_properties, position)[0]
+            position += 8
+        else:
+            length = struct.unpack_from("<I", encoded_properties, position)[0]
+            value = encoded_properties[position + 4 : position + 4 + length].decode(
+                "utf-8"
+            )
+            properties[name] = value if column_type == 11 else json.loads(value)
+            position += 4 + length
+
+    return {
+        "geometry": decode_geometry(feature.read_table(0)),
+        "properties": properties,
+    }
+
+
+GEOMETRY_TYPE_NAMES = [
+    None,
+    "Point",
+    "LineString",
+    "Polygon",
+    "MultiPoint",
+    "MultiLineString",
+    "MultiPolygon",
+    "GeometryCollection",
+]
+
+
+def decode_geometry(geometry: FlatBufferTable) -> dict:
+    geometry_type = GEOMETRY_TYPE_NAMES[
+        geometry.read_scalar(6, flatbuffers.number_types.Uint8Flags, 0)
+    ]
+    parts = [decode_geometry(part) for part in geometry.read_tables(7)]
+    if geometry_type == "GeometryCollection":
+        return {"type": geometry_type, "geometries": parts}
+    if geometry_type == "MultiPolygon":
+        return {
+            "type": geometry_type,
+            "coordinates": [part["coordinates"] for part in parts],
+        }
+
+    xy = geometry.read_vector(1, flatbuffers.number_types.Float64Flags)
+    positions = [[x, y] for x, y in zip(xy[::2], xy[1::2])]
+    ends = geometry.read_vector(0, flatbuffers.number_types.Uint32Flags) or [
+        len(positions)
+    ]
+    lines = [positions[start:end] for start, end in zip([0] + ends, ends)]
+
+    if geometry_type == "Point":
+        coordinates = positions[0]
+    elif geometry_type in ("LineString", "MultiPoint"):
+        coordinates = positions
+    else:
+        coordinates = lines
+
+    return {"type": geometry_type, "coordinates": coordinates}
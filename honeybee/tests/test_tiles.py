@@ -0,0 +1,139 @@
+import mapbox_vector_tile
+import pytest
+
+from honeybee.commons import Tile
+from honeybee.protobuf import encode_varint, encode_zigzag
+from honeybee.tiles import encode_vector_tile
+
+TILE = Tile(zoom=1, x=1, y=0)
+
+
+class TestVectorTileEncoding:
+    def test_points_are_projected_into_the_tile(self):
+        layer = encode_and_decode(
+            [
+                create_feature(
+                    {"type": "Point", "coordinates": [90, 66.51326044311186]}
+                ),
+                create_feature(
+                    {"type": "MultiPoint", "coordinates": [[0, 0], [180, 0]]}
+                ),
+            ]
+        )
+
+        geometries = [feature["geometry"] for feature in layer["features"]]
+        assert layer["extent"] == 4096
+        assert geometries == [
+            {"type": "Point", "coordinates": [2048, 2048]},
+            {"type": "MultiPoint", "coordinates": [[0, 4096], [4096, 4096]]},
+        ]
+
+    def test_polygon_rings_are_oriented(self):
+        exterior_ring = [[10, 10], [10, 40], [40, 40], [40, 10], [10, 10]]
+        hole = [[20, 20], [30, 20], [30, 30], [20, 30], [20, 20]]
+
+        layer = encode_and_decode(
+            [create_feature({"type": "Polygon", "coordinates": [exterior_ring, hole]})]
+        )
+
+        rings = layer["features"][0]["geometry"]["coordinates"]
+        assert layer["features"][0]["geometry"]["type"] == "Polygon"
+        assert len(rings) == 2
+        assert calculate_area(rings[0]) > 0
+        assert calculate_area(rings[1]) < 0
+
+    def test_collapsed_geometries_are_left_out(self):
+        layer = encode_and_decode(
+            [
+                create_feature(
+                    {"type": "LineString", "coordinates": [[10, 10], [10.00001, 10]]}
+                ),
+                create_feature(
+                    {"type": "LineString", "coordinates": [[10, 10], [20, 10]]}
+                ),
+            ]
+        )
+
+        assert len(layer["features"]) == 1
+        assert len(layer["features"][0]["geometry"]["coordinates"]) == 2
+
+    def test_properties_and_ids_are_encoded(self):
+        properties = {
+            "name": "Fagus",
+            "count": 3,
+            "offset": -2,
+            "radius": 8000.5,
+            "is_verified": True,
+            "taxa": ["a", "b"],
+            "missing": None,
+        }
+        features = [
+            create_feature({"type": "Point", "coordinates": [10, 10]}, properties),
+            create_feature({"type": "Point", "coordinates": [10, 10]}, feature_id=7),
+        ]
+
+        layer = encode_and_decode(features)
+
+        assert layer["features"][0]["properties"] == {
+            "id": "https://www.biofid.de/feature",
+            "name": "Fagus",
+            "count": 3,
+            "offset": -2,
+            "radius": 8000.5,
+            "is_verified": True,
+            "taxa": '["a", "b"]',
+        }
+        assert layer["features"][1]["id"] == 7
+        assert layer["features"][1]["properties"] == {}
+
+    def test_tile_without_features_is_empty(self):
+        features = [
+            create_feature(None),
+            create_feature({"type": "Point", "coordinates": []}),
+        ]
+
+        assert encode_vector_tile(features, TILE, layer_name="features") == b""
+
+
+class TestProtobufEncoding:
+    @pytest.mark.parametrize(
+        ["value", "expected_bytes"],
+        [(0, b"\x00"), (1, b"\x01"), (300, b"\xac\x02"), (-1, b"\xff" * 9 + b"\x01")],
+    )
+    def test_varint(self, value, expected_bytes):
+        assert encode_varint(value) == expected_bytes
+
+    @pytest.mark.parametrize(
+        ["value", "expected_value"], [(0, 0), (-1, 1), (1, 2), (-2, 3), (2**40, 2**41)]
+    )
+    def test_zigzag(self, value, expected_value):
+        assert encode_zigzag(value) == expected_value
+
+
+def encode_and_decode(features: list) -> dict:
+    vector_tile = encode_vector_tile(features, TILE, layer_name="features")
+    return mapbox_vector_tile.decode(
+        vector_tile, default_options={"y_coord_down": True}
+    )["features"]
+
+
+def create_feature(
+    geometry: dict,
+    properties: dict = None,
+    feature_id="https://www.biofid.de/feature",
+) -> dict:
+    return {
+        "type": "Feature",
+        "id": feature_id,
+        "geometry": geometry,
+        "properties": properties or {},
+    }
+
+
+def calculate_area(ring: list) -> float:
+    """Calculates the area of the ring with the surveyor's formula. Is positive for clockwise rings with the y-axis
+    pointing down."""
+    return sum(
+        x * next_y - next_x * y
+        for (x, y), (next_x, next_y) in zip(ring, ring[1:] + ring[:1])
+    )
@@ -0,0 +1,65 @@
+import pytest
+
+from honeybee import conf
+from honeybee.timing import (
+    StageTiming,
+    add_timing_hook,
+    collect_timings,
+    create_server_timing_header,
+    measure,
+    record_timing,
+    remove_timing_hook,
+)
+
+
+class TestTiming:
+    def test_stages_are_collected(self, monkeypatch):
+        monkeypatch.setattr(conf, "MAP_VIEWER_SERVER_TIMING_ENABLED", True)
+
+        with collect_timings() as timings:
+            with measure("parse"):
+                pass
+            record_timing("solr-qtime", 12)
+            record_timing("unknown", None)
+
+        assert [timing.name for timing in timings] == ["parse", "solr-qtime"]
+        assert timings[0].start is not None
+        assert timings[1].duration == 12.0
+
+    def test_nothing_is_measured_when_disabled(self, monkeypatch):
+        monkeypatch.setattr(conf, "MAP_VIEWER_SERVER_TIMING_ENABLED", False)
+
+        with collect_timings() as timings:
+            with measure("parse"):
+                pass
+
+        assert timings is None
+
+    def test_failing_hooks_do_not_fail_the_measurement(self, monkeypatch):
+        monkeypatch.setattr(conf, "MAP_VIEWER_SERVER_TIMING_ENABLED", False)
+
+        def failing_hook(timing: StageTiming) -> None:
+            raise RuntimeError()
+
+        add_timing_hook(failing_hook)
+        try:
+            with collect_timings() as timings:
+                with measure("parse"):
+                    pass
+        finally:
+            remove_timing_hook(failing_hook)
+
+        assert len(timings) == 1
+
+    @pytest.mark.parametrize(
+        ["timings", "expected_header"],
+        [
+            (
+                [StageTiming("solr", 12.34567), StageTiming("render", 1.0)],
+                'solr;dur=12.346;desc="Solr request", render;dur=1.000;desc="Serialization"',
+            ),
+            ([StageTiming("custom", 0.5)], "custom;dur=0.500"),
+        ],
+    )
+    def test_server_timing_header(self, timings, expected_header):
+        assert create_server_timing_header(timings) == expected_header
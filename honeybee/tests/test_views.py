@@ -1,16 +1,24 @@
+import asyncio
 import json
-from unittest.mock import Mock
+from unittest.mock import Mock, call
 
+import geobuf
+import mapbox_vector_tile
+import pysolr
 import pytest
+from django.test import AsyncClient
 
 from commons import create_url_from_parameters
 from honeybee import conf
+from honeybee.tests.solr_stub import StubSolrServer
 
 spatial_fq_parameter_value = "{!bbox sfield=location}"
 default_point_coordinates = "51.16336,10.44768"
 default_distance_in_km = 50
 default_number_of_hits_per_page = 100
 default_cursor = "*"
+default_sort = "id asc"
+default_return_fields = "id,geojson"
 
 
 class TestJsonViewResponse:
@@ -26,6 +34,8 @@ class TestJsonViewResponse:
                     "d": default_distance_in_km,
                     "rows": default_number_of_hits_per_page,
                     "cursorMark": default_cursor,
+                    "sort": default_sort,
+                    "fl": default_return_fields,
                 },
             ),
             (  # Scenario - Only starting year given
@@ -39,6 +49,8 @@ class TestJsonViewResponse:
                     "d": default_distance_in_km,
                     "rows": default_number_of_hits_per_page,
                     "cursorMark": default_cursor,
+                    "sort": default_sort,
+                    "fl": default_return_fields,
                 },
             ),
             (  # Scenario - Multiple terms given
@@ -57,6 +69,8 @@ class TestJsonViewResponse:
                     "d": default_distance_in_km,
                     "rows": default_number_of_hits_per_page,
                     "cursorMark": default_cursor,
+                    "sort": default_sort,
+                    "fl": default_return_fields,
                 },
             ),
             (  # Scenario - Point data given
@@ -74,6 +88,8 @@ class TestJsonViewResponse:
                     "d": 10,
                     "rows": default_number_of_hits_per_page,
                     "cursorMark": default_cursor,
+                    "sort": default_sort,
+                    "fl": default_return_fields,
                 },
             ),
             (  # Scenario - Resume Token given
@@ -89,6 +105,70 @@ class TestJsonViewResponse:
                     "d": default_distance_in_km,
                     "cursorMark": "1234abcd",
                     "rows": default_number_of_hits_per_page,
+                    "sort": default_sort,
+                    "fl": default_return_fields,
+                },
+            ),
+            (  # Scenario - Bounding box given
+                {
+                    "format": "json",
+                    "minLat": 50.0,
+                    "minLon": 8.5,
+                    "maxLat": 50.2,
+                    "maxLon": 8.8,
+                },
+                {
+                    "q": "*:*",
+                    "fq": ("location:[50.0,8.5 TO 50.2,8.8]",),
+                    "rows": default_number_of_hits_per_page,
+                    "cursorMark": default_cursor,
+                    "sort": default_sort,
+                    "fl": default_return_fields,
+                },
+            ),
+            (  # Scenario - Bounding box crossing the antimeridian
+                {
+                    "format": "json",
+                    "minLat": -20.0,
+                    "minLon": 175.0,
+                    "maxLat": -15.0,
+                    "maxLon": -175.0,
+                },
+                {
+                    "q": "*:*",
+                    "fq": (
+                        "location:[-20.0,175.0 TO -15.0,180.0] OR "
+                        "location:[-20.0,-180.0 TO -15.0,-175.0]",
+                    ),
+                    "rows": default_number_of_hits_per_page,
+                    "cursorMark": default_cursor,
+                    "sort": default_sort,
+                    "fl": default_return_fields,
+                },
+            ),
+            (  # Scenario - Number of hits per page given
+                {"format": "json", "hitsPerPage": 20},
+                {
+                    "q": "*:*",
+                    "fq": (spatial_fq_parameter_value,),
+                    "pt": default_point_coordinates,
+                    "d": default_distance_in_km,
+                    "rows": 20,
+                    "cursorMark": default_cursor,
+                    "sort": default_sort,
+                    "fl": default_return_fields,
+                },
+            ),
+            (  # Scenario - Random sample given -> A single page without cursor
+                {"format": "json", "sample": 50, "seed": 7, "resumeToken": "1234abcd"},
+                {
+                    "q": "*:*",
+                    "fq": (spatial_fq_parameter_value,),
+                    "pt": default_point_coordinates,
+                    "d": default_distance_in_km,
+                    "rows": 50,
+                    "sort": "random_7 asc,id asc",
+                    "fl": default_return_fields,
                 },
             ),
         ],
@@ -104,6 +184,287 @@ class TestJsonViewResponse:
         assert response.status_code == 200
         mock_solr_search.assert_called_with(**expected_search_parameters)
 
+    @pytest.mark.parametrize("is_passthrough_enabled", [True, False])
+    def test_spatial_data_is_returned_as_feature_collection(
+        self,
+        client,
+        monkeypatch,
+        is_passthrough_enabled,
+        mock_solr_search,
+        solr_response_geojson_data,
+    ):
+        monkeypatch.setattr(
+            conf, "MAP_VIEWER_GEOJSON_PASSTHROUGH", is_passthrough_enabled
+        )
+        expected_feature = json.loads(
+            solr_response_geojson_data["response"]["docs"][0]["geojson"]
+        )
+
+        response = client.get("/map/search?format=json")
+
+        assert response.status_code == 200
+        assert json.loads(response.content)["spatialData"] == {
+            "type": "FeatureCollection",
+            "features": [expected_feature],
+        }
+
+    @pytest.mark.parametrize("is_passthrough_enabled", [True, False])
+    def test_features_are_projected(
+        self, client, monkeypatch, is_passthrough_enabled, mock_solr_search
+    ):
+        monkeypatch.setattr(
+            conf, "MAP_VIEWER_GEOJSON_PASSTHROUGH", is_passthrough_enabled
+        )
+
+        response = client.get(
+            "/map/search?format=json&fields=date,source-url&fields=taxa&precision=2"
+        )
+
+        assert response.status_code == 200
+        feature = json.loads(response.content)["spatialData"]["features"][0]
+        assert feature["id"] == "https://www.biofid.de/document/12345/d073lo8ewf"
+        assert sorted(feature["properties"]) == ["date", "source-url", "taxa"]
+        assert feature["geometry"]["coordinates"] == [50.12, 8.68]
+        assert mock_solr_search.call_args.kwargs["fl"] == default_return_fields
+
+    def test_empty_fields_parameter_removes_all_properties(
+        self, client, mock_solr_search
+    ):
+        response = client.get("/map/search?format=json&fields=")
+
+        assert response.status_code == 200
+        feature = json.loads(response.content)["spatialData"]["features"][0]
+        assert feature["properties"] == {}
+        assert feature["geometry"]["coordinates"] == [50.11552, 8.68417]
+
+    @pytest.mark.parametrize("url_suffix", ["", "&format=geobuf", "&lon=12.3"])
+    def test_stage_timings_are_sent_as_server_timing_header(
+        self, client, monkeypatch, url_suffix, mock_solr_search
+    ):
+        monkeypatch.setattr(conf, "MAP_VIEWER_SERVER_TIMING_ENABLED", True)
+
+        response = client.get(f"/map/search?term=a{url_suffix}")
+
+        stage_names = [
+            metric.split(";")[0] for metric in response["Server-Timing"].split(", ")
+        ]
+        if response.status_code == 200:
+            assert stage_names == [
+                "parse",
+                "query",
+                "solr",
+                "solr-qtime",
+                "convert",
+                "render",
+            ]
+        else:
+            assert stage_names == ["parse", "render"]
+
+    def test_stage_timings_are_passed_to_hooks(self, client, mock_solr_search):
+        from honeybee.timing import add_timing_hook, remove_timing_hook
+
+        stage_timings = []
+        add_timing_hook(stage_timings.append)
+        try:
+            response = client.get("/map/search?term=a")
+        finally:
+            remove_timing_hook(stage_timings.append)
+
+        assert response.status_code == 200
+        assert "Server-Timing" not in response
+        assert len(stage_timings) == 6
+        assert all(timing.duration >= 0 for timing in stage_timings)
+
+    def test_spread_search_groups_by_geohash_cell(
+        self, client, monkeypatch, mock_solr_search
+    ):
+        monkeypatch.setattr(
+            conf, "MAP_VIEWER_SOLR_GEOHASH_CELL_FIELD_PREFIX", "geohash_"
+        )
+
+        response = client.get(
+            "/map/search?minLat=47&minLon=5&maxLat=55&maxLon=15&spread=2&resumeToken=AoE"
+        )
+
+        assert response.status_code == 200
+        solr_parameters = mock_solr_search.call_args.kwargs
+        assert "cursorMark" not in solr_parameters
+        assert solr_parameters["group"] == "true"
+        assert solr_parameters["group.field"] == "geohash_4"
+        assert solr_parameters["group.limit"] == 2
+        assert solr_parameters["group.main"] == "true"
+        assert solr_parameters["group.sort"] == default_sort
+
+    def test_spread_search_requires_geohash_cells(self, client, mock_solr_search):
+        response = client.get("/map/search?spread=1")
+
+        assert response.status_code == 400
+        assert json.loads(response.content) == {
+            conf.ERROR_MESSAGE_CONTENT_PARAMETER_NAME: conf.ERROR_MESSAGE_SPREAD_NOT_SUPPORTED
+        }
+
+    def test_search_traffic_is_exposed_as_metrics(
+        self, client, monkeypatch, mock_solr_search
+    ):
+        from honeybee.metrics import METRICS_CONTENT_TYPE, metrics_registry
+
+        monkeypatch.setattr(conf, "MAP_VIEWER_METRICS_ENABLED", True)
+        metrics_registry.reset()
+        try:
+            client.get("/map/search?term=a")
+            client.get("/map/search?lon=12.3")
+            response = client.get("/map/metrics")
+        finally:
+            metrics_registry.reset()
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == METRICS_CONTENT_TYPE
+        samples = response.content.decode("utf-8").splitlines()
+        assert (
+            'honeybee_search_requests_total{status="200",view="search"} 1.0' in samples
+        )
+        assert (
+            'honeybee_search_requests_total{status="400",view="search"} 1.0' in samples
+        )
+        assert 'honeybee_search_duration_seconds_count{view="search"} 2.0' in samples
+        assert 'honeybee_search_result_features_count{view="search"} 1.0' in samples
+        assert 'honeybee_solr_requests_total{handler="select"} 1.0' in samples
+
+    def test_metrics_are_not_found_when_disabled(self, client, monkeypatch):
+        monkeypatch.setattr(conf, "MAP_VIEWER_METRICS_ENABLED", False)
+
+        response = client.get("/map/metrics")
+
+        assert response.status_code == 404
+
+    def test_return_aggregated_map_json_data(self, client, mock_solr_search):
+        response = client.get("/map/search?aggregate=true&zoom=5")
+
+        assert response.status_code == 200
+        solr_parameters = mock_solr_search.call_args.kwargs
+        assert solr_parameters["rows"] == 0
+        assert solr_parameters["facet.heatmap"] == "location"
+
+    @pytest.mark.parametrize(
+        ["next_cursor_mark", "expected_resume_token"],
+        [("AoE/abc", "AoE/abc"), ("*", None)],
+    )
+    def test_response_holds_pagination_data(
+        self,
+        client,
+        monkeypatch,
+        solr_response_geojson_data,
+        next_cursor_mark,
+        expected_resume_token,
+    ):
+        solr_response_geojson_data["response"]["numFound"] = 1234
+        solr_response_geojson_data["nextCursorMark"] = next_cursor_mark
+        mock = Mock(return_value=pysolr.Results(solr_response_geojson_data))
+        monkeypatch.setattr(pysolr.Solr, name="search", value=mock)
+
+        response = client.get("/map/search?format=json")
+
+        assert json.loads(response.content)["pagination"] == {
+            "resumeToken": expected_resume_token,
+            "totalHits": 1234,
+        }
+
+    @pytest.mark.parametrize(
+        ["url", "headers", "expected_content_type"],
+        [
+            ("/map/search?format=geobuf", {}, "application/x-geobuf"),
+            (
+                "/map/search",
+                {"HTTP_ACCEPT": "application/x-geobuf"},
+                "application/x-geobuf",
+            ),
+            ("/map/search?format=fgb", {}, "application/flatgeobuf"),
+            (
+                "/map/search",
+                {"HTTP_ACCEPT": "application/flatgeobuf"},
+                "application/flatgeobuf",
+            ),
+        ],
+    )
+    def test_binary_formats_are_negotiated(
+        self,
+        client,
+        monkeypatch,
+        solr_response_geojson_data,
+        url,
+        headers,
+        expected_content_type,
+    ):
+        solr_response_geojson_data["nextCursorMark"] = "AoE/abc"
+        mock = Mock(return_value=pysolr.Results(solr_response_geojson_data))
+        monkeypatch.setattr(pysolr.Solr, name="search", value=mock)
+
+        response = client.get(url, **headers)
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == expected_content_type
+        assert response["X-Resume-Token"] == "AoE/abc"
+        assert response["X-Total-Hits"] == "1"
+
+    def test_geobuf_response_holds_the_features(
+        self, client, mock_solr_search, solr_response_with_geojson_field_only
+    ):
+        expected_feature = json.loads(
+            solr_response_with_geojson_field_only.docs[0]["geojson"]
+        )
+
+        response = client.get("/map/search?format=geobuf")
+
+        features = geobuf.decode(response.content)["features"]
+        assert [feature["id"] for feature in features] == [expected_feature["id"]]
+
+    def test_errors_are_returned_as_json_for_binary_formats(self, client):
+        response = client.get("/map/search?format=geobuf&lon=12.3")
+
+        assert response.status_code == 400
+        assert response["Content-Type"] == "application/json"
+        assert_response_content_error_message(
+            response.content, conf.ERROR_MESSAGE_ONLY_SET_EITHER_LON_OR_LAT
+        )
+
+    def test_search_for_changes_returns_tombstones(
+        self, client, monkeypatch, solr_response_geojson_data
+    ):
+        monkeypatch.setattr(
+            conf, "MAP_VIEWER_SOLR_LAST_MODIFIED_FIELD_NAME", "last_modified"
+        )
+        monkeypatch.setattr(conf, "MAP_VIEWER_SOLR_DELETED_FIELD_NAME", "deleted")
+        solr_response_geojson_data["response"]["docs"].append(
+            {"id": "removed", "geojson": '{"type": "Feature"}', "deleted": True}
+        )
+        mock = Mock(return_value=pysolr.Results(solr_response_geojson_data))
+        monkeypatch.setattr(pysolr.Solr, name="search", value=mock)
+
+        response = client.get("/map/search?since=2024-01-31T13:00:00%2B01:00")
+
+        content = json.loads(response.content)
+        assert response.status_code == 200
+        assert len(content["spatialData"]["features"]) == 1
+        assert content["deletedIds"] == ["removed"]
+        assert mock.call_args.kwargs["fq"] == (
+            spatial_fq_parameter_value,
+            "last_modified:[2024-01-31T12:00:00.000Z TO *]",
+        )
+
+    def test_deleted_features_are_excluded_from_searches(
+        self, client, monkeypatch, mock_solr_search
+    ):
+        monkeypatch.setattr(conf, "MAP_VIEWER_SOLR_DELETED_FIELD_NAME", "deleted")
+
+        response = client.get("/map/search")
+
+        assert response.status_code == 200
+        assert "deletedIds" not in json.loads(response.content)
+        assert mock_solr_search.call_args.kwargs["fq"] == (
+            spatial_fq_parameter_value,
+            "-deleted:true",
+        )
+
     @pytest.mark.parametrize(
         ["url_parameters", "expected_error_message"],
         [
@@ -119,6 +480,84 @@ class TestJsonViewResponse:
                 },
                 f'The parameter "radius" is expected to be of type float!',
             ),
+            (  # Scenario - Number of hits per page is not positive
+                {
+                    "hitsPerPage": 0,
+                },
+                'The parameter "hitsPerPage" has to be greater than zero!',
+            ),
+            (  # Scenario - Number of hits per page exceeds the maximum page size
+                {
+                    "hitsPerPage": 1000000,
+                },
+                'The parameter "hitsPerPage" must not be greater than 1000!',
+            ),
+            (  # Scenario - Sample size exceeds the maximum page size
+                {
+                    "sample": 1001,
+                },
+                'The parameter "sample" must not be greater than 1000!',
+            ),
+            (  # Scenario - Sample size is not positive
+                {
+                    "sample": 0,
+                },
+                'The parameter "sample" has to be greater than zero!',
+            ),
+            (  # Scenario - Sample seed is negative
+                {
+                    "sample": 10,
+                    "seed": -1,
+                },
+                'The parameter "seed" must not be negative!',
+            ),
+            (  # Scenario - Bounding box is incomplete
+                {
+                    "minLat": 50.0,
+                    "maxLat": 50.2,
+                },
+                conf.ERROR_MESSAGE_INCOMPLETE_BOUNDING_BOX,
+            ),
+            (  # Scenario - Bounding box minimum is greater than its maximum
+                {
+                    "minLat": 50.2,
+                    "minLon": 8.5,
+                    "maxLat": 50.0,
+                    "maxLon": 8.8,
+                },
+                conf.ERROR_MESSAGE_INVALID_BOUNDING_BOX,
+            ),
+            (  # Scenario - Zoom level is out of range
+                {
+                    "aggregate": "true",
+                    "zoom": 30,
+                },
+                'The parameter "zoom" has to be between 0 and 24!',
+            ),
+            (  # Scenario - Coordinate precision is out of range
+                {
+                    "precision": 7,
+                },
+                'The parameter "precision" has to be between 0 and 6!',
+            ),
+            (  # Scenario - Aggregation flag is not a boolean
+                {
+                    "aggregate": "maybe",
+                },
+                'The parameter "aggregate" is expected to be of type boolean!',
+            ),
+            (  # Scenario - Timestamp of changes is not a timestamp
+                {
+                    "since": "yesterday",
+                },
+                'The parameter "since" has to be an ISO 8601 timestamp, e.g. 2024-01-31T12:00:00Z!',
+            ),
+            (  # Scenario - Changes are requested, but no last-modified field is configured
+                {
+                    "since": "2024-01-31",
+                },
+                conf.ERROR_MESSAGE_CHANGE_SEARCH_NOT_SUPPORTED,
+            ),
         ],
     )
     def test_return_readable_error_message_to_user(
@@ -133,6 +572,298 @@ class TestJsonViewResponse:
         assert_response_content_error_message(response.content, expected_error_message)
 
 
+class TestExportView:
+    @pytest.mark.parametrize("url_suffix", ["", ".ndjson", "?format=ndjson"])
+    def test_export_all_pages_as_ndjson(
+        self, client, url_suffix, mock_paged_solr_search, paged_features
+    ):
+        response = client.get(f"/map/export{url_suffix}")
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/x-ndjson"
+        lines = b"".join(response.streaming_content).decode("utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == paged_features
+
+    def test_export_all_pages_as_feature_collection(
+        self, client, mock_paged_solr_search, paged_features
+    ):
+        response = client.get("/map/export?format=geojson")
+
+        assert response.status_code == 200
+        content = json.loads(b"".join(response.streaming_content))
+        assert content == {"type": "FeatureCollection", "features": paged_features}
+
+    def test_cursor_is_followed_until_it_does_not_change(
+        self, client, mock_paged_solr_search
+    ):
+        response = client.get("/map/export")
+        b"".join(response.streaming_content)
+
+        used_cursors = [
+            call.kwargs["cursorMark"] for call in mock_paged_solr_search.call_args_list
+        ]
+        assert used_cursors == ["*", "page-2", "page-3"]
+        assert all(
+            call.kwargs["sort"] == "id asc"
+            for call in mock_paged_solr_search.call_args_list
+        )
+
+    def test_number_of_exported_features_is_limited(
+        self, client, monkeypatch, mock_paged_solr_search, paged_features
+    ):
+        monkeypatch.setattr(conf, "MAP_VIEWER_MAXIMUM_FEATURES_PER_REQUEST", 2)
+
+        response = client.get("/map/export")
+        lines = b"".join(response.streaming_content).decode("utf-8").splitlines()
+
+        assert [json.loads(line) for line in lines] == paged_features[:2]
+        assert mock_paged_solr_search.call_count == 1
+
+    def test_unsupported_format_is_rejected(self, client, mock_paged_solr_search):
+        response = client.get("/map/export?format=xml")
+
+        assert response.status_code == 400
+        mock_paged_solr_search.assert_not_called()
+
+    def test_unsupported_search_is_rejected_before_streaming(
+        self, client, mock_paged_solr_search
+    ):
+        response = client.get("/map/export?since=2024-01-31T13:00:00%2B01:00")
+
+        assert response.status_code == 400
+        assert not response.streaming
+        assert json.loads(response.content) == {
+            conf.ERROR_MESSAGE_CONTENT_PARAMETER_NAME: conf.ERROR_MESSAGE_CHANGE_SEARCH_NOT_SUPPORTED
+        }
+
+    def test_spread_export_requires_geohash_cells(self, client, mock_paged_solr_search):
+        response = client.get("/map/export?spread=3")
+
+        assert response.status_code == 400
+        assert not response.streaming
+        assert json.loads(response.content) == {
+            conf.ERROR_MESSAGE_CONTENT_PARAMETER_NAME: conf.ERROR_MESSAGE_SPREAD_NOT_SUPPORTED
+        }
+        mock_paged_solr_search.assert_not_called()
+
+    @pytest.fixture
+    def paged_features(self):
+        return [
+            {
+                "type": "Feature",
+                "id": f"feature-{index}",
+                "geometry": {"type": "Point", "coordinates": [50.1, 8.6]},
+                "properties": {},
+            }
+            for index in range(3)
+        ]
+
+    @pytest.fixture
+    def mock_paged_solr_search(self, monkeypatch, paged_features):
+        def create_results(features, next_cursor):
+            docs = [{"geojson": json.dumps(feature)} for feature in features]
+            return pysolr.Results(
+                {"response": {"docs": docs}, "nextCursorMark": next_cursor}
+            )
+
+        mock = Mock()
+        mock.side_effect = [
+            create_results(paged_features[:2], "page-2"),
+            create_results(paged_features[2:], "page-3"),
+            create_results([], "page-3"),
+        ]
+        monkeypatch.setattr(pysolr.Solr, name="search", value=mock)
+
+        return mock
+
+
+class TestFeatureViews:
+    def test_return_single_feature(self, client, mock_solr_real_time_get):
+        feature_id = "https://www.biofid.de/document/12345/d073lo8ewf"
+
+        response = client.get(f"/map/feature/{feature_id}")
+
+        assert response.status_code == 200
+        assert json.loads(response.content)["spatialData"]["id"] == feature_id
+        mock_solr_real_time_get.assert_called_once_with([feature_id])
+
+    def test_return_feature_with_numeric_id(self, client, mock_solr_real_time_get):
+        feature = {
+            "type": "Feature",
+            "id": 123,
+            "geometry": {"type": "Point", "coordinates": [8.6, 50.1]},
+            "properties": {},
+        }
+        mock_solr_real_time_get.return_value = [{"geojson": json.dumps(feature)}]
+
+        response = client.get("/map/feature/123")
+
+        assert response.status_code == 200
+        assert json.loads(response.content)["spatialData"] == feature
+
+    def test_return_not_found_for_unknown_feature(
+        self, client, mock_solr_real_time_get
+    ):
+        mock_solr_real_time_get.return_value = []
+
+        response = client.get("/map/feature/unknown")
+
+        assert response.status_code == 404
+        assert_response_content_error_message(
+            response.content, 'There is no feature with the ID "unknown"!'
+        )
+
+    def test_return_multiple_features_from_cache(self, client, mock_solr_real_time_get):
+        feature_id = "https://www.biofid.de/document/12345/d073lo8ewf"
+        url = create_url_from_parameters(
+            "/map/features", {"id": [feature_id, "unknown"]}
+        )
+
+        first_response = client.get(url)
+        second_response = client.get(url)
+
+        assert first_response.status_code == 200
+        assert first_response.content == second_response.content
+        features = json.loads(second_response.content)["spatialData"]["features"]
+        assert [feature["id"] for feature in features] == [feature_id]
+        assert mock_solr_real_time_get.call_args_list == [
+            call([feature_id, "unknown"]),
+            call(["unknown"]),
+        ]
+
+    def test_return_error_without_ids(self, client, mock_solr_real_time_get):
+        response = client.get("/map/features")
+
+        assert response.status_code == 400
+        mock_solr_real_time_get.assert_not_called()
+
+    @pytest.fixture
+    def mock_solr_real_time_get(
+        self, monkeypatch, solr_response_with_geojson_field_only
+    ):
+        from honeybee.caching import feature_cache
+        from honeybee.databases.solr import SolrSpatialDatabase
+
+        feature_cache.clear()
+        mock = Mock(return_value=solr_response_with_geojson_field_only.docs)
+        monkeypatch.setattr(SolrSpatialDatabase, name="call_db_for_ids", value=mock)
+
+        yield mock
+
+        feature_cache.clear()
+
+
+class TestTileView:
+    def test_return_vector_tile(self, client, mock_solr_search):
+        response = client.get("/map/tiles/1/1/0.pbf?yearStart=1800")
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/vnd.mapbox-vector-tile"
+        assert "max-age=300" in response["Cache-Control"]
+        layer = mapbox_vector_tile.decode(response.content)["features"]
+        assert layer["features"][0]["properties"]["id"] == (
+            "https://www.biofid.de/document/12345/d073lo8ewf"
+        )
+        solr_parameters = mock_solr_search.call_args.kwargs
+        assert solr_parameters["fq"][0] == "date:[1800-01-01 TO NOW]"
+        # The tile is extended by 64 of 4096 units on every side
+        assert solr_parameters["fq"][1] == (
+            "location:[-2.811371,-2.8125 TO 85.287916,180.0]"
+        )
+        assert solr_parameters["rows"] == 1000
+
+    def test_tiles_are_cached(self, client, mock_solr_search):
+        first_response = client.get("/map/tiles/1/1/0.pbf?term=a")
+        second_response = client.get("/map/tiles/1/1/0.pbf?term=a")
+        client.get("/map/tiles/1/1/0.pbf?term=b")
+
+        assert first_response.content == second_response.content
+        assert mock_solr_search.call_count == 2
+
+    @pytest.mark.parametrize("url", ["/map/tiles/1/2/0.pbf", "/map/tiles/25/0/0.pbf"])
+    def test_tile_out_of_range_is_rejected(self, client, url, mock_solr_search):
+        response = client.get(url)
+
+        assert response.status_code == 400
+        mock_solr_search.assert_not_called()
+
+    @pytest.fixture(autouse=True)
+    def clear_tile_cache(self):
+        from honeybee.caching import tile_cache
+
+        tile_cache.clear()
+        yield
+        tile_cache.clear()
+
+
+class TestAsyncSearchView:
+    def test_return_map_json_data(
+        self, async_client, monkeypatch, solr_response_geojson_data
+    ):
+        with StubSolrServer(
+            lambda handler, parameters: solr_response_geojson_data
+        ) as server:
+            monkeypatch.setattr(
+                conf, "MAP_VIEWER_SOLR_SPATIAL_DATABASE_HOSTNAME", server.url
+            )
+            response = asyncio.run(async_client.get("/map/async/search?yearStart=1923"))
+
+        assert response.status_code == 200
+        content = json.loads(response.content)
+        assert len(content["spatialData"]["features"]) == 1
+        assert content["pagination"]["totalHits"] == 1
+        _, parameters = server.requests[0]
+        assert parameters["fq"] == [
+            "date:[1923-01-01 TO NOW]",
+            spatial_fq_parameter_value,
+        ]
+
+    def test_stage_timings_are_sent_as_server_timing_header(
+        self, async_client, monkeypatch, solr_response_geojson_data
+    ):
+        monkeypatch.setattr(conf, "MAP_VIEWER_SERVER_TIMING_ENABLED", True)
+
+        with StubSolrServer(
+            lambda handler, parameters: solr_response_geojson_data
+        ) as server:
+            monkeypatch.setattr(
+                conf, "MAP_VIEWER_SOLR_SPATIAL_DATABASE_HOSTNAME", server.url
+            )
+            response = asyncio.run(async_client.get("/map/async/search"))
+
+        assert response.status_code == 200
+        assert response["Server-Timing"].startswith("parse;dur=")
+        assert "solr;dur=" in response["Server-Timing"]
+        assert "render;dur=" in response["Server-Timing"]
+
+    def test_return_readable_error_message_to_user(self, async_client):
+        response = asyncio.run(async_client.get("/map/async/search?lon=12.3"))
+
+        assert response.status_code == 400
+        assert_response_content_error_message(
+            response.content, conf.ERROR_MESSAGE_ONLY_SET_EITHER_LON_OR_LAT
+        )
+
+    @pytest.mark.parametrize(
+        "url", ["/map/async/search.geobuf", "/map/async/search?format=fgb"]
+    )
+    def test_binary_formats_are_not_acceptable(self, async_client, url):
+        response = asyncio.run(async_client.get(url))
+
+        assert response.status_code == 406
+        assert response["Content-Type"] == "application/json"
+
+    def test_post_requests_are_not_checked_for_csrf_token(self):
+        async_client = AsyncClient(enforce_csrf_checks=True)
+
+        response = asyncio.run(async_client.post("/map/async/search?lon=12.3"))
+
+        assert response.status_code == 400
+        assert_response_content_error_message(
+            response.content, conf.ERROR_MESSAGE_ONLY_SET_EITHER_LON_OR_LAT
+        )
+
+
 @pytest.fixture
 def mock_solr_search(monkeypatch, solr_response_with_geojson_field_only):
     from pysolr import Solr
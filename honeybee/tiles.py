@@ -0,0 +1,299 @@
+import json
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from honeybee.commons import Tile
+from honeybee.geometry import project_to_tile
+from honeybee.protobuf import ProtobufWriter, encode_zigzag
+
+# See https://github.com/mapbox/vector-tile-spec/tree/master/2.1
+VECTOR_TILE_VERSION = 2
+VECTOR_TILE_EXTENT = 4096
+# Features up to this many units outside of the tile are added, so that symbols at the tile border are not cut off
+VECTOR_TILE_BUFFER = 64
+
+TILE_FIELD_LAYERS = 3
+LAYER_FIELD_NAME = 1
+LAYER_FIELD_FEATURES = 2
+LAYER_FIELD_KEYS = 3
+LAYER_FIELD_VALUES = 4
+LAYER_FIELD_EXTENT = 5
+LAYER_FIELD_VERSION = 15
+FEATURE_FIELD_ID = 1
+FEATURE_FIELD_TAGS = 2
+FEATURE_FIELD_TYPE = 3
+FEATURE_FIELD_GEOMETRY = 4
+VALUE_FIELD_STRING = 1
+VALUE_FIELD_DOUBLE = 3
+VALUE_FIELD_UNSIGNED_INTEGER = 5
+VALUE_FIELD_SIGNED_INTEGER = 6
+VALUE_FIELD_BOOLEAN = 7
+
+GEOMETRY_TYPE_POINT = 1
+GEOMETRY_TYPE_LINESTRING = 2
+GEOMETRY_TYPE_POLYGON = 3
+
+COMMAND_MOVE_TO = 1
+COMMAND_LINE_TO = 2
+COMMAND_CLOSE_PATH = 7
+
+FEATURE_ID_PROPERTY_NAME = "id"
+
+Position = Tuple[int, int]
+
+
+def encode_vector_tile(
+    features: Iterable[dict],
+    tile: Tile,
+    layer_name: str,
+    extent: int = VECTOR_TILE_EXTENT,
+) -> bytes:
+    """Encodes the given GeoJSON Features into a Mapbox Vector Tile with a single layer.
+    Features without a geometry are left out. If no Feature is left, an empty (but valid) tile is returned.
+    """
+    layer = VectorTileLayer(layer_name, tile, extent)
+    for feature in features:
+        layer.add_feature(feature)
+
+    if not layer.feature_count:
+        return b""
+
+    writer = ProtobufWriter()
+    writer.write_bytes(TILE_FIELD_LAYERS, layer.encode())
+
+    return writer.to_bytes()
+
+
+class VectorTileLayer:
+    """Collects the encoded Features of a vector tile layer.
+    Property keys and values are stored once per layer, the Features refer to them by index.
+    """
+
+    def __init__(self, name: str, tile: Tile, extent: int = VECTOR_TILE_EXTENT):
+        self.name = name
+        self.tile = tile
+        self.extent = extent
+        self._keys = {}
+        self._values = {}
+        self._encoded_features = []
+
+    @property
+    def feature_count(self) -> int:
+        return len(self._encoded_features)
+
+    def add_feature(self, feature: dict) -> None:
+        """Projects the geometry of the GeoJSON Feature into the tile and adds it with its properties.
+        The members of a GeometryCollection are added as separate Features. Integer IDs are stored as Feature ID,
+        all other IDs as `id` property.
+        """
+        encoded_geometries = encode_geometry(
+            feature.get("geometry"), self.tile, self.extent
+        )
+        if not encoded_geometries:
+            return
+
+        properties = dict(feature.get("properties") or {})
+        feature_id = feature.get("id")
+        is_integer_id = is_unsigned_integer(feature_id)
+        if feature_id is not None and not is_integer_id:
+            properties.setdefault(FEATURE_ID_PROPERTY_NAME, feature_id)
+
+        tags = self._encode_properties(properties)
+
+        for geometry_type, commands in encoded_geometries:
+            writer = ProtobufWriter()
+            if is_integer_id:
+                writer.write_varint(FEATURE_FIELD_ID, feature_id)
+            writer.write_packed_varints(FEATURE_FIELD_TAGS, tags)
+            writer.write_varint(FEATURE_FIELD_TYPE, geometry_type)
+            writer.write_packed_varints(FEATURE_FIELD_GEOMETRY, commands)
+            self._encoded_features.append(writer.to_bytes())
+
+    def encode(self) -> bytes:
+        writer = ProtobufWriter()
+        writer.write_string(LAYER_FIELD_NAME, self.name)
+        for encoded_feature in self._encoded_features:
+            writer.write_bytes(LAYER_FIELD_FEATURES, encoded_feature)
+        for key in self._keys:
+            writer.write_string(LAYER_FIELD_KEYS, key)
+        for encoded_value in self._values:
+            writer.write_bytes(LAYER_FIELD_VALUES, encoded_value)
+        writer.write_varint(LAYER_FIELD_EXTENT, self.extent)
+        writer.write_varint(LAYER_FIELD_VERSION, VECTOR_TILE_VERSION)
+
+        return writer.to_bytes()
+
+    def _encode_properties(self, properties: dict) -> List[int]:
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+
+            tags.append(self._keys.setdefault(str(key), len(self._keys)))
+            tags.append(self._values.setdefault(encode_value(value), len(self._values)))
+
+        return tags
+
+
+def encode_value(value) -> bytes:
+    """Encodes a property value as vector tile Value message.
+    Lists, objects and integers out of the 64 bit range are encoded as JSON strings.
+    """
+    writer = ProtobufWriter()
+
+    if isinstance(value, bool):
+        writer.write_varint(VALUE_FIELD_BOOLEAN, int(value))
+    elif is_unsigned_integer(value):
+        writer.write_varint(VALUE_FIELD_UNSIGNED_INTEGER, value)
+    elif isinstance(value, int) and value >= -(2**63):
+        writer.write_signed_varint(VALUE_FIELD_SIGNED_INTEGER, value)
+    elif isinstance(value, float):
+        writer.write_double(VALUE_FIELD_DOUBLE, value)
+    elif isinstance(value, str):
+        writer.write_string(VALUE_FIELD_STRING, value)
+    else:
+        writer.write_string(VALUE_FIELD_STRING, json.dumps(value))
+
+    return writer.to_bytes()
+
+
+def is_unsigned_integer(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and 0 <= value < 2**64
+
+
+def encode_geometry(
+    geometry: Optional[dict], tile: Tile, extent: int = VECTOR_TILE_EXTENT
+) -> List[Tuple[int, List[int]]]:
+    """Projects the GeoJSON geometry into the tile and encodes it as vector tile geometry commands.
+    Returns a list of geometry types and commands, with one entry per member of a GeometryCollection. Geometries
+    collapsing to nothing in the tile grid are left out.
+    """
+    if not geometry:
+        return []
+
+    geometry_type = geometry.get("type")
+    if geometry_type == "GeometryCollection":
+        return [
+            encoded_geometry
+            for member in geometry.get("geometries") or []
+            for encoded_geometry in encode_geometry(member, tile, extent)
+        ]
+
+    coordinates = geometry.get("coordinates")
+    if not coordinates:
+        return []
+
+    def project(positions: Sequence) -> List[Position]:
+        return [
+            project_to_tile(position[0], position[1], tile, extent)
+            for position in positions
+        ]
+
+    encoder = GeometryEncoder()
+    if geometry_type in ("Point", "MultiPoint"):
+        encoder.add_points(
+            project([coordinates] if geometry_type == "Point" else coordinates)
+        )
+        vector_tile_type = GEOMETRY_TYPE_POINT
+    elif geometry_type in ("LineString", "MultiLineString"):
+        lines = [coordinates] if geometry_type == "LineString" else coordinates
+        for line in lines:
+            encoder.add_line(project(line))
+        vector_tile_type = GEOMETRY_TYPE_LINESTRING
+    elif geometry_type in ("Polygon", "MultiPolygon"):
+        polygons = [coordinates] if geometry_type == "Polygon" else coordinates
+        for polygon in polygons:
+            encoder.add_polygon([project(ring) for ring in polygon])
+        vector_tile_type = GEOMETRY_TYPE_POLYGON
+    else:
+        return []
+
+    return [(vector_tile_type, encoder.commands)] if encoder.commands else []
+
+
+class GeometryEncoder:
+    """Encodes projected geometries as vector tile geometry commands.
+    Every position is stored as zigzag encoded difference to the previous position of the whole geometry.
+    """
+
+    def __init__(self):
+        self.commands = []
+        self._cursor = (0, 0)
+
+    def add_points(self, points: List[Position]) -> None:
+        if not points:
+            return
+
+        self.commands.append(create_command(COMMAND_MOVE_TO, len(points)))
+        self._add_positions(points)
+
+    def add_line(self, positions: List[Position]) -> None:
+        positions = remove_repeated_positions(positions)
+        if len(positions) < 2:
+            return
+
+        self.commands.append(create_command(COMMAND_MOVE_TO, 1))
+        self._add_positions(positions[:1])
+        self.commands.append(create_command(COMMAND_LINE_TO, len(positions) - 1))
+        self._add_positions(positions[1:])
+
+    def add_polygon(self, rings: List[List[Position]]) -> None:
+        """Adds the exterior ring and the holes of a polygon.
+        The exterior ring is oriented clockwise and the holes counter-clockwise in the tile grid (with the y-axis
+        pointing down), as required by the specification. A polygon with a collapsed exterior ring is left out.
+        """
+        oriented_rings = []
+        for index, ring in enumerate(rings):
+            ring = remove_repeated_positions(ring)
+            if len(ring) > 1 and ring[0] == ring[-1]:
+                ring = ring[:-1]
+
+            area = calculate_signed_area(ring) if len(ring) >= 3 else 0
+            if area == 0:
+                if index == 0:
+                    return
+                continue
+
+            is_exterior_ring = index == 0
+            oriented_rings.append(
+                ring if (area > 0) == is_exterior_ring else ring[::-1]
+            )
+
+        for ring in oriented_rings:
+            self.commands.append(create_command(COMMAND_MOVE_TO, 1))
+            self._add_positions(ring[:1])
+            self.commands.append(create_command(COMMAND_LINE_TO, len(ring) - 1))
+            self._add_positions(ring[1:])
+            self.commands.append(create_command(COMMAND_CLOSE_PATH, 1))
+
+    def _add_positions(self, positions: List[Position]) -> None:
+        cursor_x, cursor_y = self._cursor
+        for x, y in positions:
+            self.commands.append(encode_zigzag(x - cursor_x))
+            self.commands.append(encode_zigzag(y - cursor_y))
+            cursor_x, cursor_y = x, y
+
+        self._cursor = (cursor_x, cursor_y)
+
+
+def create_command(command_id: int, count: int) -> int:
+    return (command_id & 0x7) | (count << 3)
+
+
+def remove_repeated_positions(positions: List[Position]) -> List[Position]:
+    """Removes consecutive duplicates, which occur when close positions are projected into the same grid cell."""
+    return [
+        position
+        for index, position in enumerate(positions)
+        if index == 0 or position != positions[index - 1]
+    ]
+
+
+def calculate_signed_area(ring: List[Position]) -> float:
+    """Calculates the area of the ring with the surveyor's formula. Is positive for clockwise rings in the tile grid."""
+    return (
+        sum(
+            x * next_y - next_x * y
+            for (x, y), (next_x, next_y) in zip(ring, ring[1:] + ring[:1])
+        )
+        / 2
+    )
@@ -0,0 +1,167 @@
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, ContextManager, Iterator, List, Optional
+
+from honeybee import conf
+
+logger = logging.getLogger(__name__)
+
+SERVER_TIMING_HEADER_NAME = "Server-Timing"
+
+STAGE_PARSE = "parse"
+STAGE_QUERY = "query"
+STAGE_SOLR = "solr"
+STAGE_SOLR_QUERY_TIME = "solr-qtime"
+STAGE_CONVERT = "convert"
+STAGE_RENDER = "render"
+
+STAGE_DESCRIPTIONS = {
+    STAGE_PARSE: "Parameter parsing",
+    STAGE_QUERY: "Query building",
+    STAGE_SOLR: "Solr request",
+    STAGE_SOLR_QUERY_TIME: "Solr QTime",
+    STAGE_CONVERT: "GeoJSON conversion",
+    STAGE_RENDER: "Serialization",
+}
+
+
+@dataclass
+class StageTiming:
+    """The duration of a stage of a request in milliseconds.
+    `start` is the Unix time the stage started at, or None for durations reported by another system (e.g. Solr).
+    The `description` defaults to the description of the known stages.
+    """
+
+    name: str
+    duration: float
+    start: Optional[float] = None
+    description: Optional[str] = None
+
+    def __post_init__(self):
+        if self.description is None:
+            self.description = STAGE_DESCRIPTIONS.get(self.name)
+
+
+TimingHook = Callable[[StageTiming], None]
+
+_timing_hooks: List[TimingHook] = []
+_current_timings: ContextVar[Optional[List[StageTiming]]] = ContextVar(
+    "stage_timings", default=None
+)
+_disabled_measurement = nullcontext()
+
+
+def add_timing_hook(hook: TimingHook) -> None:
+    """Registers a function that is called with every measured StageTiming, e.g. to create tracing spans.
+    Stages are measured as soon as a hook is registered, even if `conf.MAP_VIEWER_SERVER_TIMING_ENABLED` is False.
+    """
+    _timing_hooks.append(hook)
+
+
+def remove_timing_hook(hook: TimingHook) -> None:
+    if hook in _timing_hooks:
+        _timing_hooks.remove(hook)
+
+
+def is_timing_enabled() -> bool:
+    return conf.MAP_VIEWER_SERVER_TIMING_ENABLED or bool(_timing_hooks)
+
+
+@contextmanager
+def collect_timings(
+    timings: Optional[List[StageTiming]] = None,
+) -> Iterator[Optional[List[StageTiming]]]:
+    """Collects the timings of all stages measured within the block (also in called functions) in the yielded list.
+    If a list of `timings` is given, e.g. from an earlier block of the same request, the timings are appended to it.
+    Otherwise, if the timing is disabled, None is yielded and no stage is measured.
+    """
+    if timings is None:
+        if not is_timing_enabled():
+            yield None
+            return
+        timings = []
+
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+def measure(stage_name: str) -> ContextManager:
+    """Measures the duration of the block as the stage with the given name.
+    Outside of `collect_timings` (or with the timing disabled), nothing is measured.
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        return _disabled_measurement
+
+    return StageMeasurement(timings, stage_name)
+
+
+def record_timing(stage_name: str, duration: Optional[float]) -> None:
+    """Adds a duration in milliseconds that was measured by another system, e.g. the query time reported by Solr."""
+    timings = _current_timings.get()
+    if timings is None or duration is None:
+        return
+
+    add_stage_timing(timings, StageTiming(stage_name, float(duration)))
+
+
+class StageMeasurement:
+    def __init__(self, timings: List[StageTiming], stage_name: str):
+        self.timings = timings
+        self.stage_name = stage_name
+        self._start = None
+        self._start_counter = None
+
+    def __enter__(self) -> None:
+        self._start = time.time()
+        self._start_counter = time.perf_counter()
+
+    def __exit__(self, *args) -> None:
+        duration = (time.perf_counter() - self._start_counter) * 1000
+        add_stage_timing(
+            self.timings, StageTiming(self.stage_name, duration, start=self._start)
+        )
+
+
+def add_stage_timing(timings: List[StageTiming], timing: StageTiming) -> None:
+    """Adds the timing to the list and passes it to all hooks. Failing hooks are logged, they never fail a request."""
+    timings.append(timing)
+
+    for hook in _timing_hooks:
+        try:
+            hook(timing)
+        except Exception:
+            logger.exception("A timing hook failed.")
+
+
+def add_server_timing_header(response, timings: Optional[List[StageTiming]]) -> None:
+    """Appends the timings to the Server-Timing header of the response, if `conf.MAP_VIEWER_SERVER_TIMING_ENABLED`
+    is True.
+    """
+    if not timings or not conf.MAP_VIEWER_SERVER_TIMING_ENABLED:
+        return
+
+    header_value = create_server_timing_header(timings)
+    existing_header_value = response.get(SERVER_TIMING_HEADER_NAME)
+    if existing_header_value:
+        header_value = f"{existing_header_value}, {header_value}"
+
+    response[SERVER_TIMING_HEADER_NAME] = header_value
+
+
+def create_server_timing_header(timings: List[StageTiming]) -> str:
+    """Formats the timings as value of a Server-Timing header, e.g. `solr;dur=12.3;desc="Solr request"`."""
+    metrics = []
+    for timing in timings:
+        metric = f"{timing.name};dur={timing.duration:.3f}"
+        if timing.description:
+            metric += f';desc="{timing.description}"'
+        metrics.append(metric)
+
+    return ", ".join(metrics)
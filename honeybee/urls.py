@@ -7,6 +7,13 @@ app_name = 'biofid-honeybee'
 
 urlpatterns = [
     re_path('^search', views.search_view),
+    re_path('^export$', views.export_view),
+    re_path('^async/search$', views.async_search_view),
+    re_path('^feature/(?P<feature_id>.+)$', views.feature_view),
+    re_path('^features$', views.features_view),
+    re_path(r'^tiles/(?P<zoom>\d+)/(?P<x>\d+)/(?P<y>\d+)\.pbf$', views.tile_view),
 ]
 
-urlpatterns = format_suffix_patterns(urlpatterns)
+urlpatterns = format_suffix_patterns(urlpatterns) + [
+    re_path('^metrics$', views.metrics_view),
+]
@@ -1,3 +1,16 @@
+import time
+
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseNotAllowed,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.utils.cache import patch_cache_control
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.decorators import (
     api_view,
@@ -6,28 +19,149 @@ from rest_framework.decorators import (
     authentication_classes,
 )
 from rest_framework.permissions import AllowAny
-from rest_framework.renderers import JSONRenderer
 from rest_framework.request import Request
 from rest_framework.response import Response
-from honeybee.search import search_spatial_data
+from honeybee.renderers import (
+    FlatGeobufRenderer,
+    GeobufRenderer,
+    SpatialDataJSONRenderer,
+    TimedResponse,
+    count_features,
+    render_features_as_feature_collection,
+    render_features_as_ndjson,
+)
+from honeybee.search import (
+    create_vector_tile,
+    get_spatial_data_for_ids,
+    search_spatial_data,
+    search_spatial_data_async,
+    stream_spatial_data,
+)
 from honeybee import conf
+from honeybee.metrics import METRICS_CONTENT_TYPE, metrics_registry, record_search_request
 from http import HTTPStatus
-from honeybee.commons import UserInputException
+from honeybee.commons import SearchResult, Tile, UserInputException, get_from_data
+from honeybee.timing import STAGE_RENDER, add_server_timing_header, collect_timings, measure
+
+SEARCH_HTTP_METHODS = ["GET", "POST"]
+
+VECTOR_TILE_CONTENT_TYPE = 'application/vnd.mapbox-vector-tile'
+
+SEARCH_VIEW_METRICS_NAME = 'search'
+ASYNC_SEARCH_VIEW_METRICS_NAME = 'async_search'
 
+EXPORT_FORMATS = {
+    conf.URL_PARAMETER_VALUE_FORMAT_NDJSON: (render_features_as_ndjson, 'application/x-ndjson'),
+    conf.URL_PARAMETER_VALUE_FORMAT_GEOJSON: (render_features_as_feature_collection, 'application/geo+json'),
+}
 
-@api_view(["GET", "POST"])
+
+@api_view(SEARCH_HTTP_METHODS)
 @authentication_classes([SessionAuthentication])
 @permission_classes([AllowAny])
-@renderer_classes([JSONRenderer])
+@renderer_classes([SpatialDataJSONRenderer, GeobufRenderer, FlatGeobufRenderer])
 def search_view(request: Request) -> Response:
-    """Generates a response holding georeferenced document data."""
+    """Generates a response holding georeferenced document data.
+    The data is rendered as JSON (default), Geobuf or FlatGeobuf, as requested by the URL parameter `format` or the
+    Accept header. The binary formats hold only the Features, the pagination is sent in the response headers.
+    If enabled, the durations of the search stages are sent in the Server-Timing header.
+    """
+
+    start = time.perf_counter()
+    status_code = HTTPStatus.OK
+    feature_count = None
+    with collect_timings() as timings:
+        try:
+            search_result = search_spatial_data(request.GET)
+            content = convert_search_result_to_response_content(search_result)
+            feature_count = count_features(search_result.spatial_data)
+        except UserInputException as ex:
+            content = convert_exception_to_response_content(ex)
+            status_code = HTTPStatus.BAD_REQUEST
+
+    def record_metrics():
+        record_search_request(
+            SEARCH_VIEW_METRICS_NAME, status_code, time.perf_counter() - start, feature_count
+        )
+
+    return TimedResponse(
+        data=content, status=status_code, timings=timings, on_rendered=record_metrics
+    )
+
+
+@csrf_exempt
+async def async_search_view(request: HttpRequest, format: str = None) -> HttpResponse:
+    """The asynchronous version of `search_view`. Does not block a worker while waiting for the database,
+    if the app is served via ASGI. Only JSON responses are supported, other formats requested by URL suffix or the
+    URL parameter `format` are answered with 406. POST requests are exempt from the CSRF check, since searches do not
+    change any data.
+    """
+    if request.method not in SEARCH_HTTP_METHODS:
+        return HttpResponseNotAllowed(SEARCH_HTTP_METHODS)
+
+    renderer = SpatialDataJSONRenderer()
+    requested_format = format or request.GET.get(conf.URL_PARAMETER_NAME_FORMAT, renderer.format)
+    if requested_format != renderer.format:
+        error_message = conf.ERROR_MESSAGE_UNSUPPORTED_FORMAT.format(
+            format=requested_format, supported_formats=renderer.format
+        )
+        content = {conf.ERROR_MESSAGE_CONTENT_PARAMETER_NAME: error_message}
+        return JsonResponse(data=content, status=HTTPStatus.NOT_ACCEPTABLE)
+
+    start = time.perf_counter()
+    status_code = HTTPStatus.OK
+    feature_count = None
+    with collect_timings() as timings:
+        try:
+            search_result = await search_spatial_data_async(request.GET)
+            content = convert_search_result_to_response_content(search_result)
+            feature_count = count_features(search_result.spatial_data)
+        except UserInputException as ex:
+            content = convert_exception_to_response_content(ex)
+            status_code = HTTPStatus.BAD_REQUEST
+
+        with measure(STAGE_RENDER):
+            rendered_content = renderer.render(content)
+
+    response = HttpResponse(
+        rendered_content, content_type=renderer.media_type, status=status_code
+    )
+    add_server_timing_header(response, timings)
+    record_search_request(
+        ASYNC_SEARCH_VIEW_METRICS_NAME, status_code, time.perf_counter() - start, feature_count
+    )
+
+    return response
+
+
+@api_view(["GET"])
+@authentication_classes([SessionAuthentication])
+@permission_classes([AllowAny])
+@renderer_classes([SpatialDataJSONRenderer])
+def feature_view(request: Request, feature_id: str, format: str = None) -> Response:
+    """Generates a response holding the data of a single georeferenced Feature."""
+    feature_collection = get_spatial_data_for_ids([feature_id])
+
+    if not feature_collection['features']:
+        error_message = conf.ERROR_MESSAGE_FEATURE_NOT_FOUND.format(feature_id=feature_id)
+        content = {conf.ERROR_MESSAGE_CONTENT_PARAMETER_NAME: error_message}
+        return Response(data=content, status=HTTPStatus.NOT_FOUND)
+
+    return Response(data={'spatialData': feature_collection['features'][0]})
 
+
+@api_view(["GET"])
+@authentication_classes([SessionAuthentication])
+@permission_classes([AllowAny])
+@renderer_classes([SpatialDataJSONRenderer])
+def features_view(request: Request, format: str = None) -> Response:
+    """Generates a response holding the data of all georeferenced Features with the requested IDs."""
     status_code = HTTPStatus.OK
     try:
-        spatial_data = search_spatial_data(request.GET)
-        content = {
-            'spatialData': spatial_data
-        }
+        feature_ids = get_from_data(
+            data=request.GET, name=conf.URL_PARAMETER_NAME_ID, is_list=True
+        )
+        content = {'spatialData': get_spatial_data_for_ids(feature_ids)}
     except UserInputException as ex:
         content = convert_exception_to_response_content(ex)
         status_code = HTTPStatus.BAD_REQUEST
@@ -35,6 +169,81 @@ def search_view(request: Request) -> Response:
     return Response(data=content, status=status_code)
 
 
+@require_http_methods(SEARCH_HTTP_METHODS)
+def export_view(request: HttpRequest, format: str = None) -> HttpResponse:
+    """Streams all georeferenced document data fitting the request, either as NDJSON (default) or as GeoJSON
+    FeatureCollection. The format can be given as URL suffix or as URL parameter.
+    """
+    try:
+        export_format = format or get_from_data(
+            data=request.GET,
+            name=conf.URL_PARAMETER_NAME_FORMAT,
+            optional=True,
+            default=conf.URL_PARAMETER_VALUE_FORMAT_NDJSON,
+        )
+        if export_format not in EXPORT_FORMATS:
+            raise UserInputException(
+                conf.ERROR_MESSAGE_UNSUPPORTED_FORMAT.format(
+                    format=export_format, supported_formats=', '.join(EXPORT_FORMATS)
+                )
+            )
+
+        features = stream_spatial_data(request.GET)
+    except UserInputException as ex:
+        content = convert_exception_to_response_content(ex)
+        return JsonResponse(data=content, status=HTTPStatus.BAD_REQUEST)
+
+    render_features, content_type = EXPORT_FORMATS[export_format]
+
+    return StreamingHttpResponse(render_features(features), content_type=content_type)
+
+
+@require_http_methods(["GET"])
+def tile_view(request: HttpRequest, zoom: str, x: str, y: str, format: str = None) -> HttpResponse:
+    """Generates a Mapbox Vector Tile holding all georeferenced document data within the requested tile.
+    The tile can be cached by browsers and proxies for `MAP_VIEWER_TILE_CACHE_MAX_AGE` seconds.
+    """
+    try:
+        vector_tile = create_vector_tile(request.GET, Tile(zoom=int(zoom), x=int(x), y=int(y)))
+    except UserInputException as ex:
+        content = convert_exception_to_response_content(ex)
+        return JsonResponse(data=content, status=HTTPStatus.BAD_REQUEST)
+
+    response = HttpResponse(vector_tile, content_type=VECTOR_TILE_CONTENT_TYPE)
+    patch_cache_control(response, public=True, max_age=conf.MAP_VIEWER_TILE_CACHE_MAX_AGE)
+
+    return response
+
+
+@require_http_methods(["GET"])
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """Returns the metrics of the search traffic in the Prometheus text format, or 404 if the metrics are disabled.
+    With `MAP_VIEWER_METRICS_DIRECTORY`, the metrics of all worker processes are summed up.
+    """
+    if not conf.MAP_VIEWER_METRICS_ENABLED:
+        raise Http404()
+
+    return HttpResponse(metrics_registry.render(), content_type=METRICS_CONTENT_TYPE)
+
+
+def convert_search_result_to_response_content(search_result: SearchResult) -> dict:
+    """Takes the given search result and converts it to the response content.
+    The IDs of deleted Features are only part of the content for searches for changes.
+    """
+    content = {
+        'spatialData': search_result.spatial_data,
+        'pagination': {
+            conf.URL_PARAMETER_NAME_RESUME_TOKEN: search_result.next_cursor,
+            'totalHits': search_result.total_hits,
+        },
+    }
+
+    if search_result.deleted_ids is not None:
+        content['deletedIds'] = search_result.deleted_ids
+
+    return content
+
+
 def convert_exception_to_response_content(exception: Exception) -> dict:
     """ Takes a given exception and converts its content to an exception message. """
     return {
@@ -1,4 +1,4 @@
-from setuptools import setup
+from setuptools import find_packages, setup
 
 requirements = [
     'Django>=3.2',
@@ -20,10 +20,24 @@ setup(
     url="https://www.biofid.de",
     download_url='https://github.com/FID-Biodiversity/honeybee',
     python_requires='>=3.7',
-    packages=['honeybee'],
+    packages=find_packages(exclude=['honeybee.tests*']),
     install_requires=requirements,
     extras_require={
+        'async': [
+            'httpx',
+        ],
+        'flatgeobuf': [
+            'flatbuffers',
+        ],
+        'memory': [
+            'numpy',
+        ],
         'dev': [
+            'flatbuffers',
+            'geobuf',
+            'httpx',
+            'mapbox-vector-tile',
+            'numpy',
             'pytest-django',
         ]
     }